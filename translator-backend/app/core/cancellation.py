@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(HTTPException):
+    """Raised when the client went away before its response was ready"""
+
+    def __init__(self):
+        # 499 is the de facto "client closed request" status; nobody receives it
+        super().__init__(status_code=499, detail="Client closed request")
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """Await the upstream work, cancelling it as soon as the client disconnects"""
+    task = asyncio.ensure_future(awaitable)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {task}, timeout=settings.DISCONNECT_POLL_INTERVAL
+            )
+            if done:
+                return task.result()
+
+            if await request.is_disconnected():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                metrics.increment("requests_cancelled", request.url.path)
+                print(f"Client disconnected, cancelled {request.url.path}")
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+OPENAI_WARM_UP_URL = "https://api.openai.com/v1/models"
+
+
+class ClientRegistry:
+    """Shared upstream HTTP clients, one connection pool per upstream"""
+
+    def __init__(self):
+        self._openai_http: Optional[httpx.AsyncClient] = None
+        self._supabase_http: Optional[httpx.AsyncClient] = None
+        self._callback_http: Optional[httpx.AsyncClient] = None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    @property
+    def openai_http(self) -> httpx.AsyncClient:
+        """HTTP client shared by every OpenAI SDK and LangChain client"""
+        if self._openai_http is None:
+            from openai import DefaultAsyncHttpxClient
+
+            self._openai_http = DefaultAsyncHttpxClient(
+                limits=self._limits(),
+                http2=settings.HTTP2_ENABLED,
+            )
+        return self._openai_http
+
+    @property
+    def supabase_http(self) -> httpx.AsyncClient:
+        """HTTP client shared by every Supabase client"""
+        if self._supabase_http is None:
+            self._supabase_http = httpx.AsyncClient(
+                limits=self._limits(),
+                http2=settings.HTTP2_ENABLED,
+                timeout=httpx.Timeout(settings.SUPABASE_TIMEOUT),
+            )
+        return self._supabase_http
+
+    @property
+    def callback_http(self) -> httpx.AsyncClient:
+        """HTTP client used to deliver job completion callbacks"""
+        if self._callback_http is None:
+            self._callback_http = httpx.AsyncClient(
+                limits=self._limits(),
+                timeout=httpx.Timeout(settings.CALLBACK_TIMEOUT),
+            )
+        return self._callback_http
+
+    async def warm_up(self):
+        """Open keep-alive connections to each upstream so first requests skip the TLS handshake"""
+        results = await asyncio.gather(
+            self.openai_http.get(
+                OPENAI_WARM_UP_URL,
+                headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+                timeout=settings.HTTP_WARM_UP_TIMEOUT,
+            ),
+            self.supabase_http.get(
+                f"{settings.SUPABASE_URL}/auth/v1/health",
+                headers={"apikey": settings.SUPABASE_ANON_KEY},
+                timeout=settings.HTTP_WARM_UP_TIMEOUT,
+            ),
+            return_exceptions=True,
+        )
+
+        for name, result in zip(("OpenAI", "Supabase"), results):
+            if isinstance(result, Exception):
+                print(f"Failed to warm up {name} connection: {type(result).__name__}: {result}")
+            else:
+                print(f"Warmed up {name} connection ({result.http_version})")
+
+    async def aclose(self):
+        """Close all upstream connection pools"""
+        for client in (self._openai_http, self._supabase_http, self._callback_http):
+            if client is not None:
+                await client.aclose()
+
+        self._openai_http = None
+        self._supabase_http = None
+        self._callback_http = None
+
+
+clients = ClientRegistry()
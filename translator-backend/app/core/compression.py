@@ -0,0 +1,31 @@
+"""Response compression for the JSON API, skipping routes that compress or stream their own"""
+
+from fastapi.middleware.gzip import GZipMiddleware
+
+from app.core.config import settings
+
+
+# Responses that are already compressed or streamed; gzip would compress them
+# twice or hold back their chunks until its buffer fills
+UNCOMPRESSED_PATHS = {
+    "/v1/translate/history/export",
+    "/v1/translate/image/stream",
+}
+
+
+class SelectiveGZipMiddleware:
+    """GZip compression for every HTTP route except UNCOMPRESSED_PATHS"""
+
+    def __init__(self, app):
+        self.app = app
+        self.gzip = GZipMiddleware(
+            app,
+            minimum_size=settings.GZIP_MINIMUM_SIZE,
+            compresslevel=settings.GZIP_COMPRESS_LEVEL,
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("path", "") not in UNCOMPRESSED_PATHS:
+            await self.gzip(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
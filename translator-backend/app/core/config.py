@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,15 +10,150 @@ class Settings(BaseSettings):
     DESCRIPTION: str = "A modular FastAPI translator backend"
 
     OPENAI_API_KEY: str
+    OPENAI_MODEL: str = "gpt-4o"
     
     SUPABASE_URL: str
     SUPABASE_ANON_KEY: str
     SUPABASE_JWT_SECRET: str
+    # Lets background jobs save history without keeping the user's access token
+    SUPABASE_SERVICE_ROLE_KEY: Optional[str] = None
 
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     DEBUG: bool = True
 
+    WORKERS: int = 0
+    BACKLOG: int = 2048
+    KEEP_ALIVE_TIMEOUT: int = 5
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+    MAX_REQUESTS: int = 0
+
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_WARM_UP_TIMEOUT: float = 5.0
+    HTTP_WARM_UP_ON_STARTUP: bool = True
+    PRELOAD_SERVICES_ON_STARTUP: bool = True
+    SUPABASE_TIMEOUT: float = 30.0
+
+    GZIP_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESS_LEVEL: int = 6
+    STATIC_CACHE_MAX_AGE: int = 86400
+
+    LANGUAGE_DETECTION_MIN_CONFIDENCE: float = 0.5
+
+    MULTI_TARGET_CONCURRENCY: int = 5
+    MULTI_TARGET_SINGLE_PROMPT_CHARS: int = 2000
+
+    UPSTREAM_TEXT_TIMEOUT: float = 30.0
+    UPSTREAM_DOCUMENT_TIMEOUT: float = 180.0
+    UPSTREAM_IMAGE_TIMEOUT: float = 60.0
+    UPSTREAM_AUDIO_TIMEOUT: float = 180.0
+    UPSTREAM_REALTIME_CONNECT_TIMEOUT: float = 10.0
+    # Slowest expected output rate; deadlines grow by max_tokens at this rate
+    UPSTREAM_MIN_TOKENS_PER_SECOND: float = 40.0
+    UPSTREAM_MAX_RETRIES: int = 2
+    UPSTREAM_RETRY_BASE_DELAY: float = 0.5
+    UPSTREAM_RETRY_MAX_DELAY: float = 8.0
+    HEDGE_ENABLED: bool = True
+    HEDGE_MAX_CHARS: int = 2000
+    HEDGE_DEFAULT_DELAY: float = 3.0
+    HEDGE_MIN_SAMPLES: int = 20
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 30.0
+
+    DISCONNECT_POLL_INTERVAL: float = 0.5
+
+    MAX_TEXT_CHARS: int = 100000
+    MAX_DOCUMENT_BYTES: int = 10 * 1024 * 1024
+    MAX_JOB_DOCUMENT_BYTES: int = 50 * 1024 * 1024
+    MAX_IMAGE_BYTES: int = 20 * 1024 * 1024
+    MAX_AUDIO_BYTES: int = 25 * 1024 * 1024
+    # Allowance for multipart boundaries and form fields on top of the file itself
+    UPLOAD_OVERHEAD_BYTES: int = 64 * 1024
+    MAX_REQUEST_TOKENS: int = 64000
+    TOKEN_COMPLETION_RATIO: float = 1.5
+    TOKEN_COMPLETION_MARGIN: int = 64
+    IMAGE_PROMPT_TOKENS: int = 1105
+    IMAGE_MAX_TOKENS: int = 4096
+    USER_TOKEN_BUDGET: int = 2000000
+    USER_TOKEN_BUDGET_WINDOW: int = 86400
+    USAGE_DB_PATH: str = "data/usage.db"
+
+    GLOSSARY_CACHE_TTL: float = 300.0
+    # Projects without entries, and lookups that failed, are cached for less time
+    GLOSSARY_EMPTY_CACHE_TTL: float = 60.0
+    GLOSSARY_FAILURE_CACHE_TTL: float = 15.0
+    GLOSSARY_CACHE_SIZE: int = 256
+    GLOSSARY_PAGE_SIZE: int = 1000
+    GLOSSARY_MAX_ENTRIES_PER_REQUEST: int = 1000
+
+    JOBS_DB_PATH: str = "data/jobs.db"
+    JOBS_FILES_DIR: str = "data/job_files"
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL: float = 2.0
+    JOB_STALE_SECONDS: float = 900.0
+    JOB_HEARTBEAT_INTERVAL: float = 60.0
+    # Finished jobs, with their payloads and results, are deleted after this long
+    JOB_RETENTION_SECONDS: float = 7 * 86400
+    JOB_CLEANUP_INTERVAL: float = 3600.0
+    DOCUMENT_CHUNK_CHARS: int = 12000
+    STRUCTURED_BATCH_CHARS: int = 6000
+    STRUCTURED_BATCH_CONCURRENCY: int = 4
+
+    # Scanned PDFs are rendered to images and read by the vision model
+    PDF_OCR_ENABLED: bool = True
+    PDF_OCR_MAX_PAGES: int = 50
+    PDF_OCR_CONCURRENCY: int = 4
+    PDF_RENDER_SCALE: float = 2.0
+    PDF_RENDER_MAX_DIMENSION: int = 2048
+    PDF_RENDER_JPEG_QUALITY: int = 80
+    PROCESS_POOL_WORKERS: int = 0
+
+    # Images whose text Tesseract reads confidently skip the vision model
+    LOCAL_OCR_ENABLED: bool = True
+    LOCAL_OCR_LANGUAGES: str = "eng"
+    LOCAL_OCR_MIN_CONFIDENCE: float = 85.0
+    LOCAL_OCR_MIN_CHARS: int = 3
+
+    MAX_BATCH_IMAGES: int = 10
+    MAX_IMAGE_BATCH_BYTES: int = 50 * 1024 * 1024
+    # Images packed into one vision request, limited by count and encoded size
+    IMAGE_BATCH_MAX_IMAGES: int = 4
+    IMAGE_BATCH_MAX_BYTES: int = 4 * 1024 * 1024
+    IMAGE_BATCH_CONCURRENCY: int = 4
+    CALLBACK_TIMEOUT: float = 10.0
+    # Hosts job callbacks may be sent to; when empty any public host is allowed
+    CALLBACK_ALLOWED_HOSTS: List[str] = []
+    CALLBACK_ALLOW_HTTP: bool = False
+
+    # Uncommitted input audio kept to replay after an upstream realtime reconnect
+    REALTIME_REPLAY_SECONDS: float = 10.0
+    REALTIME_RECONNECT_ATTEMPTS: int = 3
+
+    BROADCAST_MAX_LANGUAGES: int = 8
+    BROADCAST_MAX_LISTENERS: int = 500
+    # Messages held per listener before its oldest are dropped
+    BROADCAST_LISTENER_QUEUE_SIZE: int = 256
+
+    HISTORY_PREVIEW_LENGTH: int = 200
+    # History summaries select the generated "input_preview" and "output_preview"
+    # columns added by supabase/migrations/20261019090000_translation_previews.sql
+    # rather than the full texts; turn off on databases without that migration
+    HISTORY_PREVIEW_COLUMNS: bool = True
+    HISTORY_EXPORT_CHUNK_SIZE: int = 500
+    # Texts of at least HISTORY_CONTENT_MIN_BYTES are stored once per content hash
+    # in the "translation_contents" table added by
+    # supabase/migrations/20261019090100_translation_contents.sql, leaving a preview
+    # in the text column; turn off on databases without that migration
+    HISTORY_CONTENT_TABLE: bool = True
+    HISTORY_CONTENT_MIN_BYTES: int = 4096
+    # Hashes looked up per translation_contents request
+    HISTORY_CONTENT_BATCH_SIZE: int = 100
+    # Requires a nullable text column "prompt_version" on the translations table
+    HISTORY_PROMPT_VERSION: bool = False
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,84 @@
+import threading
+from functools import lru_cache, wraps
+
+from app.services.audio import AudioService
+from app.services.broadcast import BroadcastHub
+from app.services.database import DatabaseService
+from app.services.glossary import GlossaryService
+from app.services.jobs import JobService
+from app.services.ocr import local_ocr_available
+from app.services.tokens import TokenBudget
+from app.services.translator import TranslatorService
+
+# Re-entrant since services are built from the getters of the services they use
+_build_lock = threading.RLock()
+
+
+def shared_service(factory):
+    """lru_cache for a service getter that builds the service once, even when the
+    warm-up thread and the event loop ask for it at the same time"""
+    cached = lru_cache(factory)
+
+    @wraps(factory)
+    def getter():
+        with _build_lock:
+            return cached()
+
+    getter.cache_clear = cached.cache_clear
+    return getter
+
+
+@shared_service
+def get_translator_service() -> TranslatorService:
+    """Dependency returning the shared translator service, built on first use"""
+    return TranslatorService()
+
+
+@shared_service
+def get_audio_service() -> AudioService:
+    """Dependency returning the shared audio service, built on first use"""
+    return AudioService(get_translator_service())
+
+
+@shared_service
+def get_database_service() -> DatabaseService:
+    """Dependency returning the shared database service, built on first use"""
+    return DatabaseService()
+
+
+@shared_service
+def get_glossary_service() -> GlossaryService:
+    """Dependency returning the shared glossary service and its compiled-glossary cache"""
+    return GlossaryService(get_database_service)
+
+
+@shared_service
+def get_token_budget() -> TokenBudget:
+    """Dependency returning the shared token budget tracker"""
+    return TokenBudget()
+
+
+@shared_service
+def get_broadcast_hub() -> BroadcastHub:
+    """Dependency returning the broadcast rooms open in this process"""
+    return BroadcastHub()
+
+
+@shared_service
+def get_job_service() -> JobService:
+    """Dependency returning the background job service"""
+    return JobService(
+        get_translator_service,
+        get_audio_service,
+        get_database_service,
+        get_token_budget,
+    )
+
+
+def preload_services():
+    """Build every service ahead of the first request that needs it"""
+    get_translator_service().tokens.warm_up()
+    local_ocr_available()
+    get_audio_service()
+    get_database_service()
+    get_token_budget()
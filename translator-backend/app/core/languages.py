@@ -1,6 +1,6 @@
 """Language mappings and utilities for the translator service"""
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 LANGUAGES = [
     {"code": "ab", "name": "Abkhaz"},
@@ -261,6 +261,50 @@ LANGUAGE_NAME_TO_CODE: Dict[str, str] = {lang["name"].lower(): lang["code"] for
 # Create a set of supported language codes for quick validation
 SUPPORTED_LANGUAGE_CODES = set(LANGUAGE_CODE_TO_NAME.keys())
 
+# Legacy and macrolanguage tags that don't reduce to a listed code by dropping subtags
+_EXTRA_ALIASES = {
+    "zh": "zh-CN",
+    "zh-hans": "zh-CN",
+    "zh-sg": "zh-CN",
+    "zh-hant": "zh-TW",
+    "zh-hk": "zh-TW",
+    "zh-mo": "zh-TW",
+    "chinese": "zh-CN",
+    "iw": "he",
+    "in": "id",
+    "jw": "jv",
+    "tl": "fil",
+    "nb": "no",
+    "pt-br": "pt",
+}
+
+
+def _build_aliases() -> Dict[str, str]:
+    """Map every lowercase code, name and alias to its canonical language code"""
+    aliases = dict(_EXTRA_ALIASES)
+    for lang in LANGUAGES:
+        aliases[lang["name"].lower()] = lang["code"]
+        aliases[lang["code"].lower()] = lang["code"]
+    return aliases
+
+
+# Precomputed once so request validation is a dictionary lookup
+LANGUAGE_ALIASES: Dict[str, str] = _build_aliases()
+
+
+def normalize_language(value: str) -> Optional[str]:
+    """Canonical code for a language code, name or BCP-47 tag, or None if unsupported"""
+    key = value.strip().replace("_", "-").lower()
+    if key == "auto":
+        return "auto"
+
+    code = LANGUAGE_ALIASES.get(key)
+    # Drop trailing subtags (region, script, variants) until a known tag remains
+    while code is None and "-" in key:
+        key = key.rsplit("-", 1)[0]
+        code = LANGUAGE_ALIASES.get(key)
+    return code
+
 def get_language_name(code: str) -> str:
     """Get language name from code"""
     return LANGUAGE_CODE_TO_NAME.get(code, code)
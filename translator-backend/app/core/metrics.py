@@ -0,0 +1,73 @@
+import bisect
+from collections import defaultdict
+from typing import Dict, List
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = [50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000]
+
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum for the mean"""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        # One count per bucket plus one for values above the last bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of observations"""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 1) if self.count else None,
+            "p50": self.quantile(0.5) if self.count else None,
+            "p95": self.quantile(0.95) if self.count else None,
+            "buckets": {
+                **{f"le_{bound}": count for bound, count in zip(self.buckets, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class Metrics:
+    """In-process counters and histograms, reported per worker process"""
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.histograms: Dict[str, Dict[str, Histogram]] = defaultdict(
+            lambda: defaultdict(lambda: Histogram(LATENCY_BUCKETS_MS))
+        )
+
+    def increment(self, name: str, label: str = "total", amount: int = 1):
+        self.counters[name][label] += amount
+
+    def observe(self, name: str, label: str, value: float):
+        """Record a value, such as a latency in milliseconds, in a histogram"""
+        self.histograms[name][label].observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(values) for name, values in self.counters.items()}
+
+    def histogram_snapshot(self) -> Dict[str, Dict[str, Dict[str, object]]]:
+        return {
+            name: {label: histogram.snapshot() for label, histogram in values.items()}
+            for name, values in self.histograms.items()
+        }
+
+
+metrics = Metrics()
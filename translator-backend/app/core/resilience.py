@@ -0,0 +1,260 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+# Calls of every modality that share an upstream also share its circuit breaker
+MODALITY_UPSTREAMS = {
+    "text": "chat",
+    "document": "chat",
+    "image": "chat",
+    "audio": "whisper",
+    "realtime": "realtime",
+}
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class UpstreamUnavailable(HTTPException):
+    """Raised without calling the upstream while its circuit breaker is open"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"The {upstream} upstream is unavailable, please retry shortly",
+            headers={"Retry-After": str(max(1, int(retry_after)))},
+        )
+
+
+class UpstreamTimeout(HTTPException):
+    """Raised when an upstream call misses its modality's deadline"""
+
+    def __init__(self, modality: str, deadline: float):
+        super().__init__(
+            status_code=504,
+            detail=f"Upstream {modality} request did not complete within {deadline:g} seconds",
+        )
+
+
+def modality_deadline(modality: str, max_tokens: int = 0) -> float:
+    """A modality's deadline, extended by the time the model may take to write max_tokens"""
+    base = {
+        "text": settings.UPSTREAM_TEXT_TIMEOUT,
+        "document": settings.UPSTREAM_DOCUMENT_TIMEOUT,
+        "image": settings.UPSTREAM_IMAGE_TIMEOUT,
+        "audio": settings.UPSTREAM_AUDIO_TIMEOUT,
+        "realtime": settings.UPSTREAM_REALTIME_CONNECT_TIMEOUT,
+    }[modality]
+    return base + max_tokens / settings.UPSTREAM_MIN_TOKENS_PER_SECOND
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an upstream error is transient: timeouts, dropped connections, 429s and 5xx"""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError, ConnectionError)):
+        return True
+
+    if type(error).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+
+    return isinstance(status_code, int) and (
+        status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+    )
+
+
+class CircuitBreaker:
+    """Opens after consecutive upstream failures and lets a single probe through after a cool-down"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= settings.CIRCUIT_RESET_TIMEOUT:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "closed":
+            return
+
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return
+
+        metrics.increment("circuit_rejected", self.name)
+        retry_after = settings.CIRCUIT_RESET_TIMEOUT - (time.monotonic() - self.opened_at)
+        raise UpstreamUnavailable(self.name, retry_after)
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+            if self.opened_at is None or self.probing:
+                print(f"Circuit breaker for {self.name} opened after {self.failures} failures")
+                metrics.increment("circuit_opened", self.name)
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class LatencyTracker:
+    """Recent successful call latencies, used to pick the hedging delay"""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if len(self.samples) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Resilience:
+    """Deadlines, jittered retries, hedging and circuit breaking for upstream calls"""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+
+    def breaker(self, upstream: str) -> CircuitBreaker:
+        if upstream not in self.breakers:
+            self.breakers[upstream] = CircuitBreaker(upstream)
+        return self.breakers[upstream]
+
+    def latency(self, modality: str) -> LatencyTracker:
+        if modality not in self.latencies:
+            self.latencies[modality] = LatencyTracker()
+        return self.latencies[modality]
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        return {
+            name: {"state": breaker.state, "failures": breaker.failures}
+            for name, breaker in self.breakers.items()
+        }
+
+    async def call(
+        self,
+        modality: str,
+        make_call: Callable[[], Awaitable[T]],
+        hedge: bool = False,
+        max_tokens: int = 0,
+    ) -> T:
+        """Run an upstream call within its modality's deadline, retrying transient failures"""
+        breaker = self.breaker(MODALITY_UPSTREAMS[modality])
+        deadline = modality_deadline(modality, max_tokens)
+        give_up_at = time.monotonic() + deadline
+        attempt = 0
+
+        while True:
+            breaker.before_call()
+            remaining = give_up_at - time.monotonic()
+            started = time.monotonic()
+
+            try:
+                if hedge and settings.HEDGE_ENABLED:
+                    result = await asyncio.wait_for(
+                        self._hedged(modality, make_call), timeout=remaining
+                    )
+                else:
+                    result = await asyncio.wait_for(make_call(), timeout=remaining)
+            except asyncio.CancelledError:
+                breaker.probing = False
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError) and time.monotonic() >= give_up_at:
+                    # The request ran out of time, which says nothing about the upstream's
+                    # health, so it neither retries nor counts towards the breaker
+                    breaker.probing = False
+                    metrics.increment("upstream_timeouts", modality)
+                    raise UpstreamTimeout(modality, deadline) from e
+
+                retryable = is_retryable(e)
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+                backoff = min(
+                    settings.UPSTREAM_RETRY_MAX_DELAY,
+                    settings.UPSTREAM_RETRY_BASE_DELAY * 2**attempt,
+                )
+                backoff = random.uniform(0, backoff)
+
+                if (
+                    not retryable
+                    or attempt >= settings.UPSTREAM_MAX_RETRIES
+                    or time.monotonic() + backoff >= give_up_at
+                ):
+                    if isinstance(e, asyncio.TimeoutError):
+                        metrics.increment("upstream_timeouts", modality)
+                        raise UpstreamTimeout(modality, deadline) from e
+                    raise
+
+                attempt += 1
+                metrics.increment("upstream_retries", modality)
+                print(f"Retrying {modality} call after {type(e).__name__} (attempt {attempt})")
+                await asyncio.sleep(backoff)
+                continue
+
+            breaker.record_success()
+            self.latency(modality).record(time.monotonic() - started)
+            return result
+
+    async def _hedged(self, modality: str, make_call: Callable[[], Awaitable[T]]) -> T:
+        """Start a duplicate call once the first outlives the p95 latency; first success wins"""
+        delay = self.latency(modality).percentile(0.95) or settings.HEDGE_DEFAULT_DELAY
+
+        first = asyncio.ensure_future(make_call())
+        pending = {first}
+
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+
+            metrics.increment("upstream_hedged", modality)
+            pending.add(asyncio.ensure_future(make_call()))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+resilience = Resilience()
@@ -0,0 +1,99 @@
+"""Import timing used to report where startup time is spent in debug mode"""
+
+import importlib.abc
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+
+PROCESS_START = time.perf_counter()
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module loader and records how long executing the module takes"""
+
+    def __init__(self, loader, timer: "ImportTimer"):
+        self.loader = loader
+        self.timer = timer
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        name = module.__name__
+        self.timer.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self.timer.stack.pop()
+            if self.timer.stack:
+                self.timer.stack[-1] += elapsed
+            self.timer.timings[name] = {
+                "cumulative_ms": elapsed * 1000,
+                "self_ms": (elapsed - nested) * 1000,
+                "imported_at_ms": (start - PROCESS_START) * 1000,
+            }
+
+    def __getattr__(self, name: str):
+        return getattr(self.loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta path finder that times every module imported after it is installed"""
+
+    def __init__(self):
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.stack: List[float] = []
+        self.ready_at: Optional[float] = None
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def mark_ready(self):
+        """Record the moment the application is ready to serve requests"""
+        self.ready_at = time.perf_counter()
+
+    def report(self, limit: int = 30) -> Dict[str, Any]:
+        """Slowest imports by cumulative time, split into startup and lazy imports"""
+        ready_ms = (
+            (self.ready_at - PROCESS_START) * 1000 if self.ready_at is not None else None
+        )
+        modules = sorted(
+            (
+                {"module": name, **{key: round(value, 2) for key, value in timing.items()}}
+                for name, timing in self.timings.items()
+            ),
+            key=lambda item: item["cumulative_ms"],
+            reverse=True,
+        )
+
+        def during_startup(item: Dict[str, Any]) -> bool:
+            return ready_ms is None or item["imported_at_ms"] <= ready_ms
+
+        return {
+            "ready_ms": round(ready_ms, 2) if ready_ms is not None else None,
+            "startup_imports": [item for item in modules if during_startup(item)][:limit],
+            "lazy_imports": [item for item in modules if not during_startup(item)][:limit],
+        }
+
+
+import_timer: Optional[ImportTimer] = None
+
+
+def install_import_timer() -> ImportTimer:
+    """Start timing imports; only modules imported after this call are recorded"""
+    global import_timer
+    if import_timer is None:
+        import_timer = ImportTimer()
+        sys.meta_path.insert(0, import_timer)
+    return import_timer
@@ -0,0 +1,275 @@
+"""Request validation shared by the endpoints.
+
+The upload dependencies check type and size after FastAPI has parsed the
+multipart body, but before the endpoint reads the file. Only
+UploadLimitMiddleware rejects oversized uploads before the body arrives.
+"""
+
+import asyncio
+import ipaddress
+import os
+import socket
+from typing import Annotated, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import File, Form, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from pydantic import AfterValidator
+
+from app.core.config import settings
+from app.core.languages import normalize_language
+from app.services.document import SUPPORTED_DOCUMENT_EXTENSIONS
+
+
+def _source_language(value: str) -> str:
+    code = normalize_language(value)
+    if code is None:
+        raise ValueError(f"Unsupported source language: {value}")
+    return code
+
+
+def _target_language(value: str) -> str:
+    code = normalize_language(value)
+    if code is None or code == "auto":
+        raise ValueError(f"Unsupported target language: {value}")
+    return code
+
+
+# Accept codes, names and BCP-47 tags, and hand the endpoint the canonical code
+SourceLanguage = Annotated[str, AfterValidator(_source_language)]
+TargetLanguage = Annotated[str, AfterValidator(_target_language)]
+
+
+SUPPORTED_IMAGE_EXTENSIONS = ["jpg", "jpeg", "png", "gif", "bmp", "webp"]
+# Formats accepted by the transcription API
+SUPPORTED_AUDIO_EXTENSIONS = [
+    "flac", "m4a", "mp3", "mp4", "mpeg", "mpga", "oga", "ogg", "wav", "webm",
+]
+
+# Sent by clients that don't know a file's type; the extension decides instead
+GENERIC_CONTENT_TYPES = {"", "application/octet-stream"}
+
+DOCUMENT_CONTENT_TYPES = {
+    "pdf": {"application/pdf", "application/x-pdf"},
+    # Windows browsers report .csv files as Excel
+    "csv": {"text/csv", "application/csv", "application/vnd.ms-excel"},
+    "yaml": {"application/yaml", "application/x-yaml", "text/yaml", "text/x-yaml"},
+    "yml": {"application/yaml", "application/x-yaml", "text/yaml", "text/x-yaml"},
+}
+
+
+def _extension(filename: str) -> str:
+    return os.path.splitext(filename)[1].lower().lstrip(".")
+
+
+def _content_type(file: UploadFile) -> str:
+    return (file.content_type or "").split(";")[0].strip().lower()
+
+
+def _reject_type(detail: str):
+    raise HTTPException(status_code=415, detail=detail)
+
+
+def _check_size(file: UploadFile, max_bytes: int):
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File is too large: {file.size} bytes, the limit is {max_bytes} bytes",
+        )
+
+
+def _check_extension(extension: str, supported: Iterable[str], kind: str):
+    if extension not in supported:
+        _reject_type(
+            f"Unsupported {kind} type: .{extension}. Supported types: {', '.join(supported)}"
+        )
+
+
+def _check_document(file: UploadFile, max_bytes: int) -> UploadFile:
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Filename is required")
+
+    extension = _extension(file.filename)
+    _check_extension(extension, SUPPORTED_DOCUMENT_EXTENSIONS, "file")
+
+    content_type = _content_type(file)
+    allowed = DOCUMENT_CONTENT_TYPES.get(extension)
+    if allowed is None:
+        matches = content_type.startswith("text/")
+    else:
+        matches = content_type in allowed
+    if content_type not in GENERIC_CONTENT_TYPES and not matches:
+        _reject_type(f"Content type {content_type} does not match a .{extension} file")
+
+    _check_size(file, max_bytes)
+    return file
+
+
+async def document_upload(file: UploadFile = File(...)) -> UploadFile:
+    """A document upload with a supported extension, matching type and allowed size"""
+    return _check_document(file, settings.MAX_DOCUMENT_BYTES)
+
+
+async def job_document_upload(file: UploadFile = File(...)) -> UploadFile:
+    """A document upload for a background job, which allows larger files"""
+    return _check_document(file, settings.MAX_JOB_DOCUMENT_BYTES)
+
+
+def _check_image(file: UploadFile) -> UploadFile:
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Filename is required")
+
+    _check_extension(_extension(file.filename), SUPPORTED_IMAGE_EXTENSIONS, "image")
+
+    content_type = _content_type(file)
+    if content_type not in GENERIC_CONTENT_TYPES and not content_type.startswith("image/"):
+        _reject_type(f"Content type {content_type} is not an image")
+
+    _check_size(file, settings.MAX_IMAGE_BYTES)
+    return file
+
+
+async def image_upload(file: UploadFile = File(...)) -> UploadFile:
+    """An image upload with a supported extension, image type and allowed size"""
+    return _check_image(file)
+
+
+async def image_uploads(files: List[UploadFile] = File(...)) -> List[UploadFile]:
+    """Several image uploads, each checked as a single image, within the batch limits"""
+    if len(files) > settings.MAX_BATCH_IMAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many images: {len(files)}, the limit is {settings.MAX_BATCH_IMAGES}",
+        )
+
+    for file in files:
+        _check_image(file)
+
+    total = sum(file.size or 0 for file in files)
+    if total > settings.MAX_IMAGE_BATCH_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Images are too large: {total} bytes, the limit is {settings.MAX_IMAGE_BATCH_BYTES} bytes",
+        )
+    return files
+
+
+async def audio_upload(file: UploadFile = File(...)) -> UploadFile:
+    """An audio upload in a transcribable format and of allowed size"""
+    # Recorded blobs often arrive without an extension; their content type decides
+    extension = _extension(file.filename or "")
+    if extension:
+        _check_extension(extension, SUPPORTED_AUDIO_EXTENSIONS, "audio")
+
+    content_type = _content_type(file)
+    if content_type not in GENERIC_CONTENT_TYPES and not content_type.startswith(
+        ("audio/", "video/")
+    ):
+        _reject_type(f"Content type {content_type} is not audio")
+
+    _check_size(file, settings.MAX_AUDIO_BYTES)
+    return file
+
+
+async def check_callback_url(url: str) -> str:
+    """Raise ValueError unless the URL points at an allowed host or a public address"""
+    parsed = urlsplit(url)
+    schemes = ("https", "http") if settings.CALLBACK_ALLOW_HTTP else ("https",)
+    if parsed.scheme not in schemes or not parsed.hostname:
+        raise ValueError(f"Callback URL must be an absolute {' or '.join(schemes)} URL")
+
+    host = parsed.hostname.lower()
+    if settings.CALLBACK_ALLOWED_HOSTS:
+        if host not in settings.CALLBACK_ALLOWED_HOSTS:
+            raise ValueError(f"Callback host {host} is not allowed")
+        return url
+
+    # Every address the name resolves to must be public, so callbacks can't reach
+    # loopback, private networks or cloud metadata endpoints
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            host, parsed.port or (443 if parsed.scheme == "https" else 80)
+        )
+    except socket.gaierror:
+        raise ValueError(f"Callback host {host} could not be resolved")
+    if not all(ipaddress.ip_address(info[4][0]).is_global for info in addresses):
+        raise ValueError(f"Callback host {host} is not a public address")
+    return url
+
+
+async def job_callback_url(callback_url: Optional[str] = Form(None)) -> Optional[str]:
+    """A job's optional callback URL, checked when the job is created"""
+    if not callback_url:
+        return None
+    try:
+        return await check_callback_url(callback_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def upload_limits() -> Dict[str, int]:
+    """Largest accepted file per upload path"""
+    return {
+        "/v1/translate/document": settings.MAX_DOCUMENT_BYTES,
+        "/v1/translate/image": settings.MAX_IMAGE_BYTES,
+        "/v1/translate/image/stream": settings.MAX_IMAGE_BYTES,
+        "/v1/translate/images": settings.MAX_IMAGE_BATCH_BYTES,
+        "/v1/translate/audio": settings.MAX_AUDIO_BYTES,
+        "/v1/jobs/document": settings.MAX_JOB_DOCUMENT_BYTES,
+        "/v1/jobs/audio": settings.MAX_AUDIO_BYTES,
+    }
+
+
+class UploadLimitMiddleware:
+    """Rejects oversized or non-multipart uploads from their headers, before the body is read"""
+
+    def __init__(self, app):
+        self.app = app
+        self.limits = {
+            path: limit + settings.UPLOAD_OVERHEAD_BYTES
+            for path, limit in upload_limits().items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if limit is None or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        error = self._check_headers(headers, limit)
+        if error:
+            status_code, detail = error
+            await JSONResponse({"detail": detail}, status_code=status_code)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                # Chunked bodies carry no Content-Length, so their size is enforced as they stream
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=self._too_large(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _check_headers(self, headers: Dict[str, str], limit: int) -> Optional[Tuple[int, str]]:
+        content_type = headers.get("content-type", "").lower()
+        if not content_type.startswith("multipart/form-data"):
+            return 415, "Uploads must be sent as multipart/form-data"
+
+        content_length = headers.get("content-length")
+        if content_length is not None:
+            if not content_length.isdigit():
+                return 400, "Invalid Content-Length header"
+            if int(content_length) > limit:
+                return 413, self._too_large(limit)
+
+        return None
+
+    def _too_large(self, limit: int) -> str:
+        return f"Request body is too large, the limit is {limit - settings.UPLOAD_OVERHEAD_BYTES} bytes"
@@ -0,0 +1,41 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class WorkerPool:
+    """Process pool for CPU-bound work such as rendering PDF pages, started on first use"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # The executor's own default, kept so callers can size work without starting it
+        self.max_workers = settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned rather than forked, since the server process runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        """Run a picklable top-level function in a worker process"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+workers = WorkerPool()
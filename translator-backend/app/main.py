@@ -1,16 +1,63 @@
+from app.core import startup
+from app.core.config import settings
+
+# Installed before the remaining imports so their cost shows up in the report
+if settings.DEBUG:
+    startup.install_import_timer()
+
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.config import settings
+from app.core.clients import clients
+from app.core.compression import SelectiveGZipMiddleware
+from app.core.dependencies import get_broadcast_hub, get_job_service, preload_services
+from app.core.metrics import metrics
+from app.core.resilience import resilience
+from app.core.validation import UploadLimitMiddleware
+from app.core.workers import workers
 from app.router.v1.api import api_router
 
 
+async def warm_up():
+    """Build services and open upstream connections without delaying startup"""
+    try:
+        if settings.PRELOAD_SERVICES_ON_STARTUP:
+            await asyncio.to_thread(preload_services)
+        if settings.HTTP_WARM_UP_ON_STARTUP:
+            await clients.warm_up()
+    except Exception as e:
+        print(f"Warm up failed: {type(e).__name__}: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background work on startup, stop it and close clients on shutdown"""
+    warm_up_task = asyncio.create_task(warm_up())
+    job_service = get_job_service()
+    job_service.start()
+    if startup.import_timer:
+        startup.import_timer.mark_ready()
+    yield
+    warm_up_task.cancel()
+    await job_service.stop()
+    await get_broadcast_hub().close_all()
+    workers.shutdown()
+    await clients.aclose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
+    lifespan=lifespan,
 )
 
+# Added first so it runs inside CORS and its rejections still carry CORS headers
+app.add_middleware(UploadLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins="*",
@@ -19,6 +66,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(SelectiveGZipMiddleware)
+
 app.include_router(api_router, prefix="/v1")
 
 
@@ -32,3 +81,21 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Counters, latency histograms and circuit breaker states for this worker process"""
+    return {
+        **metrics.snapshot(),
+        "histograms": metrics.histogram_snapshot(),
+        "circuits": resilience.status(),
+    }
+
+
+if settings.DEBUG:
+
+    @app.get("/debug/startup")
+    async def startup_report(limit: int = 30):
+        """Per-module import cost measured since process start (debug mode only)"""
+        return startup.import_timer.report(limit=limit)
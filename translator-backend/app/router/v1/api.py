@@ -1,6 +1,8 @@
 from fastapi import APIRouter
-from app.router.v1.endpoints import translate
+from app.router.v1.endpoints import glossary, jobs, translate
 
 api_router = APIRouter()
 
 api_router.include_router(translate.router, prefix="/translate", tags=["translation"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(glossary.router, prefix="/glossary", tags=["glossary"])
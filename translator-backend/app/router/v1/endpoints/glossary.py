@@ -0,0 +1,90 @@
+from fastapi import APIRouter, HTTPException, Query, Depends
+from app.schemas.glossary import GlossaryCreateRequest, GlossaryResponse
+from app.services.database import DatabaseService
+from app.services.glossary import GlossaryService
+from app.core.auth import get_current_user_with_token
+from app.core.dependencies import get_database_service, get_glossary_service
+from app.core.languages import is_supported_language
+from typing import Dict, Any
+
+router = APIRouter()
+
+
+@router.get("", response_model=GlossaryResponse)
+async def get_glossary(
+    project: str = Query("default", min_length=1, max_length=100),
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    database_service: DatabaseService = Depends(get_database_service),
+):
+    """Get the entries of one of the user's glossary projects"""
+    current_user, access_token = user_data
+
+    try:
+        entries = await database_service.get_glossary_entries(
+            user_id=current_user["sub"],
+            project=project,
+            access_token=access_token
+        )
+        return GlossaryResponse(project=project, entries=entries)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("", response_model=GlossaryResponse, status_code=201)
+async def add_glossary_entries(
+    request: GlossaryCreateRequest,
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    database_service: DatabaseService = Depends(get_database_service),
+    glossary_service: GlossaryService = Depends(get_glossary_service),
+):
+    """Add entries to one of the user's glossary projects"""
+    current_user, access_token = user_data
+
+    for entry in request.entries:
+        if not is_supported_language(entry.target_lang) or entry.target_lang == "auto":
+            raise HTTPException(
+                status_code=400, detail=f"Unsupported target language: {entry.target_lang}"
+            )
+
+    try:
+        entries = await database_service.save_glossary_entries(
+            user_id=current_user["sub"],
+            project=request.project,
+            entries=[entry.model_dump() for entry in request.entries],
+            access_token=access_token
+        )
+        glossary_service.invalidate(current_user["sub"])
+        return GlossaryResponse(project=request.project, entries=entries)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{entry_id}")
+async def delete_glossary_entry(
+    entry_id: str,
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    database_service: DatabaseService = Depends(get_database_service),
+    glossary_service: GlossaryService = Depends(get_glossary_service),
+):
+    """Delete an entry from one of the user's glossaries"""
+    current_user, access_token = user_data
+
+    try:
+        success = await database_service.delete_glossary_entry(
+            entry_id=entry_id,
+            user_id=current_user["sub"],
+            access_token=access_token
+        )
+
+        if not success:
+            raise HTTPException(
+                status_code=404,
+                detail="Glossary entry not found or you don't have permission to delete it"
+            )
+
+        glossary_service.invalidate(current_user["sub"])
+        return {"message": "Glossary entry deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
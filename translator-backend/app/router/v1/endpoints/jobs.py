@@ -0,0 +1,175 @@
+import os
+from fastapi import APIRouter, HTTPException, UploadFile, Form, Depends
+from app.schemas.jobs import JobResponse
+from app.services.document import (
+    ScannedPdfError,
+    extract_document_text,
+    get_document_extension,
+)
+from app.services.jobs import JobService, job_response
+from app.services.structured import parse_document
+from app.services.tokens import TokenBudget, TokenBudgetExceeded
+from app.services.translator import TranslatorService
+from app.core.auth import get_current_user_with_token
+from app.core.config import settings
+from app.core.dependencies import (
+    get_job_service,
+    get_token_budget,
+    get_translator_service,
+)
+from app.core.validation import (
+    SourceLanguage,
+    TargetLanguage,
+    audio_upload,
+    job_callback_url,
+    job_document_upload,
+)
+from typing import Annotated, Optional, Dict, Any
+
+router = APIRouter()
+
+
+@router.post("/document", response_model=JobResponse, status_code=202)
+async def submit_document_job(
+    file: UploadFile = Depends(job_document_upload),
+    target_lang: Annotated[TargetLanguage, Form()] = "en",
+    source_lang: Annotated[SourceLanguage, Form()] = "auto",
+    callback_url: Optional[str] = Depends(job_callback_url),
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    job_service: JobService = Depends(get_job_service),
+    translator_service: TranslatorService = Depends(get_translator_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
+):
+    """Submit a document for background translation and return the job immediately"""
+    current_user, _ = user_data
+
+    file_extension = get_document_extension(file.filename)
+    document_content = await file.read()
+    try:
+        text_content = extract_document_text(document_content, file_extension)
+    except ScannedPdfError as e:
+        if not settings.PDF_OCR_ENABLED or e.page_count > settings.PDF_OCR_MAX_PAGES:
+            raise HTTPException(status_code=400, detail=str(e))
+        return await _submit_scanned_pdf_job(
+            document_content,
+            e.page_count,
+            file.filename,
+            source_lang,
+            target_lang,
+            callback_url,
+            current_user,
+            job_service,
+            translator_service,
+            token_budget,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Large documents are chunked by the worker, so only the user's budget applies here
+    estimate = translator_service.estimate_document_tokens(
+        text_content, [target_lang], parse_document(text_content, file_extension)
+    )
+    try:
+        await token_budget.check_user(current_user["sub"], estimate["total_tokens"])
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    job = await job_service.submit(
+        user_id=current_user["sub"],
+        kind="document",
+        payload={
+            "text": text_content,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "filename": file.filename,
+            "document_type": file_extension,
+        },
+        callback_url=callback_url,
+    )
+    return job_response(job)
+
+
+async def _submit_scanned_pdf_job(
+    document_content: bytes,
+    page_count: int,
+    filename: str,
+    source_lang: str,
+    target_lang: str,
+    callback_url: Optional[str],
+    current_user: Dict[str, Any],
+    job_service: JobService,
+    translator_service: TranslatorService,
+    token_budget: TokenBudget,
+) -> Dict[str, Any]:
+    """Queue a PDF without a text layer; the worker renders and reads its pages"""
+    estimate = translator_service.estimate_image_tokens(page_count)
+    try:
+        await token_budget.check_user(current_user["sub"], estimate["total_tokens"])
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    file_path = await job_service.save_file(document_content, ".pdf")
+
+    job = await job_service.submit(
+        user_id=current_user["sub"],
+        kind="document",
+        payload={
+            "file_path": file_path,
+            "page_count": page_count,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "filename": filename,
+            "document_type": "pdf",
+        },
+        callback_url=callback_url,
+    )
+    return job_response(job)
+
+
+@router.post("/audio", response_model=JobResponse, status_code=202)
+async def submit_audio_job(
+    file: UploadFile = Depends(audio_upload),
+    target_lang: Annotated[Optional[TargetLanguage], Form()] = "en",
+    callback_url: Optional[str] = Depends(job_callback_url),
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    job_service: JobService = Depends(get_job_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
+):
+    """Submit an audio file for background transcription and translation"""
+    current_user, _ = user_data
+
+    try:
+        await token_budget.check_user(current_user["sub"], 0)
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    suffix = os.path.splitext(file.filename or "")[1] or ".wav"
+    file_path = await job_service.save_file(await file.read(), suffix)
+
+    job = await job_service.submit(
+        user_id=current_user["sub"],
+        kind="audio",
+        payload={
+            "file_path": file_path,
+            "target_lang": target_lang,
+            "filename": file.filename,
+        },
+        callback_url=callback_url,
+    )
+    return job_response(job)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    job_service: JobService = Depends(get_job_service),
+):
+    """Get the status, progress and result of a background job"""
+    current_user, _ = user_data
+
+    job = await job_service.get(job_id)
+    if not job or job["user_id"] != current_user["sub"]:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job_response(job)
@@ -1,190 +1,504 @@
 import asyncio
 import base64
+import csv
+import hashlib
 import json
 import io
+import zlib
 from fastapi import (
     APIRouter,
     HTTPException,
-    File,
     UploadFile,
     Form,
+    Query,
+    Request,
+    Response,
     WebSocket,
     WebSocketDisconnect,
     Depends,
 )
+from fastapi.responses import StreamingResponse
 from app.schemas.translate import (
     TextTranslateRequest,
     TextTranslateResponse,
     DocumentTranslateResponse,
     ImageTranslateResponse,
+    ImageBatchTranslateResponse,
+    TokenEstimateRequest,
+    TokenEstimateResponse,
 )
 from app.services.translator import TranslatorService
-from app.services.audio import AudioService
+from app.services.audio import (
+    REALTIME_AUDIO_FORMATS,
+    REALTIME_OUTPUT_MODES,
+    AudioService,
+)
+from app.services.broadcast import BroadcastHub, Listener
 from app.services.database import DatabaseService
+from app.services.document import (
+    ScannedPdfError,
+    extract_document_text,
+    get_document_extension,
+    render_pdf_pages,
+)
+from app.services.glossary import Glossary, GlossaryService
+from app.services.structured import parse_document
+from app.services.tokens import TokenBudget, TokenBudgetExceeded
 from app.core.auth import get_current_user, get_current_user_with_token
-from typing import Optional, Dict, Any
-import PyPDF2
+from app.core.cancellation import cancel_on_disconnect
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.validation import (
+    SourceLanguage,
+    TargetLanguage,
+    audio_upload,
+    document_upload,
+    image_upload,
+    image_uploads,
+)
+from app.core.dependencies import (
+    get_audio_service,
+    get_broadcast_hub,
+    get_database_service,
+    get_glossary_service,
+    get_token_budget,
+    get_translator_service,
+)
+from app.core.languages import (
+    get_supported_languages as list_supported_languages,
+    normalize_language,
+)
+from typing import Annotated, Optional, Dict, Any, List
 
 router = APIRouter()
-translator_service = TranslatorService()
-audio_service = AudioService()
-database_service = DatabaseService()
 
 
-@router.post("/text", response_model=TextTranslateResponse)
+def _etag(body: bytes) -> str:
+    """Weak ETag derived from the serialized response body"""
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _json_bytes_response(
+    request: Request, body: bytes, etag: str, cache_control: str
+) -> Response:
+    """Return pre-serialized JSON, or 304 when the client already has this version"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+LANGUAGES_BODY = json.dumps(
+    {"languages": list_supported_languages()}
+).encode("utf-8")
+LANGUAGES_ETAG = _etag(LANGUAGES_BODY)
+
+
+def _glossary_violations(
+    translations: Dict[str, str], glossary_terms: Dict[str, Dict[str, str]]
+) -> Optional[Dict[str, List[str]]]:
+    """Required glossary terms missing from each translation, or None if all are present"""
+    violations = {}
+    for lang, translated_text in translations.items():
+        missing = Glossary.missing_terms(translated_text, glossary_terms.get(lang, {}))
+        if missing:
+            violations[lang] = missing
+
+    if violations:
+        metrics.increment("glossary_violations", "total", len(violations))
+    return violations or None
+
+
+@router.post(
+    "/text", response_model=TextTranslateResponse, response_model_exclude_none=True
+)
 async def translate_text(
     request: TextTranslateRequest,
-    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token)
+    http_request: Request,
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    translator_service: TranslatorService = Depends(get_translator_service),
+    database_service: DatabaseService = Depends(get_database_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
+    glossary_service: GlossaryService = Depends(get_glossary_service),
 ):
     """Translate text from source language to target language"""
     current_user, access_token = user_data
     
     try:
-        result = await translator_service.text_translate(
-            text=request.text,
-            source_lang=request.source_lang,
-            target_lang=request.target_lang,
+        source_lang = translator_service.detect_source_language(
+            request.text, request.source_lang
+        )
+        target_langs = request.target_langs or [request.target_lang]
+        estimate = translator_service.estimate_text_tokens(request.text, target_langs)
+        glossary_terms = await glossary_service.lookup(
+            current_user["sub"],
+            request.glossary_project,
+            access_token,
+            request.text,
+            target_langs,
         )
+
+        if request.target_langs:
+            async with token_budget.reserve(current_user["sub"], estimate):
+                translations = await cancel_on_disconnect(
+                    http_request,
+                    translator_service.text_translate_many(
+                        text=request.text,
+                        source_lang=source_lang,
+                        target_langs=request.target_langs,
+                        glossary_terms=glossary_terms,
+                    ),
+                )
+
+            try:
+                await database_service.save_translations(
+                    user_id=current_user["sub"],
+                    input_text=request.text,
+                    translations=translations,
+                    source_lang=source_lang,
+                    modality="text",
+                    access_token=access_token,
+                    prompt_version=translator_service.multi_target_prompt_version(
+                        request.text, request.target_langs
+                    )
+                )
+            except Exception as db_error:
+                print(f"Failed to save translations to database: {db_error}")
+
+            first_target = request.target_langs[0]
+            return TextTranslateResponse(
+                translated_text=translations[first_target],
+                source_lang=source_lang,
+                target_lang=first_target,
+                original_text=request.text if request.include_original_text else None,
+                translations=translations,
+                glossary_violations=_glossary_violations(translations, glossary_terms),
+            )
+
+        async with token_budget.reserve(current_user["sub"], estimate):
+            result = await cancel_on_disconnect(
+                http_request,
+                translator_service.text_translate(
+                    text=request.text,
+                    source_lang=source_lang,
+                    target_lang=request.target_lang,
+                    glossary_terms=glossary_terms.get(request.target_lang),
+                ),
+            )
         
         try:
             await database_service.save_translation(
                 user_id=current_user["sub"],
                 input_text=request.text,
                 output_text=result,
-                source_lang=request.source_lang,
+                source_lang=source_lang,
                 target_lang=request.target_lang,
                 modality="text",
-                access_token=access_token
+                access_token=access_token,
+                prompt_version=translator_service.prompt_version("text")
             )
         except Exception as db_error:
             print(f"Failed to save translation to database: {db_error}")
         
         return TextTranslateResponse(
             translated_text=result,
-            source_lang=request.source_lang,
+            source_lang=source_lang,
             target_lang=request.target_lang,
-            original_text=request.text,
+            original_text=request.text if request.include_original_text else None,
+            glossary_violations=_glossary_violations(
+                {request.target_lang: result}, glossary_terms
+            ),
         )
+    except HTTPException:
+        raise
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/document", response_model=DocumentTranslateResponse)
-async def translate_document(
-    file: UploadFile = File(...),
-    target_lang: str = Form("en"),
-    source_lang: str = Form("auto"),
-    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+@router.post("/estimate", response_model=TokenEstimateResponse)
+async def estimate_tokens(
+    request: TokenEstimateRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    translator_service: TranslatorService = Depends(get_translator_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
 ):
-    """Upload and translate document file (supports .txt, .md, .csv, .yaml, .yml, .pdf)"""
-    current_user, access_token = user_data
+    """Estimate the tokens a text translation would use and check it against the budgets"""
+    estimate = translator_service.estimate_text_tokens(
+        request.text, request.target_langs or [request.target_lang]
+    )
 
     try:
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="Filename is required")
+        token_budget.check_request(estimate)
+        within_request_limit = True
+    except TokenBudgetExceeded:
+        within_request_limit = False
 
-        file_extension = file.filename.lower().split(".")[-1]
-        supported_extensions = ["txt", "md", "csv", "yaml", "yml", "pdf"]
+    used = await token_budget.used(current_user["sub"])
+    budget = settings.USER_TOKEN_BUDGET
 
-        if file_extension not in supported_extensions:
-            error_msg = f"Unsupported file type: .{file_extension}. Supported types: {', '.join(supported_extensions)}"
-            raise HTTPException(status_code=400, detail=error_msg)
+    return TokenEstimateResponse(
+        prompt_tokens=estimate["prompt_tokens"],
+        completion_tokens=estimate["completion_tokens"],
+        total_tokens=estimate["total_tokens"],
+        max_request_tokens=settings.MAX_REQUEST_TOKENS,
+        within_request_limit=within_request_limit,
+        user_tokens_used=used,
+        user_token_budget=budget,
+        within_user_budget=budget <= 0 or used + estimate["total_tokens"] <= budget,
+    )
 
-        document_content = await file.read()
-        text_content = ""
 
-        if file_extension == "pdf":
-            try:
-                pdf_file = io.BytesIO(document_content)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
+@router.post(
+    "/document",
+    response_model=DocumentTranslateResponse,
+    response_model_exclude_none=True,
+)
+async def translate_document(
+    http_request: Request,
+    file: UploadFile = Depends(document_upload),
+    target_lang: Annotated[TargetLanguage, Form()] = "en",
+    source_lang: Annotated[SourceLanguage, Form()] = "auto",
+    target_langs: Annotated[Optional[List[TargetLanguage]], Form()] = None,
+    glossary_project: Optional[str] = Form(None),
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    translator_service: TranslatorService = Depends(get_translator_service),
+    database_service: DatabaseService = Depends(get_database_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
+    glossary_service: GlossaryService = Depends(get_glossary_service),
+):
+    """Upload and translate document file (supports .txt, .md, .csv, .yaml, .yml, .pdf)"""
+    current_user, access_token = user_data
 
-                text_content = ""
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text() + "\n"
+    try:
+        try:
+            file_extension = get_document_extension(file.filename)
+            document_content = await file.read()
+            text_content = extract_document_text(document_content, file_extension)
+        except ScannedPdfError as e:
+            if not settings.PDF_OCR_ENABLED:
+                raise HTTPException(status_code=400, detail=str(e))
+            return await _translate_scanned_pdf(
+                http_request,
+                document_content,
+                e.page_count,
+                file.filename,
+                source_lang,
+                target_langs or [target_lang],
+                bool(target_langs),
+                current_user,
+                access_token,
+                translator_service,
+                database_service,
+                token_budget,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-                if not text_content.strip():
-                    raise HTTPException(
-                        status_code=400,
-                        detail="No text could be extracted from the PDF",
-                    )
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400, detail=f"Error processing PDF: {str(e)}"
+        # Parsed once here and passed on, rather than by each step that needs it
+        document = parse_document(text_content, file_extension)
+        detected_lang = translator_service.detect_document_language(
+            text_content, source_lang, document
+        )
+        estimate = translator_service.estimate_document_tokens(
+            text_content, target_langs or [target_lang], document
+        )
+        glossary_terms = await glossary_service.lookup(
+            current_user["sub"],
+            glossary_project,
+            access_token,
+            text_content,
+            target_langs or [target_lang],
+        )
+
+        if target_langs:
+            async with token_budget.reserve(current_user["sub"], estimate):
+                translations = await cancel_on_disconnect(
+                    http_request,
+                    translator_service.document_translate_many(
+                        document_content=text_content,
+                        source_lang=detected_lang,
+                        target_langs=target_langs,
+                        glossary_terms=glossary_terms,
+                        document=document,
+                    ),
                 )
-        else:
+
             try:
-                text_content = document_content.decode("utf-8")
-            except UnicodeDecodeError:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Unable to decode file. Please ensure it's a valid text file in UTF-8 encoding.",
+                await database_service.save_translations(
+                    user_id=current_user["sub"],
+                    input_text=text_content,
+                    translations=translations,
+                    source_lang=detected_lang,
+                    modality="document",
+                    access_token=access_token,
+                    prompt_version=translator_service.document_prompt_version(document)
                 )
+            except Exception as db_error:
+                print(f"Failed to save translations to database: {db_error}")
 
-        if not text_content.strip():
-            raise HTTPException(status_code=400, detail="Document appears to be empty")
+            return DocumentTranslateResponse(
+                translated_text=translations[target_langs[0]],
+                source_lang=detected_lang,
+                target_lang=target_langs[0],
+                original_filename=file.filename,
+                document_type=file_extension,
+                translations=translations,
+                glossary_violations=_glossary_violations(translations, glossary_terms),
+            )
 
-        translated_content = await translator_service.document_translate(
-            document_content=text_content,
-            source_lang=source_lang,
-            target_lang=target_lang,
-        )
+        async with token_budget.reserve(current_user["sub"], estimate):
+            translated_content = await cancel_on_disconnect(
+                http_request,
+                translator_service.document_translate(
+                    document_content=text_content,
+                    source_lang=detected_lang,
+                    target_lang=target_lang,
+                    glossary_terms=glossary_terms.get(target_lang),
+                    document=document,
+                ),
+            )
 
         try:
             await database_service.save_translation(
                 user_id=current_user["sub"],
                 input_text=text_content,
                 output_text=translated_content,
-                source_lang=source_lang,
+                source_lang=detected_lang,
                 target_lang=target_lang,
                 modality="document",
-                access_token=access_token
+                access_token=access_token,
+                prompt_version=translator_service.document_prompt_version(document)
             )
         except Exception as db_error:
             print(f"Failed to save translation to database: {db_error}")
 
         return DocumentTranslateResponse(
             translated_text=translated_content,
-            source_lang=source_lang,
+            source_lang=detected_lang,
             target_lang=target_lang,
             original_filename=file.filename,
             document_type=file_extension,
+            glossary_violations=_glossary_violations(
+                {target_lang: translated_content}, glossary_terms
+            ),
         )
     except HTTPException:
         raise
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _translate_scanned_pdf(
+    http_request: Request,
+    document_content: bytes,
+    page_count: int,
+    filename: str,
+    source_lang: str,
+    target_langs: List[str],
+    multiple_targets: bool,
+    current_user: Dict[str, Any],
+    access_token: str,
+    translator_service: TranslatorService,
+    database_service: DatabaseService,
+    token_budget: TokenBudget,
+) -> DocumentTranslateResponse:
+    """Translate a PDF without a text layer by reading its rendered pages with the vision model"""
+    targets = list(dict.fromkeys(target_langs))
+
+    # Pages are read and translated into the first target in one vision call each;
+    # any further targets are translated from the extracted text
+    async with token_budget.reserve(
+        current_user["sub"], translator_service.estimate_image_tokens(page_count)
+    ):
+        try:
+            pages = await render_pdf_pages(document_content, page_count)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        result = await cancel_on_disconnect(
+            http_request,
+            translator_service.scanned_pdf_translate(pages, source_lang, targets[0]),
+        )
+        extracted_text = result["extracted_text"]
+        if not extracted_text:
+            raise HTTPException(
+                status_code=400, detail="No text could be extracted from the PDF"
+            )
+
+        source_lang = translator_service.detect_source_language(extracted_text, source_lang)
+        translations = {targets[0]: result["translated_text"]}
+        if len(targets) > 1:
+            translations.update(
+                await cancel_on_disconnect(
+                    http_request,
+                    translator_service.document_translate_many(
+                        document_content=extracted_text,
+                        source_lang=source_lang,
+                        target_langs=targets[1:],
+                    ),
+                )
+            )
+
+    try:
+        await database_service.save_translations(
+            user_id=current_user["sub"],
+            input_text=extracted_text,
+            translations=translations,
+            source_lang=source_lang,
+            modality="document",
+            access_token=access_token,
+            prompt_version=translator_service.prompt_version("image")
+        )
+    except Exception as db_error:
+        print(f"Failed to save translations to database: {db_error}")
+
+    return DocumentTranslateResponse(
+        translated_text=translations[targets[0]],
+        source_lang=source_lang,
+        target_lang=targets[0],
+        original_filename=filename,
+        document_type="pdf",
+        translations=translations if multiple_targets else None,
+    )
+
+
 @router.post("/image", response_model=ImageTranslateResponse)
 async def translate_image(
-    file: UploadFile = File(...),
-    target_lang: str = Form("en"),
-    source_lang: str = Form("auto"),
+    http_request: Request,
+    file: UploadFile = Depends(image_upload),
+    target_lang: Annotated[TargetLanguage, Form()] = "en",
+    source_lang: Annotated[SourceLanguage, Form()] = "auto",
     user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    translator_service: TranslatorService = Depends(get_translator_service),
+    database_service: DatabaseService = Depends(get_database_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
 ):
     """Upload and translate text from image file (supports .jpg, .jpeg, .png, .gif, .bmp, .webp)"""
     current_user, access_token = user_data
 
     try:
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="Filename is required")
-
         file_extension = file.filename.lower().split(".")[-1]
-        supported_extensions = ["jpg", "jpeg", "png", "gif", "bmp", "webp"]
-
-        if file_extension not in supported_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported image type: .{file_extension}. Supported types: {', '.join(supported_extensions)}",
-            )
-
         image_content = await file.read()
 
         image_base64 = base64.b64encode(image_content).decode("utf-8")
 
-        result = await translator_service.image_translate(
-            image_base64=image_base64, source_lang=source_lang, target_lang=target_lang
-        )
+        async with token_budget.reserve(
+            current_user["sub"], translator_service.estimate_image_tokens()
+        ):
+            result = await cancel_on_disconnect(
+                http_request,
+                translator_service.image_translate(
+                    image_base64=image_base64,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                ),
+            )
 
         extracted_text = result.get("extracted_text", "")
         translated_text = result.get("translated_text", "")
@@ -194,18 +508,10 @@ async def translate_image(
                 status_code=400, detail="No text could be extracted from the image"
             )
 
-        try:
-            await database_service.save_translation(
-                user_id=current_user["sub"],
-                input_text=extracted_text,
-                output_text=translated_text,
-                source_lang=source_lang,
-                target_lang=target_lang,
-                modality="image",
-                access_token=access_token
-            )
-        except Exception as db_error:
-            print(f"Failed to save translation to database: {db_error}")
+        await _save_image_translation(
+            result, source_lang, target_lang, current_user, access_token,
+            translator_service, database_service
+        )
 
         return ImageTranslateResponse(
             extracted_text=extracted_text,
@@ -217,15 +523,203 @@ async def translate_image(
         )
     except HTTPException:
         raise
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/image/stream")
+async def translate_image_stream(
+    file: UploadFile = Depends(image_upload),
+    target_lang: Annotated[TargetLanguage, Form()] = "en",
+    source_lang: Annotated[SourceLanguage, Form()] = "auto",
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    translator_service: TranslatorService = Depends(get_translator_service),
+    database_service: DatabaseService = Depends(get_database_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
+):
+    """Translate text from an image as NDJSON events, sending the extracted text before the translation"""
+    current_user, access_token = user_data
+    file_extension = file.filename.lower().split(".")[-1]
+    image_base64 = base64.b64encode(await file.read()).decode("utf-8")
+    estimate = translator_service.estimate_image_tokens()
+
+    # Checked before the response starts, so budget errors keep their status codes
+    try:
+        token_budget.check_request(estimate)
+        await token_budget.check_user(current_user["sub"], estimate["total_tokens"])
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    async def generate_events():
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def on_extracted(text: str):
+            await events.put({"event": "extracted_text", "extracted_text": text})
+
+        async def run():
+            async with token_budget.reserve(current_user["sub"], estimate):
+                return await translator_service.image_translate(
+                    image_base64=image_base64,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    on_extracted=on_extracted,
+                )
+
+        task = asyncio.create_task(run())
+        task.add_done_callback(lambda _: events.put_nowait(None))
+
+        try:
+            while (event := await events.get()) is not None:
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+            try:
+                result = task.result()
+            except TokenBudgetExceeded as e:
+                event = {"event": "error", "status_code": e.status_code, "detail": e.detail}
+            except Exception as e:
+                event = {"event": "error", "status_code": 500, "detail": str(e)}
+            else:
+                if result.get("extracted_text", "").strip():
+                    await _save_image_translation(
+                        result, source_lang, target_lang, current_user, access_token,
+                        translator_service, database_service
+                    )
+                event = {
+                    "event": "result",
+                    **ImageTranslateResponse(
+                        extracted_text=result.get("extracted_text", ""),
+                        translated_text=result.get("translated_text", ""),
+                        source_lang=source_lang,
+                        target_lang=target_lang,
+                        original_filename=file.filename,
+                        image_type=file_extension,
+                    ).model_dump(),
+                }
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+        finally:
+            # The client went away mid-stream; stop the upstream call
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(generate_events(), media_type="application/x-ndjson")
+
+
+async def _save_image_translation(
+    result: Dict[str, Any],
+    source_lang: str,
+    target_lang: str,
+    current_user: Dict[str, Any],
+    access_token: str,
+    translator_service: TranslatorService,
+    database_service: DatabaseService,
+):
+    """Record an image translation, with the prompt of the engine that read the image"""
+    try:
+        await database_service.save_translation(
+            user_id=current_user["sub"],
+            input_text=result["extracted_text"],
+            output_text=result.get("translated_text", ""),
+            source_lang=source_lang,
+            target_lang=target_lang,
+            modality="image",
+            access_token=access_token,
+            prompt_version=translator_service.prompt_version(
+                "text" if result.get("ocr_engine") == "local" else "image"
+            )
+        )
+    except Exception as db_error:
+        print(f"Failed to save translation to database: {db_error}")
+
+
+@router.post("/images", response_model=ImageBatchTranslateResponse)
+async def translate_images(
+    http_request: Request,
+    files: List[UploadFile] = Depends(image_uploads),
+    target_lang: Annotated[TargetLanguage, Form()] = "en",
+    source_lang: Annotated[SourceLanguage, Form()] = "auto",
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    translator_service: TranslatorService = Depends(get_translator_service),
+    database_service: DatabaseService = Depends(get_database_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
+):
+    """Upload several images and translate the text in each, packing them into shared vision requests"""
+    current_user, access_token = user_data
+
+    try:
+        images_base64 = [
+            base64.b64encode(await file.read()).decode("utf-8") for file in files
+        ]
+
+        async with token_budget.reserve(
+            current_user["sub"], translator_service.estimate_image_tokens(len(files))
+        ):
+            results = await cancel_on_disconnect(
+                http_request,
+                translator_service.image_translate_many(
+                    images_base64=images_base64,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                ),
+            )
+
+        # Images without text come back empty rather than failing the whole batch
+        records = {}
+        for result in results:
+            if result.get("extracted_text", "").strip():
+                engine = "text" if result.get("ocr_engine") == "local" else "image"
+                records.setdefault(engine, []).append(
+                    {
+                        "input_text": result["extracted_text"],
+                        "output_text": result.get("translated_text", ""),
+                        "source_lang": source_lang,
+                        "target_lang": target_lang,
+                    }
+                )
+
+        for engine, engine_records in records.items():
+            try:
+                await database_service.save_translation_batch(
+                    user_id=current_user["sub"],
+                    records=engine_records,
+                    modality="image",
+                    access_token=access_token,
+                    prompt_version=translator_service.prompt_version(engine)
+                )
+            except Exception as db_error:
+                print(f"Failed to save translations to database: {db_error}")
+
+        return ImageBatchTranslateResponse(
+            results=[
+                ImageTranslateResponse(
+                    extracted_text=result.get("extracted_text", ""),
+                    translated_text=result.get("translated_text", ""),
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    original_filename=file.filename,
+                    image_type=file.filename.lower().split(".")[-1],
+                )
+                for file, result in zip(files, results)
+            ]
+        )
+    except HTTPException:
+        raise
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/audio")
 async def translate_audio(
-    file: UploadFile = File(...),
-    target_lang: Optional[str] = Form("en"),
+    http_request: Request,
+    file: UploadFile = Depends(audio_upload),
+    target_lang: Annotated[Optional[TargetLanguage], Form()] = "en",
     user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    audio_service: AudioService = Depends(get_audio_service),
+    database_service: DatabaseService = Depends(get_database_service),
+    token_budget: TokenBudget = Depends(get_token_budget),
 ):
     """Upload and process audio file for transcription and optional translation"""
     current_user, access_token = user_data
@@ -233,7 +727,12 @@ async def translate_audio(
     try:
         audio_content = await file.read()
 
-        result = await audio_service.process_audio_file(audio_content, target_lang)
+        # The transcript length isn't known up front, so only the user's budget is checked
+        async with token_budget.reserve(current_user["sub"]):
+            result = await cancel_on_disconnect(
+                http_request,
+                audio_service.process_audio_file(audio_content, target_lang),
+            )
 
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -247,10 +746,11 @@ async def translate_audio(
                     user_id=current_user["sub"],
                     input_text=transcribed_text,
                     output_text=translated_text,
-                    source_lang="auto",  # Audio transcription auto-detects language
+                    source_lang=result.get("source_lang", "auto"),
                     target_lang=target_lang,
                     modality="audio",
-                    access_token=access_token
+                    access_token=access_token,
+                    prompt_version=audio_service.translator.prompt_version("text")
                 )
             except Exception as db_error:
                 print(f"Failed to save translation to database: {db_error}")
@@ -258,34 +758,34 @@ async def translate_audio(
         return {
             "transcribed_text": transcribed_text,
             "translated_text": translated_text,
+            "source_lang": result.get("source_lang", "auto"),
             "target_lang": target_lang,
             "original_filename": file.filename,
         }
+    except HTTPException:
+        raise
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.websocket("/audio/realtime")
-async def websocket_realtime_audio(websocket: WebSocket):
+async def websocket_realtime_audio(
+    websocket: WebSocket,
+    audio_service: AudioService = Depends(get_audio_service),
+    database_service: DatabaseService = Depends(get_database_service),
+):
     """WebSocket endpoint for real-time audio translation using OpenAI Realtime API"""
 
-    token = websocket.query_params.get("token")
-    if not token:
-        await websocket.close(code=1008, reason="Authentication token required")
+    user_data = await _authenticate_websocket(websocket)
+    if user_data is None:
         return
+    token = websocket.query_params.get("token")
 
-    try:
-        from app.core.auth import supabase_auth
-        user_data = await supabase_auth.verify_token(token)
-        print(f"WebSocket authenticated user: {user_data.get('sub')}")
-    except Exception as e:
-        print(f"WebSocket authentication failed: {e}")
-        await websocket.close(code=1008, reason="Invalid authentication token")
-        return
-    
     await websocket.accept()
 
-    realtime_service = audio_service.get_realtime_service()
+    realtime_service = audio_service.new_realtime_service()
     target_language = "en"  # Default to English
     session_initialized = False
     
@@ -319,6 +819,9 @@ async def websocket_realtime_audio(websocket: WebSocket):
         await websocket.close()
         return
 
+    async def send_stats(stats: Dict[str, Any]):
+        await websocket.send_text(json.dumps({"type": "stats", **stats}))
+
     async def handle_openai_response(data: dict):
         """Handle responses from OpenAI Realtime API"""
         nonlocal session_initialized, current_transcript, current_translation
@@ -362,6 +865,18 @@ async def websocket_realtime_audio(websocket: WebSocket):
                 await websocket.send_text(
                     json.dumps({"type": "speech_stopped", "message": "Speech ended"})
                 )
+            elif event_type == "upstream.reconnected":
+                # The response in progress when the connection dropped won't complete
+                current_translation = ""
+                await websocket.send_text(
+                    json.dumps(
+                        {
+                            "type": "reconnected",
+                            "message": "Reconnected to OpenAI Realtime API",
+                            "replayed_bytes": data.get("replayed_bytes", 0),
+                        }
+                    )
+                )
             elif event_type == "conversation.item.created":
                 item = data.get("item", {})
                 print(f"Conversation item created: {item.get('type')}")
@@ -414,6 +929,9 @@ async def websocket_realtime_audio(websocket: WebSocket):
                     current_translation = delta
                 else:
                     current_translation += delta
+                # Audio-only clients don't display captions
+                if realtime_service.output_mode == "audio":
+                    return
                 await websocket.send_text(
                     json.dumps(
                         {"type": "translation_delta", "text": delta, "is_final": False}
@@ -422,11 +940,12 @@ async def websocket_realtime_audio(websocket: WebSocket):
             elif event_type == "response.audio_transcript.done":
                 transcript = data.get("transcript", "")
                 current_translation = transcript
-                await websocket.send_text(
-                    json.dumps(
-                        {"type": "translation", "text": transcript, "is_final": True}
+                if realtime_service.output_mode != "audio":
+                    await websocket.send_text(
+                        json.dumps(
+                            {"type": "translation", "text": transcript, "is_final": True}
+                        )
                     )
-                )
                 print(f"Attempting to save real-time translation: transcript='{current_transcript[:50]}...', translation='{current_translation[:50]}...'")
                 await save_realtime_translation()
             elif event_type == "response.audio.delta":
@@ -503,14 +1022,50 @@ async def websocket_realtime_audio(websocket: WebSocket):
                 message_type = message.get("type")
 
                 if message_type == "config":
-                    target_language = message.get("target_lang", "en")
+                    # Clients opt in to per-turn latency reports
+                    if "stats" in message:
+                        realtime_service.on_stats = send_stats if message["stats"] else None
+
+                    requested_language = message.get("target_lang", target_language)
+                    output_mode = message.get("output", realtime_service.output_mode)
+                    audio_format = message.get(
+                        "audio_format", realtime_service.session_config["output_audio_format"]
+                    )
+                    code = normalize_language(str(requested_language))
+                    if code is None or code == "auto":
+                        config_error = f"Unsupported target language: {requested_language}"
+                    elif output_mode not in REALTIME_OUTPUT_MODES:
+                        config_error = (
+                            f"Unsupported output: {output_mode}. "
+                            f"Supported outputs: {', '.join(REALTIME_OUTPUT_MODES)}"
+                        )
+                    elif audio_format not in REALTIME_AUDIO_FORMATS:
+                        config_error = (
+                            f"Unsupported audio format: {audio_format}. "
+                            f"Supported formats: {', '.join(REALTIME_AUDIO_FORMATS)}"
+                        )
+                    else:
+                        config_error = None
+                    if config_error:
+                        await websocket.send_text(
+                            json.dumps({"type": "error", "error": config_error})
+                        )
+                        continue
+                    target_language = code
+                    realtime_service.configure_output(output_mode, audio_format)
 
                     if session_initialized:
                         await realtime_service.send_session_update(target_language)
 
                     await websocket.send_text(
                         json.dumps(
-                            {"type": "config_updated", "target_lang": target_language}
+                            {
+                                "type": "config_updated",
+                                "target_lang": target_language,
+                                "output": output_mode,
+                                "audio_format": audio_format,
+                                "sample_rate": REALTIME_AUDIO_FORMATS[audio_format],
+                            }
                         )
                     )
                     print(f"Updated target language for real-time translation: {target_language}")
@@ -578,37 +1133,303 @@ async def websocket_realtime_audio(websocket: WebSocket):
         await realtime_service.disconnect_realtime()
 
 
+async def _authenticate_websocket(websocket: WebSocket) -> Optional[Dict[str, Any]]:
+    """Verify the token query parameter, closing the socket and returning None if it's invalid"""
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=1008, reason="Authentication token required")
+        return None
+
+    try:
+        from app.core.auth import supabase_auth
+        user_data = await supabase_auth.verify_token(token)
+        print(f"WebSocket authenticated user: {user_data.get('sub')}")
+        return user_data
+    except Exception as e:
+        print(f"WebSocket authentication failed: {e}")
+        await websocket.close(code=1008, reason="Invalid authentication token")
+        return None
+
+
+@router.websocket("/audio/broadcast")
+async def websocket_broadcast_speaker(
+    websocket: WebSocket,
+    audio_service: AudioService = Depends(get_audio_service),
+    broadcast_hub: BroadcastHub = Depends(get_broadcast_hub),
+):
+    """WebSocket endpoint for the speaker of a live broadcast, translated for many listeners"""
+
+    user_data = await _authenticate_websocket(websocket)
+    if user_data is None:
+        return
+
+    await websocket.accept()
+
+    room = broadcast_hub.open(user_data["sub"], audio_service.new_realtime_service)
+    print(f"Broadcast {room.room_id} opened by {user_data['sub']}")
+    await websocket.send_text(
+        json.dumps({"type": "room_created", "room_id": room.room_id})
+    )
+
+    try:
+        while True:
+            data = await websocket.receive_text()
+
+            try:
+                message = json.loads(data)
+                message_type = message.get("type")
+
+                if message_type == "audio":
+                    audio_data = message.get("data")
+                    if audio_data:
+                        await room.send_audio(base64.b64decode(audio_data))
+                elif message_type == "commit":
+                    await room.commit()
+                elif message_type == "status":
+                    await websocket.send_text(
+                        json.dumps(
+                            {
+                                "type": "room_status",
+                                "room_id": room.room_id,
+                                "languages": {
+                                    lang: len(session.listeners)
+                                    for lang, session in room.sessions.items()
+                                },
+                            }
+                        )
+                    )
+                elif message_type == "stop":
+                    break
+            except json.JSONDecodeError:
+                await websocket.send_text(
+                    json.dumps({"type": "error", "error": "Invalid JSON message"})
+                )
+            except Exception as e:
+                print(f"Error processing broadcast audio: {e}")
+                await websocket.send_text(
+                    json.dumps({"type": "error", "error": f"Error processing audio: {str(e)}"})
+                )
+    except WebSocketDisconnect:
+        print(f"Speaker disconnected from broadcast {room.room_id}")
+    finally:
+        await broadcast_hub.close(room)
+        print(f"Broadcast {room.room_id} closed")
+
+
+@router.websocket("/audio/broadcast/{room_id}")
+async def websocket_broadcast_listener(
+    websocket: WebSocket,
+    room_id: str,
+    broadcast_hub: BroadcastHub = Depends(get_broadcast_hub),
+):
+    """WebSocket endpoint for a listener receiving a live broadcast in one language"""
+
+    user_data = await _authenticate_websocket(websocket)
+    if user_data is None:
+        return
+
+    requested_language = websocket.query_params.get("target_lang", "en")
+    target_language = normalize_language(requested_language)
+    if target_language is None or target_language == "auto":
+        await websocket.close(
+            code=1008, reason=f"Unsupported target language: {requested_language}"
+        )
+        return
+
+    # Caption-only listeners never receive the audio stream
+    output_mode = websocket.query_params.get("output", "both")
+    if output_mode not in REALTIME_OUTPUT_MODES:
+        await websocket.close(code=1008, reason=f"Unsupported output: {output_mode}")
+        return
+
+    room = broadcast_hub.get(room_id)
+    if room is None:
+        await websocket.close(code=1008, reason="Broadcast not found")
+        return
+
+    await websocket.accept()
+
+    listener = Listener(websocket, target_language, output_mode)
+    error = await room.join(listener)
+    if error:
+        await websocket.send_text(json.dumps({"type": "error", "error": error}))
+        await websocket.close()
+        return
+
+    await websocket.send_text(
+        json.dumps({"type": "joined", "room_id": room_id, "target_lang": target_language})
+    )
+
+    async def receive_until_disconnect():
+        # Listeners only receive; reading is how their disconnect is noticed
+        while True:
+            await websocket.receive_text()
+
+    sender = asyncio.create_task(listener.run())
+    receiver = asyncio.create_task(receive_until_disconnect())
+    try:
+        await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        if sender.done() and sender.exception() is None:
+            await websocket.send_text(json.dumps({"type": "room_closed"}))
+            await websocket.close()
+    except Exception as e:
+        print(f"Broadcast listener error: {e}")
+    finally:
+        for task in (sender, receiver):
+            task.cancel()
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+        await room.leave(listener)
+
+
 @router.get("/text/languages")
-async def get_supported_languages():
+async def get_supported_languages(request: Request):
     """Get list of supported languages - public endpoint"""
-    return {"languages": translator_service.get_supported_languages()}
+    return _json_bytes_response(
+        request,
+        LANGUAGES_BODY,
+        LANGUAGES_ETAG,
+        f"public, max-age={settings.STATIC_CACHE_MAX_AGE}",
+    )
 
 
 @router.get("/history")
 async def get_translation_history(
-    limit: int = 100,
+    request: Request,
+    limit: int = Query(100, ge=1, le=100),
     offset: int = 0,
-    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token)
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    database_service: DatabaseService = Depends(get_database_service),
 ):
-    """Get translation history for the authenticated user"""
+    """Get translation history for the authenticated user.
+
+    Pass the returned next_cursor as cursor to fetch the following page, and
+    summary=true to receive truncated previews instead of the full texts.
+    """
     current_user, access_token = user_data
     
     try:
-        translations = await database_service.get_user_translations(
+        translations, next_cursor = await database_service.get_user_translations(
             user_id=current_user["sub"],
             access_token=access_token,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
+            summary=summary
         )
-        return {"translations": translations}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    body = json.dumps(
+        {"translations": translations, "next_cursor": next_cursor}
+    ).encode("utf-8")
+
+    return _json_bytes_response(request, body, _etag(body), "private, no-cache")
+
+
+EXPORT_COLUMNS = [
+    "id",
+    "created_at",
+    "modality",
+    "source_lang",
+    "target_lang",
+    "input_text",
+    "output_text",
+]
+
+
+def _serialize_export_chunk(rows: list, format: str) -> bytes:
+    """Serialize a chunk of history rows as NDJSON lines or CSV rows"""
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    return "".join(
+        json.dumps({column: row.get(column) for column in EXPORT_COLUMNS}) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+@router.get("/history/export")
+async def export_translation_history(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    database_service: DatabaseService = Depends(get_database_service),
+):
+    """Stream the complete translation history of the authenticated user as NDJSON or CSV"""
+    current_user, access_token = user_data
+
+    async def generate_export():
+        compressor = zlib.compressobj(wbits=31) if gzip else None
+
+        def encode(chunk: bytes) -> bytes:
+            return compressor.compress(chunk) if compressor else chunk
+
+        if format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(EXPORT_COLUMNS)
+            yield encode(buffer.getvalue().encode("utf-8"))
+
+        async for rows in database_service.iter_user_translations(
+            user_id=current_user["sub"],
+            access_token=access_token
+        ):
+            data = encode(_serialize_export_chunk(rows, format))
+            if data:
+                yield data
+
+        if compressor:
+            yield compressor.flush()
+
+    extension = "csv" if format == "csv" else "ndjson"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"translation-history.{extension}"
+    if gzip:
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        generate_export(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/history/{translation_id}")
+async def get_translation_detail(
+    translation_id: str,
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    database_service: DatabaseService = Depends(get_database_service),
+):
+    """Get the full record of a single translation from history"""
+    current_user, access_token = user_data
+
+    try:
+        translation = await database_service.get_translation(
+            translation_id=translation_id,
+            user_id=current_user["sub"],
+            access_token=access_token
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not translation:
+        raise HTTPException(status_code=404, detail="Translation not found")
+
+    return translation
+
 
 @router.delete("/history/{translation_id}")
 async def delete_translation(
     translation_id: str,
-    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token)
+    user_data: tuple[Dict[str, Any], str] = Depends(get_current_user_with_token),
+    database_service: DatabaseService = Depends(get_database_service),
 ):
     """Delete a specific translation from history"""
     current_user, access_token = user_data
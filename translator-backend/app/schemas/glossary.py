@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from typing import List
+from app.core.config import settings
+from app.core.validation import TargetLanguage
+
+
+class GlossaryEntryInput(BaseModel):
+    """A source term and the translation it must always get in one language"""
+
+    source_term: str = Field(..., description="Term as it appears in source text", min_length=1, max_length=200)
+    target_lang: TargetLanguage = Field(..., description="Target language code")
+    target_term: str = Field(..., description="Required translation of the term", min_length=1, max_length=200)
+
+
+class GlossaryEntry(GlossaryEntryInput):
+    """A stored glossary entry"""
+
+    id: str = Field(..., description="Entry identifier")
+    project: str = Field(..., description="Glossary project the entry belongs to")
+    created_at: str = Field(..., description="Creation time")
+
+
+class GlossaryCreateRequest(BaseModel):
+    """Request model for adding glossary entries"""
+
+    project: str = Field("default", description="Glossary project", min_length=1, max_length=100)
+    entries: List[GlossaryEntryInput] = Field(
+        ...,
+        description="Entries to add",
+        min_length=1,
+        max_length=settings.GLOSSARY_MAX_ENTRIES_PER_REQUEST,
+    )
+
+
+class GlossaryResponse(BaseModel):
+    """Response model for a glossary project"""
+
+    project: str = Field(..., description="Glossary project")
+    entries: List[GlossaryEntry] = Field(..., description="Glossary entries")
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+
+class JobResponse(BaseModel):
+    """Response model for a background translation job"""
+
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Type of job ('document' or 'audio')")
+    status: str = Field(
+        ..., description="Job status ('queued', 'running', 'completed' or 'failed')"
+    )
+    progress_done: int = Field(..., description="Number of completed work units")
+    progress_total: int = Field(..., description="Total number of work units, 0 if not yet known")
+    result: Optional[Dict[str, Any]] = Field(None, description="Job result once completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    created_at: float = Field(..., description="Creation time as a Unix timestamp")
+    updated_at: float = Field(..., description="Last update time as a Unix timestamp")
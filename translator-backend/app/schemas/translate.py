@@ -1,16 +1,34 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.validation import SourceLanguage, TargetLanguage
 
 
 class TextTranslateRequest(BaseModel):
     """Request model for translation"""
 
-    text: str = Field(..., description="Text to translate", min_length=1)
-    source_lang: str = Field(
+    text: str = Field(
         ...,
-        description="Source language (e.g., 'english') or 'auto' for automatic detection",
+        description="Text to translate",
+        min_length=1,
+        max_length=settings.MAX_TEXT_CHARS,
+    )
+    source_lang: SourceLanguage = Field(
+        ...,
+        description="Source language code, name or BCP-47 tag (e.g., 'en', 'English', 'en-US'), or 'auto' for automatic detection",
+    )
+    target_lang: TargetLanguage = Field("en", description="Target language code, name or BCP-47 tag (e.g., 'es')")
+    target_langs: Optional[List[TargetLanguage]] = Field(
+        None,
+        description="Translate into several target languages at once; overrides target_lang",
+        min_length=1,
+    )
+    include_original_text: bool = Field(
+        True, description="Echo the original text back in the response"
+    )
+    glossary_project: Optional[str] = Field(
+        None, description="Glossary project whose terms to enforce; none by default"
     )
-    target_lang: str = Field("english", description="Target language (e.g., 'spanish')")
 
 
 class TextTranslateResponse(BaseModel):
@@ -19,7 +37,15 @@ class TextTranslateResponse(BaseModel):
     translated_text: str = Field(..., description="Translated text")
     source_lang: str = Field(..., description="Source language")
     target_lang: str = Field(..., description="Target language")
-    original_text: str = Field(..., description="Original text")
+    original_text: Optional[str] = Field(
+        None, description="Original text, omitted when not requested"
+    )
+    translations: Optional[Dict[str, str]] = Field(
+        None, description="Translation per target language when target_langs was given"
+    )
+    glossary_violations: Optional[Dict[str, List[str]]] = Field(
+        None, description="Required glossary terms missing from the translation, per language"
+    )
 
 
 class DocumentTranslateResponse(BaseModel):
@@ -30,6 +56,12 @@ class DocumentTranslateResponse(BaseModel):
     target_lang: str = Field(..., description="Target language")
     original_filename: str = Field(..., description="Original document filename")
     document_type: str = Field(..., description="Type of document processed")
+    translations: Optional[Dict[str, str]] = Field(
+        None, description="Translation per target language when target_langs was given"
+    )
+    glossary_violations: Optional[Dict[str, List[str]]] = Field(
+        None, description="Required glossary terms missing from the translation, per language"
+    )
 
 
 class ImageTranslateResponse(BaseModel):
@@ -41,3 +73,39 @@ class ImageTranslateResponse(BaseModel):
     target_lang: str = Field(..., description="Target language")
     original_filename: str = Field(..., description="Original image filename")
     image_type: str = Field(..., description="Type of image processed")
+
+
+class ImageBatchTranslateResponse(BaseModel):
+    """Response model for translating several images"""
+
+    results: List[ImageTranslateResponse] = Field(
+        ..., description="One result per uploaded image, in upload order"
+    )
+
+
+class TokenEstimateRequest(BaseModel):
+    """Request model for a token estimate"""
+
+    text: str = Field(
+        ...,
+        description="Text that would be translated",
+        min_length=1,
+        max_length=settings.MAX_TEXT_CHARS,
+    )
+    target_lang: TargetLanguage = Field("en", description="Target language")
+    target_langs: Optional[List[TargetLanguage]] = Field(
+        None, description="Several target languages; overrides target_lang", min_length=1
+    )
+
+
+class TokenEstimateResponse(BaseModel):
+    """Response model for a token estimate"""
+
+    prompt_tokens: int = Field(..., description="Estimated prompt tokens")
+    completion_tokens: int = Field(..., description="Estimated completion tokens")
+    total_tokens: int = Field(..., description="Estimated total tokens")
+    max_request_tokens: int = Field(..., description="Token limit per request, 0 if unlimited")
+    within_request_limit: bool = Field(..., description="Whether the request fits the per-request limit")
+    user_tokens_used: int = Field(..., description="Tokens used in the current budget window")
+    user_token_budget: int = Field(..., description="Token budget per window, 0 if unlimited")
+    within_user_budget: bool = Field(..., description="Whether the request fits the remaining budget")
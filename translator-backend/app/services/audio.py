@@ -1,20 +1,151 @@
 import asyncio
 import json
 import base64
-import websockets
-from typing import Optional, Dict, Any, Callable
-from openai import AsyncOpenAI
+import time
+from collections import deque
+from fastapi import HTTPException
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from app.core.clients import clients
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.resilience import UpstreamTimeout, resilience
 from app.core.languages import get_language_name, is_supported_language
+from app.services.translator import TranslatorService
+
+
+# Upstream events that mark a point in a turn; a turn starts when speech ends
+TURN_MARKS = {
+    "input_audio_buffer.speech_stopped": "speech_stopped",
+    "response.created": "response_created",
+    "response.audio_transcript.delta": "first_transcript",
+    "response.text.delta": "first_transcript",
+    "response.audio.delta": "first_audio",
+    "response.done": "response_done",
+}
+
+# Intervals measured for every turn, each from the end of speech or the previous mark
+TURN_INTERVALS = [
+    ("speech_stopped", "response_created"),
+    ("response_created", "first_transcript"),
+    ("response_created", "first_audio"),
+    ("speech_stopped", "first_transcript"),
+    ("speech_stopped", "first_audio"),
+    ("speech_stopped", "response_done"),
+]
+
+
+class RealtimeLatency:
+    """Times one realtime session: its connect handshake and, per turn, the end of speech to the finished response"""
+
+    def __init__(self):
+        self.connect_ms: Optional[float] = None
+        self.turns = 0
+        self.marks: Dict[str, float] = {}
+
+    def connected(self, seconds: float):
+        self.connect_ms = round(seconds * 1000, 1)
+        metrics.observe("realtime_latency_ms", "connect", self.connect_ms)
+
+    def speech_ended(self):
+        """Start a turn; called for server-detected silence and for a manual commit"""
+        self.marks = {"speech_stopped": time.monotonic()}
+
+    def mark(self, event_type: str) -> Optional[Dict[str, Any]]:
+        """Record an upstream event, returning the turn's timings once its response is done"""
+        name = TURN_MARKS.get(event_type)
+        if name is None:
+            return None
+        if name == "speech_stopped":
+            self.speech_ended()
+            return None
+        if "speech_stopped" not in self.marks:
+            return None
+
+        # Only the first delta of each kind counts
+        self.marks.setdefault(name, time.monotonic())
+        if name != "response_done":
+            return None
+
+        intervals = {}
+        for start, end in TURN_INTERVALS:
+            if start in self.marks and end in self.marks:
+                label = f"{start}_to_{end}"
+                intervals[label] = round((self.marks[end] - self.marks[start]) * 1000, 1)
+                metrics.observe("realtime_latency_ms", label, intervals[label])
+
+        self.turns += 1
+        self.marks = {}
+        return {"turn": self.turns, "connect_ms": self.connect_ms, "intervals_ms": intervals}
+
+
+# Input audio is 24 kHz mono pcm16
+REALTIME_INPUT_BYTES_PER_SECOND = 24000 * 2
+
+
+class AudioReplayBuffer:
+    """The most recent input audio not yet committed upstream, capped in size.
+
+    Offsets count the bytes appended since the buffer was created, so a commit
+    drops only the audio it covered and keeps whatever arrived after it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.chunks: Deque[bytes] = deque()
+        self.size = 0
+        # Offset just past the last chunk appended
+        self.end = 0
+
+    @property
+    def start(self) -> int:
+        """Offset of the oldest chunk still held"""
+        return self.end - self.size
+
+    def append(self, chunk: bytes):
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        self.end += len(chunk)
+        while self.size > self.max_bytes and len(self.chunks) > 1:
+            self.size -= len(self.chunks.popleft())
+
+    def discard_through(self, offset: int):
+        """Drop the chunks that end at or before offset; one straddling it is kept whole"""
+        while self.chunks and self.start + len(self.chunks[0]) <= offset:
+            self.size -= len(self.chunks.popleft())
+
+
+# What a realtime client receives: "captions" skips audio generation upstream entirely
+REALTIME_OUTPUT_MODES = ["captions", "audio", "both"]
+
+# Output audio formats the Realtime API produces, with their sample rates. The
+# G.711 formats are 8 kHz 8-bit, a sixth of the size of 24 kHz pcm16.
+REALTIME_AUDIO_FORMATS = {"pcm16": 24000, "g711_ulaw": 8000, "g711_alaw": 8000}
 
 
 class OpenAIRealtimeAudioService:
     """Service for handling real-time audio processing using OpenAI Realtime API"""
 
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.realtime_ws = None
         self.target_language = None
+        self.output_mode = "both"
+        self.replay_buffer = AudioReplayBuffer(
+            int(settings.REALTIME_REPLAY_SECONDS * REALTIME_INPUT_BYTES_PER_SECOND)
+        )
+        self.reconnecting = False
+        self.closing = False
+        # Swallows the session.created of a resumed connection; the client's session carries on
+        self.resuming = False
+        self.commit_pending = False
+        # Set when the connection closed between a commit and its response request
+        self.response_pending = False
+        # Replay buffer offset where the current connection's input audio starts
+        self.session_offset = 0
+        # Replay buffer offsets where server VAD ended each item's speech, by item id
+        self.speech_offsets: Dict[str, int] = {}
+        self.latency = RealtimeLatency()
+        # Receives each turn's timings once its response is done
+        self.on_stats: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
         self.session_config = {
             "modalities": ["text", "audio"],
             "voice": "alloy",
@@ -32,6 +163,8 @@ class OpenAIRealtimeAudioService:
 
     async def connect_realtime(self) -> bool:
         """Connect to OpenAI Realtime API"""
+        import websockets
+
         try:
             url = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
 
@@ -43,15 +176,24 @@ class OpenAIRealtimeAudioService:
                 "OpenAI-Beta": "realtime=v1",
             }
 
-            self.realtime_ws = await asyncio.wait_for(
-                websockets.connect(url, additional_headers=headers), timeout=10.0
+            started = time.monotonic()
+            self.realtime_ws = await resilience.call(
+                "realtime",
+                lambda: websockets.connect(url, additional_headers=headers),
             )
+            self.latency.connected(time.monotonic() - started)
+            # Audio buffered before connecting was never sent on this connection
+            self.session_offset = self.replay_buffer.end
+            self.speech_offsets = {}
 
             print("Successfully connected to OpenAI Realtime API")
 
             return True
-        except asyncio.TimeoutError:
-            print("Realtime API connection timed out after 10 seconds")
+        except UpstreamTimeout:
+            print(
+                f"Realtime API connection timed out after "
+                f"{settings.UPSTREAM_REALTIME_CONNECT_TIMEOUT:g} seconds"
+            )
             return False
         except websockets.exceptions.InvalidStatusCode as e:
             print(f"Realtime API returned status code: {e.status_code}")
@@ -71,22 +213,50 @@ class OpenAIRealtimeAudioService:
 
     async def disconnect_realtime(self):
         """Disconnect from OpenAI Realtime API"""
+        self.closing = True
         if self.realtime_ws:
             await self.realtime_ws.close()
             self.realtime_ws = None
 
+    @property
+    def speaks(self) -> bool:
+        return self.output_mode != "captions"
+
+    def configure_output(self, output_mode: str, audio_format: str):
+        """Choose what the upstream session generates; applied with the next session update"""
+        self.output_mode = output_mode
+        self.session_config = {
+            **self.session_config,
+            "modalities": ["text", "audio"] if self.speaks else ["text"],
+            "output_audio_format": audio_format,
+        }
+
     def _get_translation_instructions(self, target_language: str) -> str:
         """Get language-specific translation instructions"""
         target_lang_name = get_language_name(target_language) if target_language != "english" else target_language
+        if not self.speaks:
+            return f"""You are a real-time speech translator. When you hear speech in any language, immediately translate it to {target_lang_name} and reply with the translated text only. Do not explain, just translate. Maintain the speaker's tone and emotion."""
         return f"""You are a real-time speech translator. When you hear speech in any language, immediately translate it to {target_lang_name} and speak the translation naturally. Do not explain, just translate and speak. Maintain the speaker's tone and emotion."""
 
     async def send_session_update(self, target_language: Optional[str] = "english"):
         """Update session configuration for real-time translation"""
+        from websockets.exceptions import ConnectionClosed
+
         if not self.realtime_ws:
             return
 
         self.target_language = target_language
+        if self.reconnecting:
+            # Sent with the restored session once the connection is back
+            return
+
+        try:
+            await self._send_session(target_language)
+        except ConnectionClosed:
+            # The listener reconnects and sends the session again
+            pass
 
+    async def _send_session(self, target_language: str):
         instructions = self._get_translation_instructions(target_language)
 
         session_update = {
@@ -99,9 +269,19 @@ class OpenAIRealtimeAudioService:
 
     async def send_audio_chunk(self, audio_data: bytes):
         """Send audio chunk to Realtime API"""
-        if not self.realtime_ws:
+        from websockets.exceptions import ConnectionClosed
+
+        self.replay_buffer.append(audio_data)
+        if not self.realtime_ws or self.reconnecting:
             return
 
+        try:
+            await self._send_audio(audio_data)
+        except ConnectionClosed:
+            # Kept in the replay buffer and sent again once reconnected
+            pass
+
+    async def _send_audio(self, audio_data: bytes):
         audio_base64 = base64.b64encode(audio_data).decode("utf-8")
         audio_message = {"type": "input_audio_buffer.append", "audio": audio_base64}
 
@@ -109,52 +289,182 @@ class OpenAIRealtimeAudioService:
 
     async def commit_audio_buffer(self):
         """Commit the audio buffer and request response"""
+        from websockets.exceptions import ConnectionClosed
+
         if not self.realtime_ws:
             return
 
+        if self.reconnecting:
+            self.commit_pending = True
+            return
+
         commit_message = {"type": "input_audio_buffer.commit"}
-        await self.realtime_ws.send(json.dumps(commit_message))
+        committed_offset = self.replay_buffer.end
+        try:
+            await self.realtime_ws.send(json.dumps(commit_message))
+        except ConnectionClosed:
+            self.commit_pending = True
+            return
+        self.latency.speech_ended()
         print("Committed audio buffer")
 
+        try:
+            await self._request_response()
+        except ConnectionClosed:
+            # The commit went down with the old connection, so its audio stays in the
+            # replay buffer to be committed again before the response is requested
+            self.response_pending = True
+            return
+        self.replay_buffer.discard_through(committed_offset)
+
+    async def _request_response(self):
         response_message = {
             "type": "response.create",
             "response": {
-                "modalities": ["text", "audio"],
-                "instructions": "Translate the speech you just heard and respond in audio.",
+                "modalities": self.session_config["modalities"],
+                "instructions": (
+                    "Translate the speech you just heard and respond in audio."
+                    if self.speaks
+                    else "Translate the speech you just heard and respond in text."
+                ),
             },
         }
         await self.realtime_ws.send(json.dumps(response_message))
         print("Requested response from model")
 
     async def listen_for_responses(self, callback: Callable[[Dict[str, Any]], None]):
-        """Listen for responses from OpenAI Realtime API"""
-        if not self.realtime_ws:
-            return
+        """Listen for responses from OpenAI Realtime API, reconnecting if the connection drops.
+
+        After a reconnect the callback receives an "upstream.reconnected" event, or an
+        "error" event if the connection could not be restored.
+        """
+        from websockets.exceptions import ConnectionClosed
+
+        while self.realtime_ws:
+            try:
+                async for message in self.realtime_ws:
+                    try:
+                        data = json.loads(message)
+                        event_type = data.get("type", "unknown")
+                        stats = self.latency.mark(event_type)
+                        print(f"Received from OpenAI: {event_type}")
+                        if event_type == "session.created" and self.resuming:
+                            self.resuming = False
+                            continue
+                        self._track_commit(data)
+                        await callback(data)
+                        if stats and self.on_stats:
+                            await self.on_stats(stats)
+                    except json.JSONDecodeError as e:
+                        print(f"Failed to parse message: {e}")
+            except ConnectionClosed:
+                print("OpenAI Realtime connection closed")
+            except Exception as e:
+                print(f"Error listening for responses: {e}")
+                import traceback
+
+                traceback.print_exc()
+                return
+
+            if self.closing:
+                return
+
+            replayed_bytes = self.replay_buffer.size
+            if not await self.reconnect():
+                await callback(
+                    {
+                        "type": "error",
+                        "error": {"message": "Lost connection to OpenAI Realtime API"},
+                    }
+                )
+                return
+            await callback(
+                {"type": "upstream.reconnected", "replayed_bytes": replayed_bytes}
+            )
+
+    def _track_commit(self, data: Dict[str, Any]):
+        """Drop replay audio once server VAD commits it, keeping any spoken since"""
+        event_type = data.get("type")
+        if event_type == "input_audio_buffer.speech_stopped":
+            # audio_end_ms counts from the first audio sent on this connection
+            self.speech_offsets[data.get("item_id")] = self.session_offset + int(
+                data.get("audio_end_ms", 0) * REALTIME_INPUT_BYTES_PER_SECOND / 1000
+            )
+        elif event_type == "input_audio_buffer.committed":
+            # Manual commits trim the buffer when sent, so only VAD items are tracked
+            offset = self.speech_offsets.pop(data.get("item_id"), None)
+            if offset is not None:
+                self.replay_buffer.discard_through(offset)
+
+    async def reconnect(self) -> bool:
+        """Reconnect with backoff, then restore the session and replay uncommitted audio"""
+        started = time.monotonic()
+        self.reconnecting = True
+        # A response in progress was lost with the connection
+        self.latency.marks = {}
 
         try:
-            async for message in self.realtime_ws:
-                try:
-                    data = json.loads(message)
-                    event_type = data.get("type", "unknown")
-                    print(f"Received from OpenAI: {event_type}")
-                    await callback(data)
-                except json.JSONDecodeError as e:
-                    print(f"Failed to parse message: {e}")
-        except websockets.exceptions.ConnectionClosed:
-            print("OpenAI Realtime connection closed")
-        except Exception as e:
-            print(f"Error listening for responses: {e}")
-            import traceback
+            for attempt in range(settings.REALTIME_RECONNECT_ATTEMPTS):
+                if attempt:
+                    await asyncio.sleep(
+                        min(
+                            settings.UPSTREAM_RETRY_MAX_DELAY,
+                            settings.UPSTREAM_RETRY_BASE_DELAY * 2 ** (attempt - 1),
+                        )
+                    )
+                if self.closing:
+                    return False
 
-            traceback.print_exc()
+                print(f"Reconnecting to OpenAI Realtime API (attempt {attempt + 1})")
+                if not await self.connect_realtime():
+                    continue
+
+                try:
+                    self.resuming = True
+                    self.session_offset = self.replay_buffer.start
+                    if self.target_language:
+                        await self._send_session(self.target_language)
+                    # Chunks sent while reconnecting were only buffered, so they are replayed too
+                    for chunk in list(self.replay_buffer.chunks):
+                        await self._send_audio(chunk)
+                except Exception as e:
+                    print(f"Failed to restore realtime session: {e}")
+                    await self.realtime_ws.close()
+                    continue
+
+                self.reconnecting = False
+                if self.commit_pending or self.response_pending:
+                    self.commit_pending = False
+                    self.response_pending = False
+                    # Commits the replayed audio, then sends response.create
+                    await self.commit_audio_buffer()
+
+                metrics.increment("realtime_reconnects", "succeeded")
+                metrics.observe(
+                    "realtime_latency_ms", "reconnect", (time.monotonic() - started) * 1000
+                )
+                print(f"Reconnected to OpenAI Realtime API, replayed {self.replay_buffer.size} bytes")
+                return True
+
+            metrics.increment("realtime_reconnects", "failed")
+            self.realtime_ws = None
+            return False
+        finally:
+            self.reconnecting = False
 
 
 class AudioService:
     """Wrapper service for audio processing"""
 
-    def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        self.realtime_service = OpenAIRealtimeAudioService()
+    def __init__(self, translator: TranslatorService):
+        from openai import AsyncOpenAI
+
+        self.openai_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=clients.openai_http,
+            max_retries=0,
+        )
+        self.translator = translator
 
     async def process_audio_file(
         self, audio_data: bytes, target_language: Optional[str] = "english"
@@ -170,34 +480,42 @@ class AudioService:
 
             try:
                 with open(temp_file_path, "rb") as audio_file:
-                    transcript = await self.openai_client.audio.transcriptions.create(
-                        model="whisper-1", file=audio_file, response_format="text"
-                    )
+
+                    async def transcribe():
+                        # Rewound so a retried attempt uploads the whole file again
+                        audio_file.seek(0)
+                        return await self.openai_client.audio.transcriptions.create(
+                            model="whisper-1", file=audio_file, response_format="text"
+                        )
+
+                    transcript = await resilience.call("audio", transcribe)
 
                 transcribed_text = transcript.strip() if transcript else ""
 
                 result = {"transcribed_text": transcribed_text}
 
                 if target_language and transcribed_text:
-                    from app.services.translator import TranslatorService
-
-                    translator = TranslatorService()
-
-                    translated_text = await translator.text_translate(
+                    source_lang = self.translator.detect_source_language(
+                        transcribed_text, "auto"
+                    )
+                    translated_text = await self.translator.text_translate(
                         text=transcribed_text,
-                        source_lang="auto",
+                        source_lang=source_lang,
                         target_lang=target_language,
                     )
+                    result["source_lang"] = source_lang
                     result["translated_text"] = translated_text
 
                 return result
             finally:
                 if os.path.exists(temp_file_path):
                     os.unlink(temp_file_path)
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error processing audio file: {e}")
             return {"error": str(e)}
 
-    def get_realtime_service(self) -> OpenAIRealtimeAudioService:
-        """Get the realtime audio service instance"""
-        return self.realtime_service
+    def new_realtime_service(self) -> OpenAIRealtimeAudioService:
+        """A realtime service for one upstream session; each holds its own connection"""
+        return OpenAIRealtimeAudioService()
@@ -0,0 +1,284 @@
+"""One-to-many realtime translation: one speaker, one upstream session per language.
+
+A speaker's audio is sent to a single realtime session for each language that
+listeners have asked for, and each session's output is fanned out to every
+listener of that language through a bounded per-listener queue, so upstream
+cost grows with the number of languages rather than the number of listeners.
+"""
+
+import asyncio
+import json
+import secrets
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.audio import OpenAIRealtimeAudioService
+
+
+# Upstream events passed on to listeners, with the fields each one carries
+BROADCAST_EVENTS = {
+    "input_audio_buffer.speech_started": ("speech_started", None),
+    "input_audio_buffer.speech_stopped": ("speech_stopped", None),
+    "response.audio_transcript.delta": ("translation_delta", "delta"),
+    "response.audio_transcript.done": ("translation", "transcript"),
+    "response.text.delta": ("text_delta", "delta"),
+    "response.text.done": ("text_response", "text"),
+    "response.audio.delta": ("audio_delta", "delta"),
+    "response.audio.done": ("audio_complete", None),
+}
+
+
+AUDIO_MESSAGES = {"audio_delta", "audio_complete"}
+CAPTION_MESSAGES = {"translation_delta", "translation", "text_delta", "text_response"}
+
+
+def broadcast_message(data: dict) -> Optional[Tuple[str, str]]:
+    """The type and text of the listener message for an upstream event, or None if listeners don't get it"""
+    mapping = BROADCAST_EVENTS.get(data.get("type"))
+    if mapping is None:
+        return None
+
+    message_type, field = mapping
+    message = {"type": message_type}
+    if field == "delta" and message_type == "audio_delta":
+        message["audio"] = data.get("delta", "")
+    elif field:
+        message["text"] = data.get(field, "")
+        message["is_final"] = field != "delta"
+    return message_type, json.dumps(message)
+
+
+class Listener:
+    """A listener WebSocket fed from a bounded queue, dropping its oldest messages when behind"""
+
+    def __init__(self, websocket: WebSocket, target_lang: str, output_mode: str = "both"):
+        self.websocket = websocket
+        self.target_lang = target_lang
+        self.output_mode = output_mode
+        self.queue: asyncio.Queue = asyncio.Queue(
+            maxsize=settings.BROADCAST_LISTENER_QUEUE_SIZE
+        )
+
+    def wants(self, message_type: str) -> bool:
+        """Whether the listener's output mode includes this kind of message"""
+        if self.output_mode == "captions":
+            return message_type not in AUDIO_MESSAGES
+        if self.output_mode == "audio":
+            return message_type not in CAPTION_MESSAGES
+        return True
+
+    def offer(self, message: Optional[str]):
+        """Queue a message without waiting; None tells the listener the room closed"""
+        if self.queue.full():
+            # A slow listener skips ahead rather than holding up the others
+            self.queue.get_nowait()
+            metrics.increment("broadcast_dropped", self.target_lang)
+        self.queue.put_nowait(message)
+
+    async def run(self):
+        """Send queued messages until the room closes"""
+        while (message := await self.queue.get()) is not None:
+            await self.websocket.send_text(message)
+
+
+class LanguageSession:
+    """The upstream realtime session translating a room's speaker into one language"""
+
+    def __init__(self, target_lang: str, service: OpenAIRealtimeAudioService):
+        self.target_lang = target_lang
+        self.service = service
+        self.listeners: Set[Listener] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    async def handle(self, data: dict):
+        if data.get("type") == "session.created":
+            await self.service.send_session_update(self.target_lang)
+            return
+
+        message = broadcast_message(data)
+        if message is None:
+            return
+        message_type, text = message
+        for listener in list(self.listeners):
+            if listener.wants(message_type):
+                listener.offer(text)
+
+    async def close(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        await self.service.disconnect_realtime()
+
+
+class BroadcastRoom:
+    """A speaker's room: its language sessions and their listeners"""
+
+    def __init__(
+        self,
+        room_id: str,
+        speaker_id: str,
+        new_realtime_service: Callable[[], OpenAIRealtimeAudioService],
+    ):
+        self.room_id = room_id
+        self.speaker_id = speaker_id
+        self.new_realtime_service = new_realtime_service
+        self.sessions: Dict[str, LanguageSession] = {}
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+    @property
+    def listener_count(self) -> int:
+        return sum(len(session.listeners) for session in self.sessions.values())
+
+    def _refusal(self, target_lang: str) -> Optional[str]:
+        """Why a listener of target_lang can't join the room right now, if they can't"""
+        if self.closed:
+            return "The broadcast has ended"
+        if self.listener_count >= settings.BROADCAST_MAX_LISTENERS:
+            return "The broadcast is full"
+        if (
+            target_lang not in self.sessions
+            and len(self.sessions) >= settings.BROADCAST_MAX_LANGUAGES
+        ):
+            return "The broadcast has no room for another language"
+        return None
+
+    async def join(self, listener: Listener) -> Optional[str]:
+        """Add a listener, starting its language's session if needed; returns an error if refused"""
+        async with self.lock:
+            error = self._refusal(listener.target_lang)
+            session = self.sessions.get(listener.target_lang)
+            if error or session:
+                if session and not error:
+                    session.listeners.add(listener)
+                return error
+
+        # Connecting takes a while, so it happens outside the lock and the room is checked again
+        service = await self._connect()
+        if service is None:
+            return "Failed to connect to OpenAI Realtime API"
+
+        async with self.lock:
+            error = self._refusal(listener.target_lang)
+            if not error:
+                session = self.sessions.get(listener.target_lang)
+                if session is None:
+                    session = self._start_session(listener.target_lang, service)
+                    service = None
+                session.listeners.add(listener)
+
+        # Another listener opened the language meanwhile, or the room filled up or closed
+        if service is not None:
+            await service.disconnect_realtime()
+        return error
+
+    async def _connect(self) -> Optional[OpenAIRealtimeAudioService]:
+        service = self.new_realtime_service()
+        # Listeners only need the translation, so the speaker isn't transcribed per language
+        service.session_config = {
+            **service.session_config,
+            "input_audio_transcription": None,
+        }
+        if not await service.connect_realtime():
+            return None
+        return service
+
+    def _start_session(
+        self, target_lang: str, service: OpenAIRealtimeAudioService
+    ) -> LanguageSession:
+        session = LanguageSession(target_lang, service)
+        session.task = asyncio.create_task(self._listen(session))
+        self.sessions[target_lang] = session
+        metrics.increment("broadcast_sessions", "opened")
+        print(f"Broadcast {self.room_id}: opened {target_lang} session")
+        return session
+
+    async def _listen(self, session: LanguageSession):
+        """Relay a session's upstream output, ending the session if the upstream is lost for good"""
+        try:
+            await session.service.listen_for_responses(session.handle)
+        except Exception as e:
+            print(f"Broadcast {self.room_id}: {session.target_lang} session failed: {e}")
+
+        if session.service.closing:
+            return
+
+        async with self.lock:
+            if self.sessions.get(session.target_lang) is session:
+                del self.sessions[session.target_lang]
+
+        error = json.dumps(
+            {"type": "error", "error": "Translation into this language is no longer available"}
+        )
+        for listener in list(session.listeners):
+            listener.offer(error)
+            listener.offer(None)
+        await session.service.disconnect_realtime()
+        metrics.increment("broadcast_sessions", "failed")
+        print(f"Broadcast {self.room_id}: {session.target_lang} session lost its upstream")
+
+    async def leave(self, listener: Listener):
+        """Remove a listener, closing its language's session once nobody is listening"""
+        async with self.lock:
+            session = self.sessions.get(listener.target_lang)
+            if session is None or listener not in session.listeners:
+                return
+
+            session.listeners.discard(listener)
+            if not session.listeners:
+                del self.sessions[listener.target_lang]
+                await session.close()
+                metrics.increment("broadcast_sessions", "closed")
+                print(f"Broadcast {self.room_id}: closed {listener.target_lang} session")
+
+    async def send_audio(self, audio_data: bytes):
+        await asyncio.gather(
+            *(session.service.send_audio_chunk(audio_data) for session in self.sessions.values())
+        )
+
+    async def commit(self):
+        await asyncio.gather(
+            *(session.service.commit_audio_buffer() for session in self.sessions.values())
+        )
+
+    async def close(self):
+        """End the broadcast, closing every session and telling listeners"""
+        async with self.lock:
+            self.closed = True
+            sessions = list(self.sessions.values())
+            self.sessions = {}
+
+        for session in sessions:
+            for listener in session.listeners:
+                listener.offer(None)
+        await asyncio.gather(*(session.close() for session in sessions))
+
+
+class BroadcastHub:
+    """Broadcast rooms open in this worker process"""
+
+    def __init__(self):
+        self.rooms: Dict[str, BroadcastRoom] = {}
+
+    def open(
+        self,
+        speaker_id: str,
+        new_realtime_service: Callable[[], OpenAIRealtimeAudioService],
+    ) -> BroadcastRoom:
+        room_id = secrets.token_urlsafe(12)
+        room = BroadcastRoom(room_id, speaker_id, new_realtime_service)
+        self.rooms[room_id] = room
+        return room
+
+    def get(self, room_id: str) -> Optional[BroadcastRoom]:
+        return self.rooms.get(room_id)
+
+    async def close(self, room: BroadcastRoom):
+        self.rooms.pop(room.room_id, None)
+        await room.close()
+
+    async def close_all(self):
+        await asyncio.gather(*(self.close(room) for room in list(self.rooms.values())))
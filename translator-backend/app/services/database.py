@@ -1,33 +1,180 @@
-from typing import Dict, Any, Optional
-from supabase import create_client, Client
-from supabase.client import ClientOptions
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, List, Optional, Tuple
+from app.core.clients import clients
 from app.core.config import settings
+import base64
+import hashlib
 import uuid
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+
+SUMMARY_COLUMNS = "id, created_at, modality, source_lang, target_lang, input_text, output_text"
+# Summary select reading the generated previews under the text column names
+PREVIEW_SUMMARY_COLUMNS = (
+    "id, created_at, modality, source_lang, target_lang, "
+    "input_text:input_preview, output_text:output_preview"
+)
+
+# glossary_entries table: id, user_id, project, source_term, target_lang, target_term, created_at
+GLOSSARY_COLUMNS = "id, project, source_term, target_lang, target_term, created_at"
+
+
+def encode_cursor(created_at: str, translation_id: str) -> str:
+    """Encode the (created_at, id) position of a row as an opaque cursor"""
+    raw = f"{created_at}|{translation_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, translation_id = raw.split("|", 1)
+        datetime.fromisoformat(created_at)
+        uuid.UUID(translation_id)
+    except Exception:
+        raise ValueError("Invalid history cursor")
+    return created_at, translation_id
+
+
+# Column holding the translation_contents hash of each text column's full text
+HASH_COLUMNS = {"input_text": "input_hash", "output_text": "output_hash"}
+
+
+def pack_text(column: str, text: str, contents: Dict[str, str]) -> Dict[str, Any]:
+    """Column values for a text, moving a large one into contents under its hash"""
+    raw = text.encode("utf-8")
+    if not settings.HISTORY_CONTENT_TABLE or len(raw) < settings.HISTORY_CONTENT_MIN_BYTES:
+        return {column: text}
+
+    content_hash = hashlib.sha256(raw).hexdigest()
+    contents[content_hash] = text
+    # The text column keeps a readable preview of the stored content
+    return {column: _preview(text), HASH_COLUMNS[column]: content_hash}
+
+
+def _content_hashes(rows: List[Dict[str, Any]]) -> List[str]:
+    """Distinct content hashes referenced by translation rows"""
+    hashes = {row.get(hash_column) for row in rows for hash_column in HASH_COLUMNS.values()}
+    hashes.discard(None)
+    return sorted(hashes)
+
+
+def _unpack_row(row: Dict[str, Any], contents: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Restore the full texts of a translation row from their contents in place"""
+    # Generated for summaries; full rows already carry the texts they preview
+    row.pop("input_preview", None)
+    row.pop("output_preview", None)
+    for column, hash_column in HASH_COLUMNS.items():
+        content_hash = row.pop(hash_column, None)
+        if content_hash and contents and content_hash in contents:
+            row[column] = contents[content_hash]
+    return row
+
+
+def _preview(text: Optional[str]) -> Optional[str]:
+    """Truncate text to the configured history preview length"""
+    limit = settings.HISTORY_PREVIEW_LENGTH
+    if text is None or len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + "…"
+
+
+def _translation_row(
+    user_id: str,
+    input_text: str,
+    output_text: str,
+    source_lang: Optional[str],
+    target_lang: str,
+    modality: str,
+    contents: Dict[str, str],
+    packed_input: Optional[Dict[str, Any]] = None,
+    prompt_version: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build a translations table row, moving large texts into contents"""
+    row = {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        **(packed_input if packed_input is not None else pack_text("input_text", input_text, contents)),
+        **pack_text("output_text", output_text, contents),
+        "source_lang": source_lang if source_lang != "auto" else None,
+        "target_lang": target_lang,
+        "modality": modality,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    if settings.HISTORY_PROMPT_VERSION and prompt_version:
+        row["prompt_version"] = prompt_version
+    return row
+
 
 class DatabaseService:
     """Service for handling database operations with Supabase"""
 
-    def __init__(self):
-        self.base_supabase: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_ANON_KEY
+    async def get_authenticated_client(self, access_token: Optional[str]) -> "AsyncClient":
+        """Get a Supabase client authenticated with the user's JWT token, or with the
+        service role key for work done without one, such as background jobs"""
+        from supabase import acreate_client, AsyncClientOptions
+
+        key = settings.SUPABASE_ANON_KEY
+        if access_token is None:
+            if not settings.SUPABASE_SERVICE_ROLE_KEY:
+                raise ValueError("SUPABASE_SERVICE_ROLE_KEY is required without a user token")
+            key = access_token = settings.SUPABASE_SERVICE_ROLE_KEY
+
+        options = AsyncClientOptions(
+            headers={"Authorization": f"Bearer {access_token}"},
+            auto_refresh_token=False,
+            persist_session=False,
+            httpx_client=clients.supabase_http,
         )
-    
-    def get_authenticated_client(self, access_token: str) -> Client:
-        """Get a Supabase client authenticated with the user's JWT token"""
-
-        options = ClientOptions()
-        options.headers = {"Authorization": f"Bearer {access_token}"}
-        
-        supabase = create_client(
+
+        supabase = await acreate_client(
             settings.SUPABASE_URL,
-            settings.SUPABASE_ANON_KEY,
+            key,
             options=options
         )
         return supabase
 
+    async def _save_contents(
+        self,
+        supabase: "AsyncClient",
+        user_id: str,
+        contents: Dict[str, str]
+    ) -> None:
+        """Store the large texts of rows about to be inserted, once per hash"""
+        if not contents:
+            return
+        rows = [
+            {"user_id": user_id, "hash": content_hash, "content": content}
+            for content_hash, content in contents.items()
+        ]
+        await supabase.table("translation_contents")\
+            .upsert(rows, on_conflict="user_id,hash", ignore_duplicates=True)\
+            .execute()
+
+    async def _load_contents(
+        self,
+        supabase: "AsyncClient",
+        user_id: str,
+        rows: List[Dict[str, Any]]
+    ) -> Dict[str, str]:
+        """Fetch the large texts referenced by translation rows"""
+        hashes = _content_hashes(rows)
+        batch_size = settings.HISTORY_CONTENT_BATCH_SIZE
+        contents = {}
+
+        for start in range(0, len(hashes), batch_size):
+            result = await supabase.table("translation_contents")\
+                .select("hash, content")\
+                .eq("user_id", user_id)\
+                .in_("hash", hashes[start:start + batch_size])\
+                .execute()
+            contents.update({row["hash"]: row["content"] for row in result.data or []})
+
+        return contents
+
     async def save_translation(
         self,
         user_id: str,
@@ -36,27 +183,24 @@ class DatabaseService:
         source_lang: Optional[str],
         target_lang: str,
         modality: str,
-        access_token: str
+        access_token: Optional[str],
+        prompt_version: Optional[str] = None
     ) -> Dict[str, Any]:
         """Save a translation record to the database"""
         try:
-            supabase = self.get_authenticated_client(access_token)
+            supabase = await self.get_authenticated_client(access_token)
             
-            translation_data = {
-                "id": str(uuid.uuid4()),
-                "user_id": user_id,
-                "input_text": input_text,
-                "output_text": output_text,
-                "source_lang": source_lang if source_lang != "auto" else None,
-                "target_lang": target_lang,
-                "modality": modality,
-                "created_at": datetime.utcnow().isoformat()
-            }
-
-            result = supabase.table("translations").insert(translation_data).execute()
+            contents = {}
+            translation_data = _translation_row(
+                user_id, input_text, output_text, source_lang, target_lang, modality,
+                contents, prompt_version=prompt_version
+            )
+
+            await self._save_contents(supabase, user_id, contents)
+            result = await supabase.table("translations").insert(translation_data).execute()
             
             if result.data:
-                return result.data[0]
+                return _unpack_row(result.data[0], contents)
             else:
                 raise Exception("Failed to save translation")
                 
@@ -64,29 +208,189 @@ class DatabaseService:
             print(f"Error saving translation: {e}")
             raise e
 
+    async def save_translations(
+        self,
+        user_id: str,
+        input_text: str,
+        translations: Dict[str, str],
+        source_lang: Optional[str],
+        modality: str,
+        access_token: str,
+        prompt_version: Optional[str] = None
+    ) -> list:
+        """Save one record per target language of the same input in a single insert"""
+        try:
+            supabase = await self.get_authenticated_client(access_token)
+
+            contents = {}
+            packed_input = pack_text("input_text", input_text, contents)
+            rows = [
+                _translation_row(
+                    user_id, input_text, output_text, source_lang, target_lang, modality,
+                    contents, packed_input=packed_input, prompt_version=prompt_version
+                )
+                for target_lang, output_text in translations.items()
+            ]
+
+            await self._save_contents(supabase, user_id, contents)
+            result = await supabase.table("translations").insert(rows).execute()
+
+            return [_unpack_row(row, contents) for row in result.data or []]
+
+        except Exception as e:
+            print(f"Error saving translations: {e}")
+            raise e
+
+    async def save_translation_batch(
+        self,
+        user_id: str,
+        records: List[Dict[str, str]],
+        modality: str,
+        access_token: str,
+        prompt_version: Optional[str] = None
+    ) -> list:
+        """Save translations of different inputs in a single insert.
+
+        Each record holds input_text, output_text, source_lang and target_lang.
+        """
+        try:
+            supabase = await self.get_authenticated_client(access_token)
+
+            contents = {}
+            rows = [
+                _translation_row(
+                    user_id, record["input_text"], record["output_text"],
+                    record["source_lang"], record["target_lang"], modality,
+                    contents, prompt_version=prompt_version
+                )
+                for record in records
+            ]
+
+            await self._save_contents(supabase, user_id, contents)
+            result = await supabase.table("translations").insert(rows).execute()
+
+            return [_unpack_row(row, contents) for row in result.data or []]
+
+        except Exception as e:
+            print(f"Error saving translation batch: {e}")
+            raise e
+
     async def get_user_translations(
         self,
         user_id: str,
         access_token: str,
         limit: int = 100,
-        offset: int = 0
-    ) -> list:
-        """Get translations for a specific user"""
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        summary: bool = False
+    ) -> Tuple[list, Optional[str]]:
+        """Get a page of translations for a user, newest first.
+
+        When a cursor is given the page starts after that (created_at, id)
+        position instead of using the offset. Returns the rows and the cursor
+        for the next page, or None when there are no more rows.
+        """
         try:
-            supabase = self.get_authenticated_client(access_token)
-            
-            result = supabase.table("translations")\
+            supabase = await self.get_authenticated_client(access_token)
+
+            if not summary:
+                columns = "*"
+            elif settings.HISTORY_PREVIEW_COLUMNS:
+                columns = PREVIEW_SUMMARY_COLUMNS
+            else:
+                columns = SUMMARY_COLUMNS
+
+            query = supabase.table("translations")\
+                .select(columns)\
+                .eq("user_id", user_id)
+
+            if cursor:
+                created_at, translation_id = decode_cursor(cursor)
+                query = query.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt.{translation_id})'
+                )
+
+            query = query\
+                .order("created_at", desc=True)\
+                .order("id", desc=True)\
+                .limit(limit + 1)
+
+            if offset and not cursor:
+                query = query.offset(offset)
+
+            result = await query.execute()
+            rows = result.data or []
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor(last["created_at"], last["id"])
+
+            # Summaries only show previews, which the text columns already hold
+            contents = {} if summary else await self._load_contents(supabase, user_id, rows)
+            rows = [_unpack_row(row, contents) for row in rows]
+
+            if summary:
+                for row in rows:
+                    row["input_text"] = _preview(row.get("input_text"))
+                    row["output_text"] = _preview(row.get("output_text"))
+
+            return rows, next_cursor
+
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error fetching user translations: {e}")
+            raise e
+
+    async def iter_user_translations(
+        self,
+        user_id: str,
+        access_token: str,
+        chunk_size: Optional[int] = None
+    ) -> AsyncIterator[list]:
+        """Yield all translations of a user in chunks, newest first"""
+        chunk_size = chunk_size or settings.HISTORY_EXPORT_CHUNK_SIZE
+        cursor = None
+
+        while True:
+            rows, cursor = await self.get_user_translations(
+                user_id=user_id,
+                access_token=access_token,
+                limit=chunk_size,
+                cursor=cursor
+            )
+            if rows:
+                yield rows
+            if not cursor:
+                break
+
+    async def get_translation(
+        self,
+        translation_id: str,
+        user_id: str,
+        access_token: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get a single translation record (only if it belongs to the user)"""
+        try:
+            supabase = await self.get_authenticated_client(access_token)
+
+            result = await supabase.table("translations")\
                 .select("*")\
+                .eq("id", translation_id)\
                 .eq("user_id", user_id)\
-                .order("created_at", desc=True)\
-                .limit(limit)\
-                .offset(offset)\
+                .limit(1)\
                 .execute()
-            
-            return result.data or []
-                
+
+            if not result.data:
+                return None
+            row = result.data[0]
+            return _unpack_row(row, await self._load_contents(supabase, user_id, [row]))
+
         except Exception as e:
-            print(f"Error fetching user translations: {e}")
+            print(f"Error fetching translation: {e}")
             raise e
 
     async def delete_translation(
@@ -97,9 +401,9 @@ class DatabaseService:
     ) -> bool:
         """Delete a translation record (only if it belongs to the user)"""
         try:
-            supabase = self.get_authenticated_client(access_token)
+            supabase = await self.get_authenticated_client(access_token)
             
-            result = supabase.table("translations")\
+            result = await supabase.table("translations")\
                 .delete()\
                 .eq("id", translation_id)\
                 .eq("user_id", user_id)\
@@ -109,4 +413,87 @@ class DatabaseService:
                 
         except Exception as e:
             print(f"Error deleting translation: {e}")
-            raise e
\ No newline at end of file
+            raise e
+
+    async def get_glossary_entries(
+        self,
+        user_id: str,
+        project: str,
+        access_token: str
+    ) -> list:
+        """Get every glossary entry of a user's project, paging past the row limit"""
+        try:
+            supabase = await self.get_authenticated_client(access_token)
+            page_size = settings.GLOSSARY_PAGE_SIZE
+            entries = []
+
+            while True:
+                result = await supabase.table("glossary_entries")\
+                    .select(GLOSSARY_COLUMNS)\
+                    .eq("user_id", user_id)\
+                    .eq("project", project)\
+                    .order("id")\
+                    .range(len(entries), len(entries) + page_size - 1)\
+                    .execute()
+
+                entries.extend(result.data or [])
+                if len(result.data or []) < page_size:
+                    return entries
+
+        except Exception as e:
+            print(f"Error fetching glossary entries: {e}")
+            raise e
+
+    async def save_glossary_entries(
+        self,
+        user_id: str,
+        project: str,
+        entries: list,
+        access_token: str
+    ) -> list:
+        """Save glossary entries to a user's project in a single insert"""
+        try:
+            supabase = await self.get_authenticated_client(access_token)
+
+            rows = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "project": project,
+                    "source_term": entry["source_term"],
+                    "target_lang": entry["target_lang"],
+                    "target_term": entry["target_term"],
+                    "created_at": datetime.utcnow().isoformat()
+                }
+                for entry in entries
+            ]
+
+            result = await supabase.table("glossary_entries").insert(rows).execute()
+
+            return result.data or []
+
+        except Exception as e:
+            print(f"Error saving glossary entries: {e}")
+            raise e
+
+    async def delete_glossary_entry(
+        self,
+        entry_id: str,
+        user_id: str,
+        access_token: str
+    ) -> bool:
+        """Delete a glossary entry (only if it belongs to the user)"""
+        try:
+            supabase = await self.get_authenticated_client(access_token)
+
+            result = await supabase.table("glossary_entries")\
+                .delete()\
+                .eq("id", entry_id)\
+                .eq("user_id", user_id)\
+                .execute()
+
+            return len(result.data) > 0
+
+        except Exception as e:
+            print(f"Error deleting glossary entry: {e}")
+            raise e
@@ -0,0 +1,180 @@
+import asyncio
+import io
+from typing import List
+
+from app.core.config import settings
+from app.core.workers import workers
+
+
+SUPPORTED_DOCUMENT_EXTENSIONS = ["txt", "md", "csv", "yaml", "yml", "pdf"]
+
+
+class ScannedPdfError(ValueError):
+    """Raised for a PDF whose pages have no text layer, such as a scanned document"""
+
+    def __init__(self, page_count: int):
+        super().__init__("No text could be extracted from the PDF")
+        self.page_count = page_count
+
+
+def get_document_extension(filename: str) -> str:
+    """Return the lowercase extension of a document, validating it is supported"""
+    file_extension = filename.lower().split(".")[-1]
+
+    if file_extension not in SUPPORTED_DOCUMENT_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported file type: .{file_extension}. "
+            f"Supported types: {', '.join(SUPPORTED_DOCUMENT_EXTENSIONS)}"
+        )
+
+    return file_extension
+
+
+def extract_document_text(document_content: bytes, file_extension: str) -> str:
+    """Extract the text of an uploaded document, raising ValueError when it has none"""
+    if file_extension == "pdf":
+        try:
+            import PyPDF2
+
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(document_content))
+
+            text_content = ""
+            for page in pdf_reader.pages:
+                text_content += page.extract_text() + "\n"
+        except Exception as e:
+            raise ValueError(f"Error processing PDF: {str(e)}")
+
+        if not text_content.strip():
+            if pdf_reader.pages:
+                raise ScannedPdfError(len(pdf_reader.pages))
+            raise ValueError("No text could be extracted from the PDF")
+    else:
+        try:
+            text_content = document_content.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ValueError(
+                "Unable to decode file. Please ensure it's a valid text file in UTF-8 encoding."
+            )
+
+    if not text_content.strip():
+        raise ValueError("Document appears to be empty")
+
+    return text_content
+
+
+def _render_pages(
+    document_content: bytes,
+    indexes: List[int],
+    scale: float,
+    max_dimension: int,
+    quality: int,
+) -> List[bytes]:
+    """Render PDF pages to downsampled JPEGs; runs in a worker process"""
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(document_content)
+    images = []
+    try:
+        for index in indexes:
+            page = pdf[index]
+            image = page.render(scale=scale).to_pil()
+            page.close()
+
+            image.thumbnail((max_dimension, max_dimension))
+            buffer = io.BytesIO()
+            image.convert("RGB").save(buffer, "JPEG", quality=quality, optimize=True)
+            images.append(buffer.getvalue())
+    finally:
+        pdf.close()
+
+    return images
+
+
+async def render_pdf_pages(document_content: bytes, page_count: int) -> List[bytes]:
+    """Render every page of a PDF to a JPEG across the worker pool, in page order"""
+    if page_count > settings.PDF_OCR_MAX_PAGES:
+        raise ValueError(
+            f"Scanned PDF has {page_count} pages; at most "
+            f"{settings.PDF_OCR_MAX_PAGES} pages can be read"
+        )
+
+    try:
+        import pypdfium2  # noqa: F401
+        import PIL  # noqa: F401
+    except ImportError:
+        raise ValueError(
+            "No text could be extracted from the PDF, and reading scanned PDFs "
+            "requires the pypdfium2 and Pillow packages"
+        )
+
+    # One contiguous run of pages per worker, so each parses the PDF only once
+    groups = min(page_count, workers.max_workers)
+    size = -(-page_count // groups)
+    rendered = await asyncio.gather(
+        *(
+            workers.run(
+                _render_pages,
+                document_content,
+                list(range(start, min(start + size, page_count))),
+                settings.PDF_RENDER_SCALE,
+                settings.PDF_RENDER_MAX_DIMENSION,
+                settings.PDF_RENDER_JPEG_QUALITY,
+            )
+            for start in range(0, page_count, size)
+        )
+    )
+
+    return [image for group in rendered for image in group]
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """Split text into chunks of at most max_chars, preferring paragraph and line breaks"""
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks: List[str] = []
+    current = ""
+
+    for paragraph in text.split("\n\n"):
+        pieces = [paragraph]
+        if len(paragraph) > max_chars:
+            pieces = _split_long(paragraph, max_chars)
+
+        for piece in pieces:
+            candidate = f"{current}\n\n{piece}" if current else piece
+            if len(candidate) <= max_chars:
+                current = candidate
+            else:
+                chunks.append(current)
+                current = piece
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Split a single oversized paragraph at line breaks, then at hard limits"""
+    pieces: List[str] = []
+    current = ""
+
+    for line in text.split("\n"):
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            pieces.append(current)
+            current = line
+
+    if current:
+        pieces.append(current)
+
+    return pieces
@@ -0,0 +1,186 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+# Scripts written without spaces are matched a character at a time, everything else by word.
+# Punctuation marks are tokens of their own, so terms such as "C++" and ".NET" match in full.
+_UNSPACED = "\u0e00-\u0eff\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff"
+TOKEN_PATTERN = re.compile(f"[{_UNSPACED}]|[^\\W{_UNSPACED}]+|[^\\w\\s]")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TermMatcher:
+    """Aho-Corasick automaton over word tokens, finding every term in one pass over the text"""
+
+    def __init__(self, terms: Iterable[str]):
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.terms_at: List[List[int]] = [[]]
+        # Nearest state along the fail chain that ends a term, so matching skips empty links
+        self.output_link: List[int] = [0]
+
+        for index, term in enumerate(terms):
+            self._insert(tokenize(term), index)
+        self._build_links()
+
+    def _insert(self, tokens: List[str], index: int):
+        if not tokens:
+            return
+
+        state = 0
+        for token in tokens:
+            next_state = self.transitions[state].get(token)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.fail.append(0)
+                self.terms_at.append([])
+                self.output_link.append(0)
+                self.transitions[state][token] = next_state
+            state = next_state
+        self.terms_at[state].append(index)
+
+    def _build_links(self):
+        queue = deque(self.transitions[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self.transitions[state].items():
+                fallback = self.fail[state]
+                while fallback and token not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.transitions[fallback].get(token, 0)
+
+                link = self.fail[next_state]
+                self.output_link[next_state] = (
+                    link if self.terms_at[link] else self.output_link[link]
+                )
+                queue.append(next_state)
+
+    def find(self, text: str) -> Set[int]:
+        """Indexes of the terms occurring in text as whole words, case-insensitively"""
+        transitions = self.transitions
+        root = transitions[0]
+        found: Set[int] = set()
+        state = 0
+
+        for token in tokenize(text):
+            if not state and token not in root:
+                continue
+            while state and token not in transitions[state]:
+                state = self.fail[state]
+            state = transitions[state].get(token, 0)
+
+            match_state = state
+            while match_state:
+                found.update(self.terms_at[match_state])
+                match_state = self.output_link[match_state]
+
+        return found
+
+
+class Glossary:
+    """A compiled glossary: source terms mapped to their required translation per language"""
+
+    def __init__(self, entries: Iterable[Dict[str, Any]]):
+        self.sources: List[str] = []
+        self.targets: List[Dict[str, str]] = []
+        positions: Dict[str, int] = {}
+
+        for entry in entries:
+            key = entry["source_term"].lower()
+            if key not in positions:
+                positions[key] = len(self.sources)
+                self.sources.append(entry["source_term"])
+                self.targets.append({})
+            self.targets[positions[key]][entry["target_lang"]] = entry["target_term"]
+
+        self.matcher = TermMatcher(self.sources)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def lookup(self, text: str, target_lang: str) -> Dict[str, str]:
+        """Glossary entries for target_lang whose source term occurs in text"""
+        if not self.sources:
+            return {}
+
+        terms = {}
+        for index in sorted(self.matcher.find(text)):
+            target_term = self.targets[index].get(target_lang)
+            if target_term:
+                terms[self.sources[index]] = target_term
+        return terms
+
+    @staticmethod
+    def missing_terms(translated_text: str, terms: Dict[str, str]) -> List[str]:
+        """Required target terms that don't appear in the translation"""
+        lowered = translated_text.lower()
+        return [target for target in terms.values() if target.lower() not in lowered]
+
+
+class GlossaryService:
+    """Loads users' glossaries and keeps the compiled automatons in an LRU cache"""
+
+    def __init__(self, get_database: Callable[[], Any]):
+        self.get_database = get_database
+        self.cache: "OrderedDict[Tuple[str, str], Tuple[float, Glossary]]" = OrderedDict()
+
+    async def get(self, user_id: str, project: str, access_token: str) -> Glossary:
+        key = (user_id, project)
+        cached = self.cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.cache.move_to_end(key)
+            return cached[1]
+
+        try:
+            entries = await self.get_database().get_glossary_entries(
+                user_id=user_id, project=project, access_token=access_token
+            )
+        except Exception:
+            # Remember the failure briefly so an outage isn't queried on every request
+            self._store(key, Glossary([]), settings.GLOSSARY_FAILURE_CACHE_TTL)
+            raise
+
+        glossary = await asyncio.to_thread(Glossary, entries)
+        ttl = settings.GLOSSARY_CACHE_TTL if glossary else settings.GLOSSARY_EMPTY_CACHE_TTL
+        self._store(key, glossary, ttl)
+        return glossary
+
+    def _store(self, key: Tuple[str, str], glossary: Glossary, ttl: float):
+        self.cache[key] = (time.monotonic() + ttl, glossary)
+        self.cache.move_to_end(key)
+        while len(self.cache) > settings.GLOSSARY_CACHE_SIZE:
+            self.cache.popitem(last=False)
+
+    async def lookup(
+        self,
+        user_id: str,
+        project: Optional[str],
+        access_token: str,
+        text: str,
+        target_langs: List[str],
+    ) -> Dict[str, Dict[str, str]]:
+        """Glossary terms occurring in text for each target language; empty if unavailable"""
+        if not project:
+            return {}
+
+        try:
+            glossary = await self.get(user_id, project, access_token)
+        except Exception as e:
+            print(f"Failed to load glossary, translating without it: {e}")
+            return {}
+
+        return {lang: glossary.lookup(text, lang) for lang in target_langs}
+
+    def invalidate(self, user_id: str):
+        for key in [key for key in self.cache if key[0] == user_id]:
+            del self.cache[key]
@@ -0,0 +1,502 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.validation import check_callback_url
+from app.services.document import render_pdf_pages, split_text
+from app.services.structured import parse_document
+from app.services.tokens import track_usage
+
+
+JOB_COLUMNS = [
+    "id",
+    "user_id",
+    "kind",
+    "status",
+    "progress_done",
+    "progress_total",
+    "payload",
+    "result",
+    "error",
+    "callback_url",
+    "created_at",
+    "updated_at",
+]
+
+
+class JobStore:
+    """SQLite-backed persistence for background jobs, safe to share between processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialize()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _initialize(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress_done INTEGER NOT NULL DEFAULT 0,
+                    progress_total INTEGER NOT NULL DEFAULT 0,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    callback_url TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)"
+            )
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(
+        self,
+        user_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        callback_url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        now = time.time()
+        job_id = str(uuid.uuid4())
+
+        with self._connect() as connection:
+            connection.execute(
+                """INSERT INTO jobs (id, user_id, kind, status, payload, callback_url, created_at, updated_at)
+                VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)""",
+                (job_id, user_id, kind, json.dumps(payload), callback_url, now, now),
+            )
+
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as connection:
+            row = connection.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim_next(self, stale_before: float) -> Optional[Dict[str, Any]]:
+        """Atomically mark the oldest queued (or abandoned running) job as running"""
+        with self._connect() as connection:
+            row = connection.execute(
+                f"""UPDATE jobs SET status = 'running', updated_at = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' OR (status = 'running' AND updated_at < ?)
+                    ORDER BY created_at
+                    LIMIT 1
+                )
+                RETURNING {', '.join(JOB_COLUMNS)}""",
+                (time.time(), stale_before),
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def purge(self, finished_before: float) -> int:
+        """Delete completed and failed jobs that ended before the given time"""
+        with self._connect() as connection:
+            cursor = connection.execute(
+                """DELETE FROM jobs
+                WHERE status IN ('completed', 'failed') AND updated_at < ?""",
+                (finished_before,),
+            )
+        return cursor.rowcount
+
+    def update(self, job_id: str, **fields: Any):
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as connection:
+            connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+
+
+class JobService:
+    """Runs document and audio translation jobs on a bounded pool of background workers"""
+
+    def __init__(
+        self,
+        get_translator: Callable[[], Any],
+        get_audio: Callable[[], Any],
+        get_database: Callable[[], Any],
+        get_token_budget: Callable[[], Any],
+    ):
+        self.get_translator = get_translator
+        self.get_audio = get_audio
+        self.get_database = get_database
+        self.get_token_budget = get_token_budget
+        self.store = JobStore(settings.JOBS_DB_PATH)
+        self.workers: List[asyncio.Task] = []
+        self.cleanup_task: Optional[asyncio.Task] = None
+        self.running_jobs: Dict[str, Dict[str, Any]] = {}
+        self.wake_up = asyncio.Event()
+
+    async def submit(
+        self,
+        user_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        callback_url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Persist a new job and wake an idle worker to pick it up"""
+        job = await asyncio.to_thread(
+            self.store.create, user_id, kind, payload, callback_url
+        )
+        self.wake_up.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def save_file(self, content: bytes, suffix: str) -> str:
+        """Store an uploaded file for a job so it survives restarts"""
+        os.makedirs(settings.JOBS_FILES_DIR, exist_ok=True)
+        path = os.path.join(settings.JOBS_FILES_DIR, f"{uuid.uuid4()}{suffix}")
+        await asyncio.to_thread(_write_file, path, content)
+        return path
+
+    def start(self):
+        """Start the worker tasks; jobs left over from a previous run are picked up again"""
+        if self.workers:
+            return
+
+        for _ in range(settings.JOB_WORKERS):
+            self.workers.append(asyncio.create_task(self._worker()))
+        self.cleanup_task = asyncio.create_task(self._cleanup())
+        print(f"Started {settings.JOB_WORKERS} job worker(s)")
+
+    async def stop(self):
+        """Stop the workers and return their unfinished jobs to the queue"""
+        tasks = [*self.workers, *([self.cleanup_task] if self.cleanup_task else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self.cleanup_task = None
+
+        for job_id in list(self.running_jobs):
+            await asyncio.to_thread(self.store.update, job_id, status="queued")
+        self.running_jobs.clear()
+
+    async def _worker(self):
+        while True:
+            try:
+                stale_before = time.time() - settings.JOB_STALE_SECONDS
+                job = await asyncio.to_thread(self.store.claim_next, stale_before)
+            except Exception as e:
+                print(f"Failed to claim job: {e}")
+                job = None
+
+            if job is None:
+                self.wake_up.clear()
+                try:
+                    await asyncio.wait_for(
+                        self.wake_up.wait(), timeout=settings.JOB_POLL_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Left in running_jobs if cancelled so stop() can requeue it
+            self.running_jobs[job["id"]] = job
+            heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+            try:
+                await self._run(job)
+            finally:
+                heartbeat.cancel()
+            self.running_jobs.pop(job["id"], None)
+
+    async def _heartbeat(self, job_id: str):
+        """Keep a running job's updated_at fresh so other workers don't reclaim it as stale"""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            try:
+                await asyncio.to_thread(self.store.update, job_id)
+            except Exception as e:
+                print(f"Job {job_id} heartbeat failed: {e}")
+
+    async def _cleanup(self):
+        """Periodically delete finished jobs older than the retention period"""
+        while True:
+            try:
+                finished_before = time.time() - settings.JOB_RETENTION_SECONDS
+                purged = await asyncio.to_thread(self.store.purge, finished_before)
+                if purged:
+                    print(f"Purged {purged} finished job(s)")
+            except Exception as e:
+                print(f"Failed to purge jobs: {e}")
+            await asyncio.sleep(settings.JOB_CLEANUP_INTERVAL)
+
+    async def _run(self, job: Dict[str, Any]):
+        try:
+            with track_usage() as usage:
+                try:
+                    result = await self._execute(job)
+                finally:
+                    await self.get_token_budget().record(job["user_id"], usage)
+
+            await asyncio.to_thread(
+                self.store.update, job["id"], status="completed", result=result, error=None
+            )
+            self._remove_file(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Job {job['id']} failed: {e}")
+            try:
+                await asyncio.to_thread(
+                    self.store.update, job["id"], status="failed", error=str(e)
+                )
+            except Exception as store_error:
+                print(f"Failed to record job failure: {store_error}")
+            self._remove_file(job)
+
+        await self._notify(job["id"])
+
+    async def _execute(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if job["kind"] == "document":
+            return await self._run_document(job)
+        if job["kind"] == "audio":
+            return await self._run_audio(job)
+        raise ValueError(f"Unknown job kind: {job['kind']}")
+
+    async def _progress(self, job_id: str, done: int, total: int):
+        await asyncio.to_thread(
+            self.store.update, job_id, progress_done=done, progress_total=total
+        )
+
+    async def _run_document(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        payload = job["payload"]
+        if payload.get("file_path"):
+            return await self._run_scanned_pdf(job)
+
+        translator = self.get_translator()
+        text_content = payload["text"]
+        target_lang = payload["target_lang"]
+        document = parse_document(text_content, payload.get("document_type"))
+        source_lang = translator.detect_document_language(
+            text_content, payload["source_lang"], document
+        )
+
+        if source_lang == target_lang:
+            translated_content = text_content
+        elif document is not None:
+            # Structured documents are batched by value, so progress counts batches
+            await self._progress(job["id"], 0, 1)
+            translated_content = await translator.document_translate(
+                document_content=text_content,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                document=document,
+                on_progress=lambda done, total: self._progress(job["id"], done, total),
+            )
+        else:
+            # Chunks share the language detected for the whole document
+            chunks = split_text(text_content, settings.DOCUMENT_CHUNK_CHARS)
+            await self._progress(job["id"], 0, len(chunks))
+
+            translated_chunks = []
+            for index, chunk in enumerate(chunks):
+                translated_chunks.append(
+                    await translator.document_translate(
+                        document_content=chunk,
+                        source_lang=source_lang,
+                        target_lang=target_lang,
+                    )
+                )
+                await self._progress(job["id"], index + 1, len(chunks))
+
+            translated_content = "\n\n".join(translated_chunks)
+
+        await self._save_history(
+            job,
+            text_content,
+            translated_content,
+            source_lang,
+            target_lang,
+            "document",
+            translator.document_prompt_version(document),
+        )
+
+        return {
+            "translated_text": translated_content,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "original_filename": payload["filename"],
+            "document_type": payload["document_type"],
+        }
+
+    async def _run_scanned_pdf(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        payload = job["payload"]
+        translator = self.get_translator()
+        target_lang = payload["target_lang"]
+        await self._progress(job["id"], 0, payload["page_count"])
+
+        document_content = await asyncio.to_thread(_read_file, payload["file_path"])
+        pages = await render_pdf_pages(document_content, payload["page_count"])
+        result = await translator.scanned_pdf_translate(
+            pages,
+            payload["source_lang"],
+            target_lang,
+            on_progress=lambda done, total: self._progress(job["id"], done, total),
+        )
+
+        if not result["extracted_text"]:
+            raise ValueError("No text could be extracted from the PDF")
+
+        source_lang = translator.detect_source_language(
+            result["extracted_text"], payload["source_lang"]
+        )
+        await self._save_history(
+            job,
+            result["extracted_text"],
+            result["translated_text"],
+            source_lang,
+            target_lang,
+            "document",
+            translator.prompt_version("image"),
+        )
+
+        return {
+            "translated_text": result["translated_text"],
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "original_filename": payload["filename"],
+            "document_type": payload["document_type"],
+        }
+
+    async def _run_audio(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        payload = job["payload"]
+        target_lang = payload["target_lang"]
+        await self._progress(job["id"], 0, 1)
+
+        audio_content = await asyncio.to_thread(_read_file, payload["file_path"])
+        result = await self.get_audio().process_audio_file(audio_content, target_lang)
+
+        if "error" in result:
+            raise RuntimeError(result["error"])
+
+        await self._progress(job["id"], 1, 1)
+
+        transcribed_text = result.get("transcribed_text", "")
+        translated_text = result.get("translated_text")
+        source_lang = result.get("source_lang", "auto")
+
+        if transcribed_text and translated_text:
+            await self._save_history(
+                job,
+                transcribed_text,
+                translated_text,
+                source_lang,
+                target_lang,
+                "audio",
+                self.get_translator().prompt_version("text"),
+            )
+
+        return {
+            "transcribed_text": transcribed_text,
+            "translated_text": translated_text,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "original_filename": payload["filename"],
+        }
+
+    async def _save_history(
+        self,
+        job: Dict[str, Any],
+        input_text: str,
+        output_text: str,
+        source_lang: str,
+        target_lang: str,
+        modality: str,
+        prompt_version: Optional[str] = None,
+    ):
+        try:
+            await self.get_database().save_translation(
+                user_id=job["user_id"],
+                input_text=input_text,
+                output_text=output_text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                modality=modality,
+                # Jobs don't keep the user's token; history is saved with the service key
+                access_token=None,
+                prompt_version=prompt_version,
+            )
+        except Exception as db_error:
+            print(f"Failed to save translation to database: {db_error}")
+
+    async def _notify(self, job_id: str):
+        """POST the final job state to the job's callback URL, if any"""
+        job = await self.get(job_id)
+        if not job or not job["callback_url"]:
+            return
+
+        try:
+            # Checked again in case the host now resolves to an internal address
+            await check_callback_url(job["callback_url"])
+            response = await clients.callback_http.post(
+                job["callback_url"], json=job_response(job)
+            )
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Job {job_id} callback failed: {e}")
+
+    def _remove_file(self, job: Dict[str, Any]):
+        file_path = job["payload"].get("file_path")
+        if file_path and os.path.exists(file_path):
+            os.unlink(file_path)
+
+
+def _write_file(path: str, content: bytes):
+    with open(path, "wb") as file:
+        file.write(content)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job, without the stored payload"""
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress_done": job["progress_done"],
+        "progress_total": job["progress_total"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
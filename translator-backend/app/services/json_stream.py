@@ -0,0 +1,100 @@
+"""Incremental parsing of the flat JSON objects the vision prompts reply with.
+
+The parser is fed the reply as it streams and reports each top-level string
+field once its closing quote arrives, scanning every character only once. Its
+state at the end of the reply doubles as the repair step for replies that were
+truncated or wrapped in prose.
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+
+class JsonObjectStream:
+    """Collects the top-level string fields of a JSON object from streamed chunks"""
+
+    def __init__(self):
+        self.fields: Dict[str, str] = {}
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key: Optional[str] = None
+        self._expect_value = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Consume a chunk of the reply, returning the fields it completed"""
+        completed = []
+        for char in chunk:
+            if self._in_string:
+                self._buffer.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    field = self._end_string()
+                    if field:
+                        completed.append(field)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._buffer = [char]
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth = max(self._depth - 1, 0)
+            elif char == ":" and self._depth == 1:
+                self._expect_value = self._key is not None
+            elif char == "," and self._depth == 1:
+                self._key = None
+                self._expect_value = False
+        return completed
+
+    def close(self) -> Dict[str, str]:
+        """Fields read so far, keeping a value the reply was cut off in the middle of"""
+        if self._in_string and self._depth == 1 and self._expect_value:
+            raw = "".join(self._buffer)
+            # Drop a dangling escape, then close the string the model never finished
+            if self._escaped:
+                raw = raw[:-1]
+            try:
+                self.fields.setdefault(self._key, json.loads(raw + '"'))
+            except ValueError:
+                pass
+        return self.fields
+
+    def _end_string(self) -> Optional[Tuple[str, str]]:
+        if self._depth != 1:
+            return None
+
+        try:
+            value = json.loads("".join(self._buffer))
+        except ValueError:
+            return None
+
+        if not self._expect_value:
+            self._key = value
+            return None
+
+        self.fields[self._key] = value
+        field = (self._key, value)
+        self._key = None
+        self._expect_value = False
+        return field
+
+
+def parse_json_object(content: str) -> Optional[dict]:
+    """Decode a JSON object reply, repairing it once from its readable fields if needed"""
+    try:
+        result = json.loads(content)
+        if isinstance(result, dict):
+            return result
+    except ValueError:
+        pass
+
+    parser = JsonObjectStream()
+    parser.feed(content)
+    return parser.close() or None
@@ -0,0 +1,316 @@
+"""Local language identification used before calling the LLM"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.core.languages import SUPPORTED_LANGUAGE_CODES
+
+
+# Scripts that identify a single supported language on their own.
+# Keys are the first word of the Unicode character name.
+SCRIPT_TO_LANGUAGE: Dict[str, str] = {
+    "ARMENIAN": "hy",
+    "CANADIAN": "iu-cans",
+    "GEORGIAN": "ka",
+    "GREEK": "el",
+    "GUJARATI": "gu",
+    "GURMUKHI": "pa",
+    "HANGUL": "ko",
+    "KHMER": "km",
+    "LAO": "lo",
+    "MALAYALAM": "ml",
+    "NKO": "nqo",
+    "OL": "sat-olck",
+    "ORIYA": "or",
+    "SINHALA": "si",
+    "TAMIL": "ta",
+    "TELUGU": "te",
+    "THAANA": "dv",
+    "THAI": "th",
+    "TIFINAGH": "ber-tfng",
+}
+
+# Scripts shared by several supported languages that no profile tells apart.
+# The first code is the most common one, reported with ambiguous confidence.
+SHARED_SCRIPTS: Dict[str, List[str]] = {
+    "BENGALI": ["bn", "as", "mni"],
+    "ETHIOPIC": ["am", "ti"],
+    "HEBREW": ["he", "yi"],
+    "KANNADA": ["kn", "tcy"],
+    "MYANMAR": ["my", "shn"],
+    "TIBETAN": ["bo", "dz"],
+}
+
+# Common characters written differently in simplified and traditional Chinese,
+# position for position, and characters only written Cantonese uses.
+SIMPLIFIED_CHARS = "这个们来时为说国会对过还发没学么样经现进动开关种见问题电话长车东门马书记认让边应该爱买卖钱语读写听习无与从头难观义实点机总业华体万气间请谢"
+TRADITIONAL_CHARS = "這個們來時為說國會對過還發沒學麼樣經現進動開關種見問題電話長車東門馬書記認讓邊應該愛買賣錢語讀寫聽習無與從頭難觀義實點機總業華體萬氣間請謝"
+CANTONESE_CHARS = "嘅咗喺冇佢啲嘢唔咁哋乜嚟睇噉"
+
+# Sample text per language used to build the character n-gram profiles.
+# Profiles are only compared against languages written in the same script.
+# Regional variants and dialects read as the profiled language they are closest
+# to; Galician and Malay have no profile because samples this size can't keep
+# them apart from Portuguese and Indonesian.
+PROFILE_SAMPLES: Dict[str, Dict[str, str]] = {
+    "LATIN": {
+        "en": "All human beings are born free and equal in dignity and rights. They are endowed with reason and conscience and should act towards one another in a spirit of brotherhood. I do not know where the station is, but we will ask someone who lives here. This is what we have been thinking about the whole day, and there would be no other way to do it with them.",
+        "es": "Todos los seres humanos nacen libres e iguales en dignidad y derechos y, dotados como están de razón y conciencia, deben comportarse fraternalmente los unos con los otros. No sé dónde está la estación, pero se lo vamos a preguntar a alguien que vive aquí. Me gustaría saber qué hora es y por qué no hay nadie en la casa. Anoche estuvimos mucho tiempo paseando por el parque y después entramos en una pequeña cafetería donde sirven un té muy rico y pan recién hecho. Sería bueno que esta ciudad estuviera más limpia.",
+        "fr": "Tous les êtres humains naissent libres et égaux en dignité et en droits. Ils sont doués de raison et de conscience et doivent agir les uns envers les autres dans un esprit de fraternité. Je ne sais pas où se trouve la gare, mais nous allons le demander à quelqu'un qui habite ici. C'est une chose que nous avons faite avec eux.",
+        "de": "Alle Menschen sind frei und gleich an Würde und Rechten geboren. Sie sind mit Vernunft und Gewissen begabt und sollen einander im Geist der Brüderlichkeit begegnen. Ich weiß nicht, wo der Bahnhof ist, aber wir werden jemanden fragen, der hier wohnt. Das ist nicht das, was wir uns die ganze Zeit gedacht haben.",
+        "it": "Tutti gli esseri umani nascono liberi ed eguali in dignità e diritti. Essi sono dotati di ragione e di coscienza e devono agire gli uni verso gli altri in spirito di fratellanza. Non so dove sia la stazione, ma lo chiederemo a qualcuno che abita qui. Questo è quello che abbiamo pensato per tutto il giorno.",
+        "pt": "Todos os seres humanos nascem livres e iguais em dignidade e em direitos. Dotados de razão e de consciência, devem agir uns para com os outros em espírito de fraternidade. Não sei onde fica a estação, mas vamos perguntar a alguém que mora aqui. Isso é o que nós estávamos pensando o dia inteiro, não há outra maneira. Ontem à noite ficamos muito tempo passeando pelo parque e depois entramos num pequeno café onde servem um chá muito gostoso e pães frescos. Seria bom se esta cidade ficasse mais limpa.",
+        "nl": "Alle mensen worden vrij en gelijk in waardigheid en rechten geboren. Zij zijn begiftigd met verstand en geweten, en behoren zich jegens elkander in een geest van broederschap te gedragen. Ik weet niet waar het station is, maar we zullen het vragen aan iemand die hier woont. Dat is wat we de hele dag hebben gedacht.",
+        "af": "Alle menslike wesens word vry, met gelyke waardigheid en regte, gebore. Hulle het rede en gewete en behoort in die gees van broederskap teenoor mekaar op te tree. Ek weet nie waar die stasie is nie, maar ons sal iemand vra wat hier woon. Dit is waaraan ons die hele dag gedink het.",
+        "sv": "Alla människor är födda fria och lika i värde och rättigheter. De har utrustats med förnuft och samvete och bör handla gentemot varandra i en anda av broderskap. Jag vet inte var stationen ligger, men vi ska fråga någon som bor här. Det är det som vi har tänkt på hela dagen och det finns inget annat sätt.",
+        "da": "Alle mennesker er født frie og lige i værdighed og rettigheder. De er udstyret med fornuft og samvittighed, og de bør handle mod hverandre i en broderskabets ånd. Jeg ved ikke, hvor stationen ligger, men vi vil spørge en, der bor her. Det er det, vi har tænkt på hele dagen, og der er ingen anden måde.",
+        "no": "Alle mennesker er født frie og med samme menneskeverd og menneskerettigheter. De er utstyrt med fornuft og samvittighet og bør handle mot hverandre i brorskapets ånd. Jeg vet ikke hvor stasjonen ligger, men vi skal spørre noen som bor her. Det er det vi har tenkt på hele dagen, og det finnes ingen annen måte.",
+        "fi": "Kaikki ihmiset syntyvät vapaina ja tasavertaisina arvoltaan ja oikeuksiltaan. Heille on annettu järki ja omatunto, ja heidän on toimittava toisiaan kohtaan veljeyden hengessä. En tiedä missä asema on, mutta kysymme joltakulta joka asuu täällä. Sitä me olemme ajatelleet koko päivän, eikä ole muuta tapaa.",
+        "et": "Kõik inimesed sünnivad vabadena ja võrdsetena oma väärikuselt ja õigustelt. Neile on antud mõistus ja südametunnistus ja nende suhtumist üksteisesse peab kandma vendluse vaim. Ma ei tea, kus jaam asub, aga me küsime kelleltki, kes siin elab.",
+        "pl": "Wszyscy ludzie rodzą się wolni i równi pod względem swej godności i swych praw. Są oni obdarzeni rozumem i sumieniem i powinni postępować wobec innych w duchu braterstwa. Nie wiem, gdzie jest dworzec, ale zapytamy kogoś, kto tu mieszka. To jest to, o czym myśleliśmy przez cały dzień.",
+        "cs": "Všichni lidé rodí se svobodní a sobě rovní co do důstojnosti a práv. Jsou nadáni rozumem a svědomím a mají spolu jednat v duchu bratrství. Nevím, kde je nádraží, ale zeptáme se někoho, kdo tady bydlí. To je to, na co jsme celý den mysleli, a není jiná cesta.",
+        "sk": "Všetci ľudia sa rodia slobodní a sebe rovní, čo sa týka ich dôstojnosti a práv. Sú obdarení rozumom a svedomím a majú navzájom jednať v bratskom duchu. Neviem, kde je stanica, ale opýtame sa niekoho, kto tu býva. To je to, na čo sme celý deň mysleli.",
+        "sl": "Vsi ljudje se rodijo svobodni in imajo enako dostojanstvo in enake pravice. Obdarjeni so z razumom in vestjo in bi morali ravnati drug z drugim kakor bratje. Ne vem, kje je postaja, ampak bomo vprašali nekoga, ki živi tukaj.",
+        "hr": "Sva ljudska bića rađaju se slobodna i jednaka u dostojanstvu i pravima. Ona su obdarena razumom i sviješću pa trebaju jedna prema drugima postupati u duhu bratstva. Ne znam gdje je kolodvor, ali pitat ćemo nekoga tko ovdje živi. To je ono o čemu smo mislili cijeli dan.",
+        "ro": "Toate ființele umane se nasc libere și egale în demnitate și în drepturi. Ele sunt înzestrate cu rațiune și conștiință și trebuie să se comporte unele față de altele în spiritul fraternității. Nu știu unde este gara, dar vom întreba pe cineva care locuiește aici.",
+        "hu": "Minden emberi lény szabadnak születik és egyenlő méltósága és joga van. Az emberek, ésszel és lelkiismerettel bírván, egymással szemben testvéri szellemben kell hogy viseltessenek. Nem tudom, hol van az állomás, de megkérdezünk valakit, aki itt lakik. Ez az, amire egész nap gondoltunk.",
+        "lt": "Visi žmonės gimsta laisvi ir lygūs savo orumu ir teisėmis. Jiems suteiktas protas ir sąžinė, todėl jie turi elgtis vienas kito atžvilgiu kaip broliai. Nežinau, kur yra stotis, bet paklausime ką nors, kas čia gyvena.",
+        "lv": "Visi cilvēki piedzimst brīvi un vienlīdzīgi savā pašcieņā un tiesībās. Viņi ir apveltīti ar saprātu un sirdsapziņu, un viņiem jāizturas citam pret citu brālības garā. Es nezinu, kur ir stacija, bet mēs pajautāsim kādam, kas šeit dzīvo.",
+        "tr": "Bütün insanlar hür, haysiyet ve haklar bakımından eşit doğarlar. Akıl ve vicdana sahiptirler ve birbirlerine karşı kardeşlik zihniyeti ile hareket etmelidirler. İstasyonun nerede olduğunu bilmiyorum, ama burada yaşayan birine soracağız. Bütün gün bunu düşündük ve başka bir yol yok.",
+        "az": "Bütün insanlar ləyaqət və hüquqlarına görə azad və bərabər doğulurlar. Onların şüurları və vicdanları var və bir-birlərinə münasibətdə qardaşlıq ruhunda davranmalıdırlar. Stansiyanın harada olduğunu bilmirəm, amma burada yaşayan birindən soruşacağıq.",
+        "id": "Semua orang dilahirkan merdeka dan mempunyai martabat dan hak-hak yang sama. Mereka dikaruniai akal dan hati nurani dan hendaknya bergaul satu sama lain dalam semangat persaudaraan. Saya tidak tahu di mana stasiunnya, tetapi kami akan bertanya kepada seseorang yang tinggal di sini. Tadi malam kami lama berjalan-jalan di taman, lalu masuk ke sebuah kafe kecil yang menjual teh yang sangat enak dan roti segar. Akan lebih baik kalau kota ini bisa lebih bersih.",
+        "vi": "Tất cả mọi người sinh ra đều được tự do và bình đẳng về nhân phẩm và quyền lợi. Mọi con người đều được tạo hóa ban cho lý trí và lương tâm và cần phải đối xử với nhau trong tình bằng hữu. Tôi không biết nhà ga ở đâu, nhưng chúng tôi sẽ hỏi một người sống ở đây.",
+        "ca": "Tots els éssers humans neixen lliures i iguals en dignitat i en drets. Són dotats de raó i de consciència, i han de comportar-se fraternalment els uns amb els altres. No sé on és l'estació, però ho preguntarem a algú que viu aquí. Això és el que hem pensat tot el dia.",
+        "fil": "Ang lahat ng tao'y isinilang na malaya at pantay-pantay sa karangalan at mga karapatan. Sila'y pinagkalooban ng katwiran at budhi at dapat magturingan sa isa't isa sa diwa ng pagkakapatiran. Hindi ko alam kung nasaan ang istasyon, pero magtatanong kami sa isang taong nakatira dito.",
+        "sw": "Watu wote wamezaliwa huru, hadhi na haki zao ni sawa. Wote wamejaliwa akili na dhamiri, hivyo yapasa watendeane kindugu. Sijui kituo kiko wapi, lakini tutamwuliza mtu anayeishi hapa. Hili ndilo tulilokuwa tukifikiria siku nzima na hakuna njia nyingine.",
+    },
+    "CYRILLIC": {
+        "ru": "Все люди рождаются свободными и равными в своем достоинстве и правах. Они наделены разумом и совестью и должны поступать в отношении друг друга в духе братства. Я не знаю, где находится вокзал, но мы спросим кого-нибудь, кто здесь живёт. Это то, о чём мы думали весь день. Вчера вечером мы долго гуляли по парку, а потом зашли в небольшое кафе, где подают очень вкусный чай и свежие пирожки. Было бы хорошо, если бы этот город стал чище. Мой дом находится недалеко от рынка, поэтому я обычно хожу туда пешком. Сегодня была хорошая погода, и мы решили пообедать на улице.",
+        "uk": "Всі люди народжуються вільними і рівними у своїй гідності та правах. Вони наділені розумом і совістю і повинні діяти у відношенні один до одного в дусі братерства. Я не знаю, де знаходиться вокзал, але ми запитаємо когось, хто тут живе. Це те, про що ми думали цілий день.",
+        "be": "Усе людзі нараджаюцца свабоднымі і роўнымі ў сваёй годнасці і правах. Яны надзелены розумам і сумленнем і павінны ставіцца адзін да аднаго ў духу брацтва. Я не ведаю, дзе знаходзіцца вакзал, але мы спытаем каго-небудзь, хто тут жыве.",
+        "bg": "Всички хора се раждат свободни и равни по достойнство и права. Те са надарени с разум и съвест и следва да се отнасят помежду си в дух на братство. Не знам къде е гарата, но ще попитаме някой, който живее тук. Това е, за което мислихме цял ден. Вчера вечерта дълго се разхождахме в парка, а след това влязохме в малко кафене, където сервират много вкусен чай и пресни банички. Би било хубаво, ако този град стане по-чист. Моята къща не е далеч от пазара, затова обикновено ходя пеша. Днес времето беше хубаво и решихме да обядваме навън.",
+        "sr": "Сва људска бића рађају се слободна и једнака у достојанству и правима. Она су обдарена разумом и свешћу и треба једни према другима да поступају у духу братства. Не знам где је станица, али питаћемо некога ко овде живи. То је оно о чему смо мислили цео дан.",
+        "mk": "Сите човечки суштества се раѓаат слободни и еднакви по достоинство и права. Тие се обдарени со разум и совест и треба да се однесуваат еден кон друг во духот на братството. Не знам каде е станицата, но ќе прашаме некого кој живее тука. Вчера навечер долго шетавме низ паркот, а потоа влеговме во мало кафуле, каде што служат многу вкусен чај и свежи пити. Би било убаво ако овој град стане почист. Мојата куќа не е далеку од пазарот, затоа обично одам пеш. Денес времето беше убаво и решивме да ручаме надвор.",
+        "kk": "Барлық адамдар тумысынан азат және қадір-қасиеті мен құқықтары тең болып дүниеге келеді. Адамдарға ақыл-парасат, ар-ождан берілген, сондықтан олар бір-бірімен туыстық, бауырмалдық қарым-қатынас жасаулары тиіс.",
+        "mn": "Хүн бүр төрж мэндлэхэд эрх чөлөөтэй, адилхан нэр төртэй, ижил эрхтэй байдаг. Оюун ухаан, нандин чанар заяасан хүн гэгч өөр хоорондоо ахан дүүгийн үзэл санаагаар харьцах учиртай.",
+    },
+    "ARABIC": {
+        "ar": "يولد جميع الناس أحرارًا متساوين في الكرامة والحقوق. وقد وهبوا عقلاً وضميرًا وعليهم أن يعامل بعضهم بعضًا بروح الإخاء. لا أعرف أين المحطة، لكننا سنسأل شخصًا يعيش هنا. هذا هو ما كنا نفكر فيه طوال اليوم.",
+        "fa": "تمام افراد بشر آزاد به دنیا می‌آیند و از لحاظ حیثیت و حقوق با هم برابرند. همه دارای عقل و وجدان هستند و باید نسبت به یکدیگر با روح برادری رفتار کنند. نمی‌دانم ایستگاه کجاست، اما از کسی که اینجا زندگی می‌کند می‌پرسیم.",
+        "ur": "تمام انسان آزاد اور حقوق و عزت کے اعتبار سے برابر پیدا ہوئے ہیں۔ انہیں ضمیر اور عقل ودیعت ہوئی ہے۔ اس لیے انہیں ایک دوسرے کے ساتھ بھائی چارے کا سلوک کرنا چاہیے۔ مجھے نہیں معلوم کہ اسٹیشن کہاں ہے، لیکن ہم یہاں رہنے والے کسی سے پوچھیں گے۔",
+    },
+    "DEVANAGARI": {
+        "hi": "सभी मनुष्यों को गौरव और अधिकारों के मामले में जन्मजात स्वतन्त्रता और समानता प्राप्त है। उन्हें बुद्धि और अन्तरात्मा की देन प्राप्त है और परस्पर उन्हें भाईचारे के भाव से बर्ताव करना चाहिए। मुझे नहीं पता कि स्टेशन कहाँ है, लेकिन हम यहाँ रहने वाले किसी से पूछेंगे। कल शाम हम देर तक पार्क में घूमते रहे, फिर एक छोटे से कैफ़े में गए जहाँ बहुत स्वादिष्ट चाय और ताज़ा समोसे मिलते हैं। अच्छा होता अगर यह शहर और साफ़ होता। मेरा घर बाज़ार से ज़्यादा दूर नहीं है, इसलिए मैं अक्सर पैदल ही जाता हूँ। आज मौसम अच्छा था, इसलिए हम बाहर खाना खाने गए।",
+        "mr": "सर्व मानवी व्यक्ति जन्मतःच स्वतंत्र आहेत व त्यांना समान प्रतिष्ठा व समान अधिकार आहेत. त्यांना विचारशक्ती व सदसद्विवेकबुद्धी लाभलेली आहे व त्यांनी एकमेकांशी बंधुत्वाच्या भावनेने आचरण करावे. मला माहित नाही स्टेशन कुठे आहे, पण आम्ही इथे राहणाऱ्या कोणालातरी विचारू. काल संध्याकाळी आम्ही बराच वेळ बागेत फिरलो, मग एका छोट्या कॅफेमध्ये गेलो जिथे खूप चविष्ट चहा आणि ताजे समोसे मिळतात. हे शहर अजून स्वच्छ असते तर बरे झाले असते. माझे घर बाजारापासून फार लांब नाही, म्हणून मी बहुतेक वेळा चालतच जातो. आज हवामान चांगले होते म्हणून आम्ही बाहेर जेवायला गेलो.",
+        "ne": "सबै व्यक्तिहरू जन्मजात स्वतन्त्र हुन् ती सबैको समान अधिकार र महत्व छ। निजहरूमा विचार शक्ति र सद्विचार भएकोले निजहरूले आपसमा भ्रातृत्वको भावनाबाट व्यवहार गर्नु पर्छ। मलाई थाहा छैन स्टेसन कहाँ छ, तर हामी यहाँ बस्ने कसैलाई सोध्नेछौं। हिजो बेलुका हामी लामो समयसम्म पार्कमा घुम्यौं, अनि एउटा सानो चिया पसलमा गयौं जहाँ धेरै मीठो चिया र ताजा रोटी पाइन्छ। यो सहर अझ सफा भए राम्रो हुन्थ्यो। मेरो घर बजारबाट धेरै टाढा छैन, त्यसैले म प्रायः हिँडेरै जान्छु। आज मौसम राम्रो भएकोले हामी बाहिर खाना खान गयौं।",
+    },
+}
+
+# Frequent function words per language, used as whole-word features on top
+# of the character n-grams so that short inputs still separate close languages.
+COMMON_WORDS: Dict[str, str] = {
+    "en": "the of and to in is you that it he was for on are as with his they at be this have from or one had by but not what all were we when your can said there use an each which she do how their if will up other about out many then them these so some her would make like him into time has look two more go see no way could my than been who its now did get come made may part me i am please hello thanks yes our us just",
+    "es": "el la de que y en un una es se no los las por con para su al lo como más pero sus le ya o este sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos durante todos uno les ni contra otros ese eso ante ellos e esto mí antes algunos qué unos yo otro otras otra él tanto esa estos mucho quienes nada muchos cual poco ella estar estas algunas algo nosotros mi tu te ti tus estás está hola gracias",
+    "fr": "le la les de des du un une et est en que qui dans pour pas sur au aux avec ce il elle ils nous vous je tu on ne se sont mais ou où par plus son sa ses leur cette été être avoir fait comme tout bien très aussi votre vos mon ma mes ton ta bonjour merci oui non",
+    "de": "der die das und ist in zu den von nicht mit sich des auf für ein eine einer einem einen als auch es an er so dass kann sie wie wir ich du bei oder aber im dem noch nach hat wird sind war haben nur wenn mir dir mich dich uns ihr euch hallo danke ja nein geht gut",
+    "it": "il lo la i gli le di a da in con su per tra fra e che è non un una uno del della dei delle al alla ai sono ma come anche se più questo questa quello mi ti ci si io tu lui lei noi voi loro mio tuo suo ho hai ha abbiamo ciao grazie sì bene stai",
+    "pt": "o a os as de do da dos das em no na nos nas um uma e que é não com por para se mas mais como ao à seu sua eu você ele ela nós eles elas meu minha isso isto está estou são foi ser ter tem muito também já olá obrigado obrigada sim bem",
+    "nl": "de het een en van in is dat op te zijn met voor niet aan er om ook als bij of maar nog wat uit dan hij zij ik je jij we wij ze hoe naar heb heeft hebben was werd wordt door over dit deze die mijn jouw hallo dank ja nee goed",
+    "af": "die en van in is dat op te wees met vir nie aan daar om ook as by of maar nog wat uit dan hy sy ek jy ons hulle hoe na het was word deur oor hierdie my jou hallo dankie ja nee goed",
+    "sv": "och i att det som en på är av för med till den har de inte om ett han men var jag sig från vi så kan man när år säga hon under också efter eller nu sin där vid mot ska skulle kommer hej tack ja nej hur mår du",
+    "da": "og i at det som en på er af for med til den har de ikke om et han men var jeg sig fra vi så kan man når år sige hun under også efter eller nu sin der ved mod skal skulle kommer hej tak ja nej hvordan hvad jeg",
+    "no": "og i at det som en på er av for med til den har de ikke om et han men var jeg seg fra vi så kan man når år si hun under også etter eller nå sin der ved mot skal skulle kommer hei takk ja nei hvordan hva ikke",
+    "fi": "ja on ei se että oli hän mutta kun niin tai kuin myös ovat olla ole jos sen sitä tämä mitä minä sinä me te he mikä kanssa vain hyvä kiitos kyllä moi hei mitä kuuluu",
+    "et": "ja on ei et see oli ta aga kui nii või kui ka nad olla ole kas seda mis mina sina meie teie nemad kes koos ainult hea aitäh jah tere",
+    "pl": "i w na z że się nie do to jest o jak ale co tak za od po tylko jego jej już czy mnie mi ty ja my wy oni być był była było są ten ta te dla przez może bardzo dzień dobry dziękuję tak",
+    "cs": "a v na se že je to s z do o i jak ale co tak za od po jen jeho její už nebo mě mi ty já my vy oni být byl byla bylo jsou ten ta to pro přes může velmi dobrý den děkuji ano ne",
+    "sk": "a v na sa že je to s z do o i ako ale čo tak za od po len jeho jej už alebo ma mi ty ja my vy oni byť bol bola bolo sú ten tá to pre cez môže veľmi dobrý deň ďakujem áno nie",
+    "sl": "in v na se da je to s z do o kot ali kaj tako za od po samo njegov njen že ali me mi ti jaz mi vi oni biti bil bila bilo so ta to za skozi lahko zelo dober dan hvala da ne",
+    "hr": "i u na se da je to s sa iz do o kao ali što tako za od po samo njegov njezin već ili me mi ti ja mi vi oni biti bio bila bilo su taj ta to za kroz može vrlo dobar dan hvala da ne",
+    "ro": "și în de la a că nu cu pe un o este sunt pentru mai ce din care se le lui al ale ai cum dar sau eu tu el ea noi voi ei ele foarte bună ziua mulțumesc da",
+    "hu": "a az és hogy nem is van egy meg de ez el már csak mint volt ki mi ha vagy én te ő mi ti ők itt ott nagyon jó köszönöm igen nem szia",
+    "lt": "ir į yra kad ne su kaip bet tai iš ar jo jos aš tu jis ji mes jūs jie labai ačiū taip labas",
+    "lv": "un ir ka ne ar kā bet tas no vai viņa viņš es tu mēs jūs viņi ļoti paldies jā labdien",
+    "tr": "ve bir bu da de için ile ne ben sen o biz siz onlar çok daha gibi ama değil var yok mi mı mu mü olarak kadar sonra en her şey nasıl merhaba teşekkürler evet hayır iyi",
+    "az": "və bir bu da də üçün ilə nə mən sən o biz siz onlar çox daha kimi amma deyil var yox olaraq qədər sonra ən hər şey necə salam təşəkkür bəli xeyr yaxşı",
+    "id": "yang dan di ke dari ini itu dengan untuk tidak ada dalam akan pada juga saya kamu anda dia kami kita mereka apa bisa sudah atau karena seperti baik terima kasih ya selamat pagi",
+    "vi": "và của là có không được một những cho trong với này người các đã để khi tôi bạn anh chị em chúng ta họ rất cảm ơn vâng xin chào",
+    "ca": "el la els les de del i que és en un una per amb no al als com més però seu seva jo tu ell ella nosaltres vosaltres ells molt gràcies sí bon dia estàs",
+    "fil": "ang ng sa na at mga ay si ni ko mo ka siya kami tayo kayo sila ito iyan hindi oo po salamat magandang umaga kumusta",
+    "sw": "na ya wa kwa ni la za katika hii huo yeye mimi wewe sisi ninyi wao sana asante ndiyo hapana habari jambo",
+    "ru": "и в не на я что он с как а то все она так его но да ты к у же вы за бы по только ее мне было вот от меня еще нет о из ему теперь когда даже ну ли если уже или ни быть был него до вас привет спасибо хорошо как дела",
+    "uk": "і в не на я що він з як а то все вона так його але так ти до у же ви за б по тільки її мені було ось від мене ще ні про з йому тепер коли навіть чи якщо вже або бути був привіт дякую добре",
+    "be": "і ў не на я што ён з як а то ўсё яна так яго але так ты да у ж вы за б па толькі яе мне было вось ад мяне яшчэ не пра з яму цяпер калі нават ці калі ўжо або быць быў прывітанне дзякуй",
+    "bg": "и в не на аз че той с като а то всичко тя така го но да ти към у вие за би по само нея ми беше ето от мен още не за от него сега когато дори или ако вече е са съм си здравей благодаря добре",
+    "sr": "и у не на ја да он са као а то све она тако га али да ти ка код ви за би по само њу ми било ево од мене још не о из њему сада када чак или ако већ је су сам си здраво хвала добро",
+    "mk": "и во не на јас дека тој со како а тоа сè таа така го но да ти кон кај вие за би по само неа ми беше ете од мене уште не за од него сега кога дури или ако веќе е се сум си здраво благодарам добро",
+    "kk": "және мен сен ол біз сіз олар бұл сол үшін бар жоқ емес өте рахмет иә сәлем қалайсыз",
+    "mn": "ба би чи тэр бид та тэд энэ тэр нь байна байгаа биш маш баярлалаа тийм сайн байна уу",
+    "hi": "का के की है में और को से पर यह वह नहीं हैं था थे थी एक भी तो कि जो कर किया करना लिए साथ बहुत अपने हम आप मैं तुम वे इस उस कुछ कोई क्या क्यों कैसे अब यहाँ वहाँ होता होती धन्यवाद नमस्ते हाँ",
+    "mr": "आणि आहे आहेत होते होता होती या ते त्या तो ती हे ही व ला ना चा ची चे मध्ये साठी पण नाही काय कसे मी तू आम्ही तुम्ही आपण त्यांनी केले केला करणे खूप आता इथे तिथे नमस्कार धन्यवाद हो",
+    "ne": "र छ छन् थियो थिए हो होइन को का की मा ले लाई बाट पनि यो त्यो यी ती एक म तिमी हामी तपाईं उनी उनीहरू गर्नु गरेको गर्छ भएको हुन्छ धेरै अहिले यहाँ त्यहाँ नमस्ते धन्यवाद हजुर लागि",
+}
+
+NGRAM_SIZES = (1, 2, 3)
+SMOOTHING = 0.5
+MAX_SAMPLE_CHARS = 2000
+FULL_CONFIDENCE_LETTERS = 40
+FULL_CONFIDENCE_MARGIN = 0.2
+# Distinguishing Chinese characters needed for full confidence in a variant
+FULL_CONFIDENCE_HAN_CHARS = 4
+# Kept below LANGUAGE_DETECTION_MIN_CONFIDENCE so ambiguous results stay "auto"
+AMBIGUOUS_CONFIDENCE = 0.2
+# Weight of whole words in the input, which short texts have too few n-grams without
+WORD_WEIGHT = 3
+
+_NON_LETTER_RE = re.compile(r"[\W\d_]+", re.UNICODE)
+
+
+def _char_script(char: str) -> Optional[str]:
+    """Return the script of a letter from its Unicode character name"""
+    name = unicodedata.name(char, "")
+    if not name:
+        return None
+    if name.startswith("CJK"):
+        return "HAN"
+    return name.split(" ", 1)[0]
+
+
+def _features(text: str, word_weight: int = 1) -> Counter:
+    """Count character n-grams and whole words of the text"""
+    counts: Counter = Counter()
+    for word in _NON_LETTER_RE.sub(" ", text.lower()).split():
+        counts[f"<{word}>"] += word_weight
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                gram = padded[i : i + n]
+                if gram.strip():
+                    counts[gram] += 1
+    return counts
+
+
+class LanguageModel:
+    """Smoothed log-probabilities of features for a single language"""
+
+    def __init__(self, sample: str):
+        counts = _features(sample)
+        self.denominator = sum(counts.values()) + SMOOTHING * len(counts) * len(NGRAM_SIZES)
+        self.log_probs: Dict[str, float] = {
+            feature: math.log((count + SMOOTHING) / self.denominator)
+            for feature, count in counts.items()
+        }
+        self.unseen_log_prob = math.log(SMOOTHING / self.denominator)
+
+    def score(self, features: Counter) -> float:
+        """Log-likelihood of the given features under this language"""
+        return sum(
+            count * self.log_probs.get(feature, self.unseen_log_prob)
+            for feature, count in features.items()
+        )
+
+
+class LanguageDetector:
+    """Character n-gram language identifier that runs locally on the CPU"""
+
+    def __init__(self):
+        self.models: Dict[str, Dict[str, LanguageModel]] = {
+            script: self._script_models(samples) for script, samples in PROFILE_SAMPLES.items()
+        }
+        self.simplified_chars = frozenset(SIMPLIFIED_CHARS)
+        self.traditional_chars = frozenset(TRADITIONAL_CHARS)
+        self.cantonese_chars = frozenset(CANTONESE_CHARS)
+
+    @staticmethod
+    def _script_models(samples: Dict[str, str]) -> Dict[str, LanguageModel]:
+        models = {
+            code: LanguageModel(f"{sample} {COMMON_WORDS.get(code, '')}")
+            for code, sample in samples.items()
+            if code in SUPPORTED_LANGUAGE_CODES
+        }
+        # Unseen features cost the same in every language of the script, or the
+        # language with the shortest sample would win whatever it hasn't seen
+        if models:
+            unseen_log_prob = math.log(
+                SMOOTHING / max(model.denominator for model in models.values())
+            )
+            for model in models.values():
+                model.unseen_log_prob = unseen_log_prob
+        return models
+
+    def detect(self, text: str) -> Tuple[Optional[str], float]:
+        """Detect the language of text, returning (code, confidence between 0 and 1)"""
+        sample = text[:MAX_SAMPLE_CHARS]
+        letters = [char for char in sample if char.isalpha()]
+        if not letters:
+            return None, 0.0
+
+        scripts = Counter(_char_script(char) for char in letters)
+        script, script_count = scripts.most_common(1)[0]
+        script_share = script_count / len(letters)
+
+        if script in ("HAN", "HIRAGANA", "KATAKANA") and (
+            scripts["HIRAGANA"] or scripts["KATAKANA"]
+        ):
+            return "ja", script_share
+
+        if script in SCRIPT_TO_LANGUAGE:
+            return SCRIPT_TO_LANGUAGE[script], script_share
+
+        if script == "HAN":
+            return self._detect_han(sample, script_share)
+
+        if script in SHARED_SCRIPTS:
+            return SHARED_SCRIPTS[script][0], min(script_share, AMBIGUOUS_CONFIDENCE)
+
+        models = self.models.get(script)
+        if not models:
+            return None, 0.0
+
+        features = _features(sample, WORD_WEIGHT)
+        total = sum(features.values())
+        scores = self._rank(features, models)
+        best_code, best_score = scores[0]
+        if len(scores) == 1:
+            return best_code, min(script_share, AMBIGUOUS_CONFIDENCE)
+
+        # Average per-feature log-likelihood gap to the runner-up, scaled so that
+        # short or mixed-script inputs never reach full confidence.
+        margin = (best_score - scores[1][1]) / total
+        confidence = (
+            min(1.0, margin / FULL_CONFIDENCE_MARGIN)
+            * min(1.0, len(letters) / FULL_CONFIDENCE_LETTERS)
+            * script_share
+        )
+        return best_code, confidence
+
+    def _detect_han(self, sample: str, script_share: float) -> Tuple[str, float]:
+        """Tell simplified, traditional and Cantonese Chinese apart by their characters"""
+        cantonese = sum(char in self.cantonese_chars for char in sample)
+        if cantonese >= 2:
+            return "yue", min(1.0, cantonese / FULL_CONFIDENCE_HAN_CHARS) * script_share
+
+        simplified = sum(char in self.simplified_chars for char in sample)
+        traditional = sum(char in self.traditional_chars for char in sample)
+        distinguishing = simplified + traditional
+        if not distinguishing:
+            return "zh-CN", min(script_share, AMBIGUOUS_CONFIDENCE)
+
+        code = "zh-CN" if simplified >= traditional else "zh-TW"
+        confidence = (
+            abs(simplified - traditional)
+            / distinguishing
+            * min(1.0, distinguishing / FULL_CONFIDENCE_HAN_CHARS)
+            * script_share
+        )
+        return code, confidence
+
+    def _rank(
+        self, features: Counter, models: Dict[str, LanguageModel]
+    ) -> List[Tuple[str, float]]:
+        """Score features against each candidate language, best first"""
+        scores = [(code, model.score(features)) for code, model in models.items()]
+        return sorted(scores, key=lambda item: item[1], reverse=True)
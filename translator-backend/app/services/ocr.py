@@ -0,0 +1,76 @@
+"""Local OCR with Tesseract, used before falling back to the vision model"""
+
+import io
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.workers import workers
+
+
+@lru_cache
+def local_ocr_available() -> bool:
+    """Whether pytesseract, Pillow and the tesseract binary are installed, checked once"""
+    if not settings.LOCAL_OCR_ENABLED:
+        return False
+
+    try:
+        import PIL  # noqa: F401
+        import pytesseract
+
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception as e:
+        print(f"Local OCR unavailable, images go to the vision model: {e}")
+        return False
+
+
+def _recognize(image_content: bytes, languages: str) -> Tuple[str, float]:
+    """Text in reading order and its mean word confidence (0-100); runs in a worker process"""
+    import pytesseract
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_content))
+    image.load()
+    data = pytesseract.image_to_data(
+        image.convert("RGB"), lang=languages, output_type=pytesseract.Output.DICT
+    )
+
+    lines = {}
+    weighted_confidence = 0.0
+    characters = 0
+    for index, word in enumerate(data["text"]):
+        word = word.strip()
+        confidence = float(data["conf"][index])
+        if not word or confidence < 0:
+            continue
+
+        key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+        lines.setdefault(key, []).append(word)
+        # Weighted by length so a misread long word counts for more than a stray mark
+        weighted_confidence += confidence * len(word)
+        characters += len(word)
+
+    if not characters:
+        return "", 0.0
+
+    paragraphs = {}
+    for (block, paragraph, _), words in lines.items():
+        paragraphs.setdefault((block, paragraph), []).append(" ".join(words))
+
+    text = "\n\n".join("\n".join(paragraph) for paragraph in paragraphs.values())
+    return text, weighted_confidence / characters
+
+
+async def recognize_text(image_content: bytes) -> Optional[Tuple[str, float]]:
+    """Run local OCR in the worker pool, or None when it's unavailable or fails"""
+    if not local_ocr_available():
+        return None
+
+    try:
+        return await workers.run(
+            _recognize, image_content, settings.LOCAL_OCR_LANGUAGES
+        )
+    except Exception as e:
+        print(f"Local OCR failed, using the vision model: {e}")
+        return None
@@ -0,0 +1,374 @@
+"""Structure-aware parsing of CSV, YAML and Markdown documents.
+
+Each parser extracts only the translatable string values of a document,
+deduplicated, and renders the document back with their translations in place
+so keys, numbers, markup and layout never pass through the model.
+"""
+
+import csv
+import io
+import json
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+
+# Document types parsed into values, with the name the prompt uses for them
+STRUCTURED_DOCUMENT_TYPES = {"csv": "CSV", "yaml": "YAML", "yml": "YAML", "md": "Markdown"}
+
+URL_PATTERN = re.compile(r"^(?:[a-z][a-z0-9+.\-]*://|www\.|mailto:)\S*$", re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+# Identifier-like tokens: a single word containing an underscore, digit, path
+# separator or camelCase hump, such as user_id, SKU-42, /api/v1 or firstName
+IDENTIFIER_PATTERN = re.compile(r"^[\w.\-/:@#+]+$")
+IDENTIFIER_HINT = re.compile(r"[_\d/:@#]|[a-z][A-Z]")
+LITERAL_VALUES = {"true", "false", "null", "none", "nan"}
+
+
+def is_translatable(value: str) -> bool:
+    """Whether a string value is natural-language text rather than data"""
+    value = value.strip()
+    if not value or not any(char.isalpha() for char in value):
+        return False
+    if value.lower() in LITERAL_VALUES:
+        return False
+    if URL_PATTERN.match(value) or EMAIL_PATTERN.match(value):
+        return False
+    if IDENTIFIER_PATTERN.match(value) and IDENTIFIER_HINT.search(value):
+        return False
+    return True
+
+
+class StructuredDocument(ABC):
+    """A parsed document: its unique translatable values and a way to put translations back"""
+
+    # Key in STRUCTURED_DOCUMENT_TYPES naming the format in prompts
+    document_type: str
+
+    def __init__(self, segments: List[str]):
+        self.segments = list(dict.fromkeys(segments))
+
+    @abstractmethod
+    def render(self, translations: Dict[str, str]) -> str:
+        """The document with each translated value put back in place"""
+
+
+class CsvDocument(StructuredDocument):
+    """CSV rows re-written with the same dialect, translating text cells but not headers"""
+
+    document_type = "csv"
+
+    def __init__(self, text: str):
+        sample = text[:65536]
+        sniffer = csv.Sniffer()
+        try:
+            self.dialect = sniffer.sniff(sample, delimiters=",;\t|")
+            has_header = sniffer.has_header(sample)
+        except csv.Error:
+            self.dialect = csv.excel
+            has_header = False
+
+        self.rows = list(csv.reader(io.StringIO(text, newline=""), self.dialect))
+        self.header_rows = 1 if has_header else 0
+        self.line_terminator = "\r\n" if "\r\n" in sample else "\n"
+        self.trailing_newline = text.endswith(("\n", "\r"))
+
+        super().__init__(
+            [
+                cell.strip()
+                for row in self.rows[self.header_rows:]
+                for cell in row
+                if is_translatable(cell)
+            ]
+        )
+
+    def render(self, translations: Dict[str, str]) -> str:
+        buffer = io.StringIO(newline="")
+        writer = csv.writer(
+            buffer, self.dialect, lineterminator=self.line_terminator
+        )
+        writer.writerows(self.rows[: self.header_rows])
+        for row in self.rows[self.header_rows:]:
+            writer.writerow([_replace_stripped(cell, translations) for cell in row])
+
+        output = buffer.getvalue()
+        if not self.trailing_newline:
+            output = output[: -len(self.line_terminator)]
+        return output
+
+
+class YamlDocument(StructuredDocument):
+    """YAML with string values substituted in place, keeping keys, comments and layout"""
+
+    document_type = "yaml"
+
+    # Anchors and tags that precede a scalar's own text in the source
+    NODE_PROPERTIES = re.compile(r"^(?:[&!]\S*\s+)*")
+
+    def __init__(self, text: str):
+        import yaml
+
+        self.text = text
+        self.spans: List[Tuple[int, int, str, Optional[str]]] = []
+        seen = set()
+
+        def visit(node, is_key: bool = False):
+            if id(node) in seen:
+                return
+            seen.add(id(node))
+
+            if isinstance(node, yaml.MappingNode):
+                for key, value in node.value:
+                    visit(key, is_key=True)
+                    visit(value)
+            elif isinstance(node, yaml.SequenceNode):
+                for item in node.value:
+                    visit(item)
+            elif (
+                not is_key
+                and node.tag == "tag:yaml.org,2002:str"
+                and is_translatable(node.value)
+            ):
+                self.spans.append(
+                    (node.start_mark.index, node.end_mark.index, node.value, node.style)
+                )
+
+        for document in yaml.compose_all(text, Loader=yaml.SafeLoader):
+            if document is not None:
+                visit(document)
+
+        self.spans.sort()
+        super().__init__([value.strip() for _, _, value, _ in self.spans])
+
+    def render(self, translations: Dict[str, str]) -> str:
+        parts = []
+        position = 0
+        for start, end, value, style in self.spans:
+            translated = _replace_stripped(value, translations)
+            source = self.text[start:end]
+            properties = self.NODE_PROPERTIES.match(source).group(0)
+
+            parts.append(self.text[position:start])
+            parts.append(properties)
+            parts.append(self._scalar(source[len(properties):], translated, style))
+            position = end
+
+        parts.append(self.text[position:])
+        return "".join(parts)
+
+    @staticmethod
+    def _scalar(source: str, value: str, style: Optional[str]) -> str:
+        """YAML text for value, keeping the original scalar style where it stays valid"""
+        if style in ("|", ">"):
+            header, _, body = source.partition("\n")
+            content = body.rstrip("\n")
+            first_line = next((line for line in body.split("\n") if line.strip()), "")
+            indent = first_line[: len(first_line) - len(first_line.lstrip())]
+            lines = [
+                f"{indent}{line}" if line else "" for line in value.rstrip("\n").split("\n")
+            ]
+            return f"{header}\n" + "\n".join(lines) + body[len(content):]
+
+        if "\n" not in value:
+            if style == "'":
+                return "'" + value.replace("'", "''") + "'"
+            if not style and _is_plain_safe(value):
+                return value
+
+        return json.dumps(value, ensure_ascii=False)
+
+
+class MarkdownDocument(StructuredDocument):
+    """Markdown text blocks, headings, list items and table cells, leaving code and markup alone"""
+
+    document_type = "md"
+
+    FENCE = re.compile(r"^\s*(```|~~~)")
+    TABLE_DIVIDER = re.compile(r"^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+    RULE = re.compile(r"^\s*(?:(?:[-*_]\s*){3,}|=+)\s*$")
+    LITERAL_LINE = re.compile(r"^\s*(?:<|\[[^\]]+\]:\s|!\[[^\]]*\]\([^)]*\)\s*$)")
+    BLOCK_PREFIX = re.compile(
+        r"^(\s*(?:>\s?)*(?:#{1,6}\s+|[-*+]\s+(?:\[[ xX]\]\s+)?|\d{1,9}[.)]\s+)?)(.*?)(\s*)$"
+    )
+    CELL_SEPARATOR = re.compile(r"((?<!\\)\|)")
+
+    def __init__(self, text: str):
+        self.parts: List[str] = []
+        # Positions in parts holding translatable text, with that text
+        self.slots: Dict[int, str] = {}
+
+        lines = text.splitlines(keepends=True)
+        in_front_matter = False
+        in_fence = False
+        in_table = False
+        previous_blank = True
+        paragraph_slot: Optional[int] = None
+
+        for index, raw in enumerate(lines):
+            line = raw.rstrip("\r\n")
+            newline = raw[len(line):]
+            next_line = lines[index + 1] if index + 1 < len(lines) else ""
+
+            if index == 0 and line.strip() == "---":
+                in_front_matter = True
+                self._literal(raw)
+                continue
+            if in_front_matter:
+                in_front_matter = line.strip() not in ("---", "...")
+                self._literal(raw)
+                continue
+
+            if self.FENCE.match(line):
+                in_fence = not in_fence
+                self._literal(raw)
+                paragraph_slot = None
+                previous_blank = False
+                continue
+
+            indented_code = previous_blank and paragraph_slot is None and (
+                line.startswith("    ") or line.startswith("\t")
+            )
+            if (
+                in_fence
+                or not line.strip()
+                or indented_code
+                or self.RULE.match(line)
+                or self.LITERAL_LINE.match(line)
+            ):
+                self._literal(raw)
+                paragraph_slot = None
+                previous_blank = not line.strip()
+                in_table = in_table and bool(line.strip()) and not in_fence
+                continue
+            previous_blank = False
+
+            if self.TABLE_DIVIDER.match(line) and "-" in line:
+                self._literal(raw)
+                in_table = True
+                paragraph_slot = None
+                continue
+
+            if "|" in line and (
+                in_table or line.lstrip().startswith("|") or self.TABLE_DIVIDER.match(next_line.rstrip("\r\n"))
+            ):
+                self._table_row(line)
+                self._literal(newline)
+                in_table = True
+                paragraph_slot = None
+                continue
+            in_table = False
+
+            prefix, content, trailing = self.BLOCK_PREFIX.match(line).groups()
+            hard_break = trailing.startswith("  ") or content.endswith("\\")
+
+            if paragraph_slot is not None and not prefix.strip():
+                # A wrapped paragraph line joins the block it continues
+                self.slots[paragraph_slot] += " " + content
+                self.parts[paragraph_slot] = self.slots[paragraph_slot]
+                self.parts[paragraph_slot + 1] = trailing + newline
+                paragraph_slot = None if hard_break else paragraph_slot
+                continue
+
+            self._literal(prefix)
+            slot = self._text(content)
+            self._literal(trailing + newline)
+            is_heading = prefix.lstrip(" >").startswith("#")
+            paragraph_slot = None if slot is None or hard_break or is_heading else slot
+
+        super().__init__(list(self.slots.values()))
+
+    def _literal(self, text: str):
+        self.parts.append(text)
+
+    def _text(self, content: str) -> Optional[int]:
+        self.parts.append(content)
+        if not is_translatable(content):
+            return None
+        self.slots[len(self.parts) - 1] = content
+        return len(self.parts) - 1
+
+    def _table_row(self, line: str):
+        for piece in self.CELL_SEPARATOR.split(line):
+            if piece == "|":
+                self._literal(piece)
+                continue
+            stripped = piece.strip()
+            start = piece.index(stripped) if stripped else len(piece)
+            self._literal(piece[:start])
+            self._text(stripped)
+            self._literal(piece[start + len(stripped):])
+
+    def render(self, translations: Dict[str, str]) -> str:
+        parts = list(self.parts)
+        for position, content in self.slots.items():
+            parts[position] = translations.get(content, content)
+        return "".join(parts)
+
+
+def _replace_stripped(value: str, translations: Dict[str, str]) -> str:
+    """Translate value while keeping its surrounding whitespace"""
+    stripped = value.strip()
+    translated = translations.get(stripped)
+    if not stripped or translated is None:
+        return value
+    start = value.index(stripped)
+    return value[:start] + translated + value[start + len(stripped):]
+
+
+def _is_plain_safe(value: str) -> bool:
+    """Whether value can be written as a plain YAML scalar and read back unchanged"""
+    import yaml
+
+    if (
+        not value
+        or value != value.strip()
+        or value[0] in "-?:!&*|>'\"%@`"
+        or ": " in value
+        or " #" in value
+        or any(char in value for char in ",[]{}")
+    ):
+        return False
+    try:
+        return yaml.safe_load(value) == value
+    except yaml.YAMLError:
+        return False
+
+
+def parse_document(text: str, document_type: Optional[str]) -> Optional[StructuredDocument]:
+    """Parse a document into its translatable values, or None to translate it as plain text.
+
+    Parsing is not cached; callers parse a document once and pass the result on.
+    """
+    if document_type not in STRUCTURED_DOCUMENT_TYPES:
+        return None
+
+    try:
+        if document_type == "csv":
+            document = CsvDocument(text)
+        elif document_type == "md":
+            document = MarkdownDocument(text)
+        else:
+            document = YamlDocument(text)
+    except Exception as e:
+        print(f"Could not parse {document_type} document, translating it as text: {e}")
+        return None
+
+    return document
+
+
+def batch_segments(segments: List[str], max_chars: int) -> List[List[str]]:
+    """Group segments into batches of at most max_chars characters each"""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+
+    for segment in segments:
+        if current and size + len(segment) > max_chars:
+            batches.append(current)
+            current, size = [], 0
+        current.append(segment)
+        size += len(segment)
+
+    if current:
+        batches.append(current)
+    return batches
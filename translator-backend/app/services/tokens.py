@@ -0,0 +1,302 @@
+import asyncio
+import contextvars
+import os
+import sqlite3
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+# Context window and completion cap per model; unknown models use gpt-4o's limits
+MODEL_LIMITS = {
+    "gpt-4o": {"context": 128000, "output": 16384},
+    "gpt-4o-mini": {"context": 128000, "output": 16384},
+    "gpt-4.1": {"context": 1047576, "output": 32768},
+    "gpt-4.1-mini": {"context": 1047576, "output": 32768},
+}
+
+# Tokens taken by the system message and instructions wrapped around the text in each prompt
+PROMPT_OVERHEAD_TOKENS = 300
+
+# Completion tokens per input token for target scripts the tokenizer splits more
+# finely than Latin text; other targets use TOKEN_COMPLETION_RATIO
+DENSE_SCRIPT_RATIO = 2.0
+COMPLEX_SCRIPT_RATIO = 2.5
+TARGET_COMPLETION_RATIOS: Dict[str, float] = {
+    **dict.fromkeys(
+        [
+            "ja", "ko", "zh-CN", "zh-TW", "yue", "el", "he", "yi",
+            "ar", "fa", "ur", "ps", "ug", "sd", "ckb",
+        ],
+        DENSE_SCRIPT_RATIO,
+    ),
+    **dict.fromkeys(
+        [
+            "hi", "mr", "ne", "mai", "bho", "awa", "doi", "gom", "new", "sa", "mwr",
+            "bn", "as", "mni", "gu", "pa", "or", "ta", "te", "kn", "tcy", "ml", "si",
+            "th", "lo", "km", "my", "shn", "bo", "dz", "dv", "am", "ti", "ka", "hy",
+            "sat-olck", "iu-cans", "nqo", "ber-tfng",
+        ],
+        COMPLEX_SCRIPT_RATIO,
+    ),
+}
+
+_request_usage: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "request_usage", default=None
+)
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised before calling the model when a request would exceed a token budget"""
+
+    def __init__(self, detail: str, status_code: int = 413):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class CompletionTruncated(TokenBudgetExceeded):
+    """Raised when the model's reply is cut off even at its output limit"""
+
+
+def completion_ratio(target_lang: str) -> float:
+    """Expected completion tokens per input token when translating into target_lang"""
+    return max(
+        settings.TOKEN_COMPLETION_RATIO,
+        TARGET_COMPLETION_RATIOS.get(target_lang, settings.TOKEN_COMPLETION_RATIO),
+    )
+
+
+def model_limits(model: str) -> Dict[str, int]:
+    return MODEL_LIMITS.get(model, MODEL_LIMITS["gpt-4o"])
+
+
+@lru_cache
+def _load_encoding(model: str):
+    """Load the model's tokenizer once, or None when it can't be loaded (e.g. offline)"""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"Tokenizer for {model} unavailable, estimating from byte length: {e}")
+        return None
+
+
+class TokenCounter:
+    """Counts tokens with the model's tokenizer and sizes completions from them"""
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or settings.OPENAI_MODEL
+        self.limits = model_limits(self.model)
+
+    def warm_up(self):
+        _load_encoding(self.model)
+
+    def count(self, text: str) -> int:
+        encoding = _load_encoding(self.model)
+        if encoding is None:
+            return (len(text.encode("utf-8")) + 3) // 4
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def completion_tokens(self, text_tokens: int, target_langs: List[str]) -> int:
+        """Expected completion size for translating text_tokens into all of target_langs"""
+        expected = sum(int(text_tokens * completion_ratio(lang)) for lang in target_langs)
+        return expected + settings.TOKEN_COMPLETION_MARGIN
+
+    def max_tokens(self, text: str, target_langs: List[str]) -> int:
+        """max_tokens for one call translating text into all of target_langs"""
+        return min(
+            self.completion_tokens(self.count(text), target_langs), self.limits["output"]
+        )
+
+    def estimate(
+        self, text: str, target_langs: List[str], combined: bool = False
+    ) -> Dict[str, int]:
+        """Pre-flight estimate for translating text in one call per target, or one for all"""
+        text_tokens = self.count(text)
+        calls = [target_langs] if combined else [[lang] for lang in target_langs]
+        call_completions = [self.completion_tokens(text_tokens, langs) for langs in calls]
+        call_completion = max(call_completions, default=0)
+        prompt_tokens = (text_tokens + PROMPT_OVERHEAD_TOKENS) * len(calls)
+        completion_tokens = sum(call_completions)
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "call_prompt_tokens": text_tokens + PROMPT_OVERHEAD_TOKENS,
+            "call_completion_tokens": call_completion,
+        }
+
+    def estimate_batches(self, batches: List[str], target_langs: List[str]) -> Dict[str, int]:
+        """Pre-flight estimate for translating each batch in its own call, per target language"""
+        counts = [self.count(batch) for batch in batches] or [0]
+        call_prompt = max(counts) + PROMPT_OVERHEAD_TOKENS
+        call_completion = max(
+            (self.completion_tokens(max(counts), [lang]) for lang in target_langs), default=0
+        )
+        prompt_tokens = (sum(counts) + PROMPT_OVERHEAD_TOKENS * len(batches)) * len(target_langs)
+        completion_tokens = (
+            sum(
+                self.completion_tokens(count, [lang])
+                for count in counts
+                for lang in target_langs
+            )
+            if batches
+            else 0
+        )
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "call_prompt_tokens": call_prompt,
+            "call_completion_tokens": call_completion,
+        }
+
+
+@contextmanager
+def track_usage():
+    """Collect the token usage of every model call made inside the block"""
+    usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    token = _request_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _request_usage.reset(token)
+
+
+def add_usage(usage_metadata: Optional[Dict[str, Any]]):
+    """Add a model response's usage to the block opened by track_usage, if any"""
+    usage = _request_usage.get()
+    if usage is None or not usage_metadata:
+        return
+
+    for key in usage:
+        usage[key] += usage_metadata.get(key, 0) or 0
+
+
+class UsageStore:
+    """SQLite ledger of tokens spent per user, shared between worker processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialize()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _initialize(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS token_usage (
+                    user_id TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS token_usage_user_created ON token_usage (user_id, created_at)"
+            )
+
+    def add(self, user_id: str, tokens: int, expire_before: float):
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO token_usage (user_id, tokens, created_at) VALUES (?, ?, ?)",
+                (user_id, tokens, time.time()),
+            )
+            connection.execute(
+                "DELETE FROM token_usage WHERE user_id = ? AND created_at < ?",
+                (user_id, expire_before),
+            )
+
+    def used_since(self, user_id: str, since: float) -> int:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT COALESCE(SUM(tokens), 0) FROM token_usage WHERE user_id = ? AND created_at >= ?",
+                (user_id, since),
+            ).fetchone()
+        return row[0]
+
+
+class TokenBudget:
+    """Enforces per-request and per-user token budgets and records actual usage"""
+
+    def __init__(self):
+        self.limits = model_limits(settings.OPENAI_MODEL)
+        self.store = UsageStore(settings.USAGE_DB_PATH)
+
+    def check_request(self, estimate: Dict[str, int]):
+        """Reject a request that can't fit in one model call or exceeds the request budget"""
+        call_tokens = estimate["call_prompt_tokens"] + estimate["call_completion_tokens"]
+        if (
+            estimate["call_completion_tokens"] > self.limits["output"]
+            or call_tokens > self.limits["context"]
+        ):
+            raise TokenBudgetExceeded(
+                f"Input is too long to translate in one request "
+                f"(about {estimate['call_prompt_tokens']} tokens). "
+                f"Submit it as a background job via /v1/jobs/document instead."
+            )
+
+        if settings.MAX_REQUEST_TOKENS and estimate["total_tokens"] > settings.MAX_REQUEST_TOKENS:
+            raise TokenBudgetExceeded(
+                f"Request needs about {estimate['total_tokens']} tokens, "
+                f"more than the limit of {settings.MAX_REQUEST_TOKENS} per request"
+            )
+
+    def _window_start(self) -> float:
+        return time.time() - settings.USER_TOKEN_BUDGET_WINDOW
+
+    async def used(self, user_id: str) -> int:
+        """Tokens the user has spent in the current budget window"""
+        return await asyncio.to_thread(self.store.used_since, user_id, self._window_start())
+
+    async def check_user(self, user_id: str, tokens: int):
+        """Reject a request that would take the user over their token budget"""
+        if settings.USER_TOKEN_BUDGET <= 0:
+            return
+
+        used = await self.used(user_id)
+        if used + tokens > settings.USER_TOKEN_BUDGET:
+            raise TokenBudgetExceeded(
+                f"Token budget exceeded: {used} of {settings.USER_TOKEN_BUDGET} tokens used "
+                f"in the last {settings.USER_TOKEN_BUDGET_WINDOW} seconds",
+                status_code=429,
+            )
+
+    async def record(self, user_id: str, usage: Dict[str, int]):
+        """Charge the tokens reported by the model to the user"""
+        if not usage.get("total_tokens"):
+            return
+
+        try:
+            await asyncio.to_thread(
+                self.store.add, user_id, usage["total_tokens"], self._window_start()
+            )
+        except Exception as e:
+            print(f"Failed to record token usage: {e}")
+
+    @asynccontextmanager
+    async def reserve(self, user_id: str, estimate: Optional[Dict[str, int]] = None):
+        """Check the budgets up front, then record the actual usage of the block"""
+        if estimate is not None:
+            self.check_request(estimate)
+        await self.check_user(user_id, estimate["total_tokens"] if estimate else 0)
+
+        with track_usage() as usage:
+            try:
+                yield usage
+            finally:
+                await self.record(user_id, usage)
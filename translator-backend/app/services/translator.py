@@ -1,7 +1,27 @@
-from typing import List, Dict
-from langchain_openai import ChatOpenAI
-from langchain.messages import HumanMessage
+import asyncio
+import base64
+import json
+from typing import Awaitable, Callable, List, Dict, Optional
+from app.core.clients import clients
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.resilience import resilience
+from app.services.json_stream import JsonObjectStream, parse_json_object
+from app.services.language_detection import LanguageDetector
+from app.services.ocr import recognize_text
+from app.services.prompts import (
+    PromptTemplate,
+    format_glossary,
+    format_glossary_by_language,
+    get_prompt,
+    language_label,
+)
+from app.services.structured import (
+    STRUCTURED_DOCUMENT_TYPES,
+    StructuredDocument,
+    batch_segments,
+)
+from app.services.tokens import CompletionTruncated, TokenCounter, add_usage
 from app.core.languages import (
     get_supported_languages,
     is_supported_language,
@@ -14,14 +34,174 @@ class TranslatorService:
     """Service for handling translation logic"""
 
     def __init__(self):
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(
-            model="gpt-4o",
+            model=settings.OPENAI_MODEL,
             api_key=settings.OPENAI_API_KEY,
             temperature=0.1,
+            http_async_client=clients.openai_http,
+            max_retries=0,
+        )
+        self.language_detector = LanguageDetector()
+        self.tokens = TokenCounter(settings.OPENAI_MODEL)
+
+    def prompt_version(self, name: str) -> str:
+        """Key of the active prompt template, recorded alongside results"""
+        return get_prompt(name).key
+
+    def multi_target_prompt_version(self, text: str, target_langs: List[str]) -> str:
+        """Key of the prompt text_translate_many uses for this input"""
+        combined = self._uses_combined_prompt(text, len(dict.fromkeys(target_langs)))
+        return self.prompt_version("text_multi" if combined else "text")
+
+    def document_prompt_version(self, document: Optional[StructuredDocument] = None) -> str:
+        """Key of the prompt document_translate uses for this parsed document"""
+        return self.prompt_version("segments" if document is not None else "document")
+
+    async def _invoke(
+        self,
+        template: PromptTemplate,
+        messages: list,
+        max_tokens: int,
+        modality: str = "text",
+        hedge: bool = False,
+        **kwargs,
+    ):
+        """Call the model with a completion cap and record the tokens it reports.
+
+        A reply cut off at the cap is requested again at the model's output
+        limit; one cut off there raises CompletionTruncated.
+        """
+        if template.response_format:
+            kwargs.setdefault("response_format", template.response_format)
+        llm = self.llm.bind(
+            max_tokens=max_tokens, prompt_cache_key=template.key, **kwargs
+        )
+        response = await resilience.call(
+            modality, lambda: llm.ainvoke(messages), hedge=hedge, max_tokens=max_tokens
+        )
+        add_usage(getattr(response, "usage_metadata", None))
+
+        metadata = getattr(response, "response_metadata", None) or {}
+        if metadata.get("finish_reason") != "length":
+            return response
+
+        metrics.increment("completions_truncated", modality)
+        output_limit = self.tokens.limits["output"]
+        if max_tokens >= output_limit:
+            raise CompletionTruncated(
+                f"Translation is longer than the model can write in one response "
+                f"({output_limit} tokens). Submit it as a background job via "
+                f"/v1/jobs/document instead."
+            )
+
+        print(f"Completion cut off at {max_tokens} tokens, retrying with {output_limit}")
+        return await self._invoke(
+            template, messages, output_limit, modality=modality, hedge=hedge, **kwargs
+        )
+
+    async def _invoke_json_stream(
+        self,
+        template: PromptTemplate,
+        messages: list,
+        max_tokens: int,
+        on_field: Callable[[str, str], Awaitable[None]],
+        modality: str = "text",
+    ):
+        """Stream a JSON object reply, passing each top-level string field on as it completes"""
+        llm = self.llm.bind(
+            max_tokens=max_tokens,
+            prompt_cache_key=template.key,
+            response_format=template.response_format or {"type": "json_object"},
+            stream_usage=True,
         )
+        forwarded = set()
+
+        async def stream():
+            parser = JsonObjectStream()
+            response = None
+            async for chunk in llm.astream(messages):
+                response = chunk if response is None else response + chunk
+                for name, value in parser.feed(chunk.content):
+                    # A retried attempt repeats fields the caller already has
+                    if name not in forwarded:
+                        forwarded.add(name)
+                        await on_field(name, value)
+            return response
+
+        response = await resilience.call(modality, stream, max_tokens=max_tokens)
+        add_usage(getattr(response, "usage_metadata", None))
+        return response
+
+    def _uses_combined_prompt(self, text: str, target_count: int) -> bool:
+        return target_count > 1 and len(text) <= settings.MULTI_TARGET_SINGLE_PROMPT_CHARS
+
+    def estimate_text_tokens(self, text: str, target_langs: List[str]) -> Dict[str, int]:
+        """Pre-flight token estimate for translating text into the given languages"""
+        targets = list(dict.fromkeys(target_langs))
+        combined = self._uses_combined_prompt(text, len(targets))
+        return self.tokens.estimate(text, targets, combined=combined)
+
+    def estimate_document_tokens(
+        self,
+        document_content: str,
+        target_langs: List[str],
+        document: Optional[StructuredDocument] = None,
+    ) -> Dict[str, int]:
+        """Pre-flight token estimate for translating a document into the given languages"""
+        targets = list(dict.fromkeys(target_langs))
+        if document is None:
+            return self.tokens.estimate(document_content, targets)
+
+        payloads = [
+            _segments_payload(batch)
+            for batch in batch_segments(document.segments, settings.STRUCTURED_BATCH_CHARS)
+        ]
+        return self.tokens.estimate_batches(payloads, targets)
+
+    def estimate_image_tokens(self, images: int = 1) -> Dict[str, int]:
+        """Pre-flight token estimate for images, which can't be tokenized up front"""
+        return {
+            "prompt_tokens": settings.IMAGE_PROMPT_TOKENS * images,
+            "completion_tokens": settings.IMAGE_MAX_TOKENS * images,
+            "total_tokens": (settings.IMAGE_PROMPT_TOKENS + settings.IMAGE_MAX_TOKENS) * images,
+            "call_prompt_tokens": settings.IMAGE_PROMPT_TOKENS,
+            "call_completion_tokens": settings.IMAGE_MAX_TOKENS,
+        }
+
+    def detect_document_language(
+        self,
+        document_content: str,
+        source_lang: str,
+        document: Optional[StructuredDocument] = None,
+    ) -> str:
+        """Resolve 'auto' from a document's translatable text rather than its markup"""
+        if document is not None:
+            document_content = "\n".join(document.segments)
+        return self.detect_source_language(document_content, source_lang)
+
+    def detect_source_language(self, text: str, source_lang: str) -> str:
+        """Resolve 'auto' to a language code when local detection is confident.
+
+        Callers detect once and pass the result on as the source language, so a
+        confident match of the target skips the model like an explicit one does.
+        """
+        if source_lang != "auto":
+            return source_lang
+
+        code, confidence = self.language_detector.detect(text)
+        if code and confidence >= settings.LANGUAGE_DETECTION_MIN_CONFIDENCE:
+            return code
+
+        return "auto"
 
     async def text_translate(
-        self, text: str, source_lang: str, target_lang: str
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        glossary_terms: Optional[Dict[str, str]] = None,
     ) -> str:
         """Translate given text using LangChain with OpenAI"""
 
@@ -31,29 +211,149 @@ class TranslatorService:
         if source_lang != "auto" and not is_supported_language(source_lang):
             raise ValueError(f"Unsupported source language: {source_lang}")
 
-        target_lang_name = get_language_name(target_lang) if target_lang != "auto" else target_lang
-        source_lang_name = get_language_name(source_lang) if source_lang != "auto" else source_lang
+        if source_lang == target_lang:
+            return text
 
-        if source_lang == "auto":
-            prompt = f"""Detect the language of the following text and translate it to {target_lang_name}. 
-Only return the translated text, nothing else.
+        template = get_prompt("text")
+        messages = template.messages(
+            source=language_label(source_lang),
+            target=language_label(target_lang),
+            glossary=format_glossary(glossary_terms),
+            text=text,
+        )
+        response = await self._invoke(
+            template,
+            messages,
+            self.tokens.max_tokens(text, [target_lang]),
+            hedge=len(text) <= settings.HEDGE_MAX_CHARS,
+        )
 
-Text to translate: {text}"""
-        else:
-            prompt = f"""Translate the following text from {source_lang_name} to {target_lang_name}. 
-Only return the translated text, nothing else.
+        return response.content.strip()
 
-Text to translate: {text}"""
+    async def text_translate_many(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        glossary_terms: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> Dict[str, str]:
+        """Translate text into several target languages, returning a map of code to translation"""
+        glossary_terms = glossary_terms or {}
+
+        for target_lang in target_langs:
+            if not is_supported_language(target_lang):
+                raise ValueError(f"Unsupported target language: {target_lang}")
+
+        results = {lang: text for lang in target_langs if lang == source_lang}
+        pending = [lang for lang in dict.fromkeys(target_langs) if lang not in results]
+
+        if self._uses_combined_prompt(text, len(pending)):
+            try:
+                results.update(
+                    await self._text_translate_combined(
+                        text, source_lang, pending, glossary_terms
+                    )
+                )
+                return results
+            except (ValueError, KeyError) as e:
+                print(f"Combined multi-target translation failed, translating separately: {e}")
+
+        results.update(
+            await self._fan_out(
+                pending,
+                lambda lang: self.text_translate(
+                    text=text,
+                    source_lang=source_lang,
+                    target_lang=lang,
+                    glossary_terms=glossary_terms.get(lang),
+                ),
+            )
+        )
+        return results
+
+    async def _text_translate_combined(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        glossary_terms: Dict[str, Dict[str, str]],
+    ) -> Dict[str, str]:
+        """Translate short text into all targets with a single structured prompt"""
+
+        targets = "\n".join(
+            f'- "{lang}": {get_language_name(lang)}' for lang in target_langs
+        )
 
-        message = HumanMessage(content=prompt)
-        response = await self.llm.ainvoke([message])
+        template = get_prompt("text_multi")
+        messages = template.messages(
+            source=language_label(source_lang),
+            targets=targets,
+            glossary=format_glossary_by_language(glossary_terms, target_langs),
+            text=text,
+        )
+        response = await self._invoke(
+            template,
+            messages,
+            self.tokens.max_tokens(text, target_langs),
+            hedge=len(text) <= settings.HEDGE_MAX_CHARS,
+            response_format={"type": "json_object"},
+        )
 
-        return response.content.strip()
+        translations = json.loads(response.content)
+        if not isinstance(translations, dict):
+            raise ValueError("Expected a JSON object of translations")
+
+        return {lang: str(translations[lang]).strip() for lang in target_langs}
+
+    async def _fan_out(
+        self, target_langs: List[str], translate: Callable[[str], Awaitable[str]]
+    ) -> Dict[str, str]:
+        """Run one translation per target language concurrently, bounded by a semaphore"""
+        semaphore = asyncio.Semaphore(settings.MULTI_TARGET_CONCURRENCY)
+
+        async def run(lang: str) -> str:
+            async with semaphore:
+                return await translate(lang)
+
+        translations = await asyncio.gather(*(run(lang) for lang in target_langs))
+        return dict(zip(target_langs, translations))
+
+    async def document_translate_many(
+        self,
+        document_content: str,
+        source_lang: str,
+        target_langs: List[str],
+        glossary_terms: Optional[Dict[str, Dict[str, str]]] = None,
+        document: Optional[StructuredDocument] = None,
+    ) -> Dict[str, str]:
+        """Translate a document into several target languages concurrently"""
+        glossary_terms = glossary_terms or {}
+
+        return await self._fan_out(
+            list(dict.fromkeys(target_langs)),
+            lambda lang: self.document_translate(
+                document_content=document_content,
+                source_lang=source_lang,
+                target_lang=lang,
+                glossary_terms=glossary_terms.get(lang),
+                document=document,
+            ),
+        )
 
     async def document_translate(
-        self, document_content: str, source_lang: str, target_lang: str
+        self,
+        document_content: str,
+        source_lang: str,
+        target_lang: str,
+        glossary_terms: Optional[Dict[str, str]] = None,
+        document: Optional[StructuredDocument] = None,
+        on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
     ) -> str:
-        """Translate document content using LangChain with OpenAI"""
+        """Translate document content using LangChain with OpenAI.
+
+        When the parsed CSV, YAML or Markdown document is given, only its unique
+        text values are translated, in batches, and written back in place.
+        """
 
         if not is_supported_language(target_lang):
             raise ValueError(f"Unsupported target language: {target_lang}")
@@ -61,31 +361,177 @@ Text to translate: {text}"""
         if source_lang != "auto" and not is_supported_language(source_lang):
             raise ValueError(f"Unsupported source language: {source_lang}")
 
-        target_lang_name = get_language_name(target_lang) if target_lang != "auto" else target_lang
-        source_lang_name = get_language_name(source_lang) if source_lang != "auto" else source_lang
+        if source_lang == target_lang:
+            return document_content
+
+        if document is not None:
+            translations = await self.translate_segments(
+                document.segments,
+                source_lang,
+                target_lang,
+                glossary_terms=glossary_terms,
+                document_type=document.document_type,
+                on_progress=on_progress,
+            )
+            return document.render(translations)
+
+        template = get_prompt("document")
+        messages = template.messages(
+            source=language_label(source_lang),
+            target=language_label(target_lang),
+            glossary=format_glossary(glossary_terms),
+            text=document_content,
+        )
+        response = await self._invoke(
+            template,
+            messages,
+            self.tokens.max_tokens(document_content, [target_lang]),
+            modality="document",
+        )
 
-        if source_lang == "auto":
-            prompt = f"""Detect the language of the following document and translate it to {target_lang_name}. 
-Preserve the document structure and formatting as much as possible.
-Only return the translated document content, nothing else.
+        return response.content.strip()
 
-Document content: {document_content}"""
-        else:
-            prompt = f"""Translate the following document from {source_lang_name} to {target_lang_name}. 
-Preserve the document structure and formatting as much as possible.
-Only return the translated document content, nothing else.
+    async def translate_segments(
+        self,
+        segments: List[str],
+        source_lang: str,
+        target_lang: str,
+        glossary_terms: Optional[Dict[str, str]] = None,
+        document_type: Optional[str] = None,
+        on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ) -> Dict[str, str]:
+        """Translate unique text values in batches, returning a map of value to translation"""
+        batches = batch_segments(segments, settings.STRUCTURED_BATCH_CHARS)
+        semaphore = asyncio.Semaphore(settings.STRUCTURED_BATCH_CONCURRENCY)
+        translations: Dict[str, str] = {}
+        done = 0
+
+        async def run(batch: List[str]):
+            nonlocal done
+            async with semaphore:
+                translations.update(
+                    await self._translate_batch(
+                        batch, source_lang, target_lang, glossary_terms, document_type
+                    )
+                )
+            done += 1
+            if on_progress:
+                await on_progress(done, len(batches))
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+
+        # Values the model dropped from its reply get one more pass; any still
+        # missing keep their source text so the document structure stays intact
+        missing = [segment for segment in segments if segment not in translations]
+        if missing:
+            print(f"Retranslating {len(missing)} values missing from batch replies")
+            results = await asyncio.gather(
+                *(
+                    self._translate_batch(
+                        batch, source_lang, target_lang, glossary_terms, document_type
+                    )
+                    for batch in batch_segments(missing, settings.STRUCTURED_BATCH_CHARS)
+                )
+            )
+            for result in results:
+                translations.update(result)
+
+        return translations
+
+    async def _translate_batch(
+        self,
+        batch: List[str],
+        source_lang: str,
+        target_lang: str,
+        glossary_terms: Optional[Dict[str, str]],
+        document_type: Optional[str],
+    ) -> Dict[str, str]:
+        """Translate one batch of values with a JSON prompt, omitting any missing from the reply"""
+        payload = _segments_payload(batch)
+        lowered = payload.lower()
+        batch_terms = {
+            source: target
+            for source, target in (glossary_terms or {}).items()
+            if source.lower() in lowered
+        }
+
+        template = get_prompt("segments")
+        messages = template.messages(
+            document_type=STRUCTURED_DOCUMENT_TYPES.get(document_type, "structured"),
+            source=language_label(source_lang),
+            target=language_label(target_lang),
+            glossary=format_glossary(batch_terms),
+            text=payload,
+        )
+        response = await self._invoke(
+            template,
+            messages,
+            self.tokens.max_tokens(payload, [target_lang]),
+            modality="document",
+            response_format={"type": "json_object"},
+        )
 
-Document content: {document_content}"""
+        try:
+            translated = json.loads(response.content)
+        except ValueError as e:
+            print(f"Batch reply was not valid JSON: {e}")
+            return {}
+        if not isinstance(translated, dict):
+            return {}
+
+        return {
+            segment: translated[str(index)].strip()
+            for index, segment in enumerate(batch, start=1)
+            if isinstance(translated.get(str(index)), str)
+        }
+
+    async def scanned_pdf_translate(
+        self,
+        pages: List[bytes],
+        source_lang: str,
+        target_lang: str,
+        on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ) -> Dict[str, str]:
+        """Read and translate rendered PDF pages with the vision model, joined in page order"""
+        semaphore = asyncio.Semaphore(settings.PDF_OCR_CONCURRENCY)
+        done = 0
+
+        async def run(page: bytes) -> dict:
+            nonlocal done
+            async with semaphore:
+                result = await self.image_translate(
+                    image_base64=base64.b64encode(page).decode("utf-8"),
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                )
+            done += 1
+            if on_progress:
+                await on_progress(done, len(pages))
+            return result
 
-        message = HumanMessage(content=prompt)
-        response = await self.llm.ainvoke([message])
+        results = await asyncio.gather(*(run(page) for page in pages))
+        # Blank pages are dropped from both texts so they stay aligned page by page
+        results = [result for result in results if result.get("extracted_text", "").strip()]
 
-        return response.content.strip()
+        return {
+            "extracted_text": "\n\n".join(r["extracted_text"].strip() for r in results),
+            "translated_text": "\n\n".join(
+                r.get("translated_text", "").strip() for r in results
+            ),
+        }
 
     async def image_translate(
-        self, image_base64: str, source_lang: str, target_lang: str
+        self,
+        image_base64: str,
+        source_lang: str,
+        target_lang: str,
+        on_extracted: Optional[Callable[[str], Awaitable[None]]] = None,
     ) -> dict:
-        """Extract text from image and translate it using OpenAI Vision API"""
+        """Extract text from image and translate it, reading it locally when OCR is confident.
+
+        on_extracted receives the extracted text as soon as it is read, before
+        the translation is finished.
+        """
 
         if not is_supported_language(target_lang):
             raise ValueError(f"Unsupported target language: {target_lang}")
@@ -93,89 +539,198 @@ Document content: {document_content}"""
         if source_lang != "auto" and not is_supported_language(source_lang):
             raise ValueError(f"Unsupported source language: {source_lang}")
 
-        target_lang_name = get_language_name(target_lang) if target_lang != "auto" else target_lang
-        source_lang_name = get_language_name(source_lang) if source_lang != "auto" else source_lang
-
-        if source_lang == "auto":
-            prompt = f"""Please analyze this image and:
-1. Extract all visible text from the image
-2. Detect the language of the extracted text
-3. Translate the extracted text to {target_lang_name}
-
-Return your response in this exact JSON format:
-{{
-    "extracted_text": "the original text found in the image",
-    "translated_text": "the text translated to {target_lang_name}"
-}}
-
-If no text is found in the image, return:
-{{
-    "extracted_text": "",
-    "translated_text": ""
-}}"""
-        else:
-            prompt = f"""Please analyze this image and:
-1. Extract all visible text from the image (expected to be in {source_lang_name})
-2. Translate the extracted text to {target_lang_name}
-
-Return your response in this exact JSON format:
-{{
-    "extracted_text": "the original text found in the image",
-    "translated_text": "the text translated to {target_lang_name}"
-}}
-
-If no text is found in the image, return:
-{{
-    "extracted_text": "",
-    "translated_text": ""
-}}"""
-
-        message = HumanMessage(
-            content=[
-                {"type": "text", "text": prompt},
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"},
-                },
-            ]
-        )
-
-        response = await self.llm.ainvoke([message])
+        text = await self._confident_ocr(image_base64)
+        if text:
+            if on_extracted:
+                await on_extracted(text)
+            return await self._ocr_text_translate(text, source_lang, target_lang)
 
-        try:
-            import json
-            import re
+        metrics.increment("image_ocr", "vision")
+        result = await self._vision_translate(
+            image_base64, source_lang, target_lang, on_extracted
+        )
+        result["ocr_engine"] = "vision"
+        return result
 
-            content = response.content.strip()
+    async def image_translate_many(
+        self, images_base64: List[str], source_lang: str, target_lang: str
+    ) -> List[dict]:
+        """Translate several images, packing those that need the vision model into shared requests"""
 
-            json_match = re.search(
-                r"```(?:json)?\s*(\{.*?\})\s*```", content, re.DOTALL
-            )
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_match = re.search(r"\{.*\}", content, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                else:
-                    json_str = content
+        if not is_supported_language(target_lang):
+            raise ValueError(f"Unsupported target language: {target_lang}")
 
-            result = json.loads(json_str)
-            return result
-        except (json.JSONDecodeError, AttributeError):
-            content = response.content.strip()
+        if source_lang != "auto" and not is_supported_language(source_lang):
+            raise ValueError(f"Unsupported source language: {source_lang}")
 
-            extracted_match = re.search(r'"extracted_text":\s*"([^"]*)"', content)
-            translated_match = re.search(r'"translated_text":\s*"([^"]*)"', content)
+        semaphore = asyncio.Semaphore(settings.IMAGE_BATCH_CONCURRENCY)
+        results: List[Optional[dict]] = [None] * len(images_base64)
+        texts = await asyncio.gather(
+            *(self._confident_ocr(image) for image in images_base64)
+        )
 
-            if extracted_match and translated_match:
-                return {
-                    "extracted_text": extracted_match.group(1),
-                    "translated_text": translated_match.group(1),
-                }
+        async def translate_text(index: int):
+            async with semaphore:
+                results[index] = await self._ocr_text_translate(
+                    texts[index], source_lang, target_lang
+                )
+
+        async def translate_group(indexes: List[int]):
+            async with semaphore:
+                group = await self._vision_translate_group(
+                    [images_base64[index] for index in indexes], source_lang, target_lang
+                )
+            for index, result in zip(indexes, group):
+                results[index] = result
+
+        vision_indexes = [index for index, text in enumerate(texts) if not text]
+        await asyncio.gather(
+            *(translate_text(index) for index, text in enumerate(texts) if text),
+            *(
+                translate_group(group)
+                for group in self._pack_images(images_base64, vision_indexes)
+            ),
+        )
+        return results
+
+    @staticmethod
+    def _pack_images(images_base64: List[str], indexes: List[int]) -> List[List[int]]:
+        """Group images into vision requests within the per-request count and size limits"""
+        groups: List[List[int]] = []
+        size = 0
+        for index in indexes:
+            image_size = len(images_base64[index])
+            if (
+                not groups
+                or len(groups[-1]) >= settings.IMAGE_BATCH_MAX_IMAGES
+                or size + image_size > settings.IMAGE_BATCH_MAX_BYTES
+            ):
+                groups.append([])
+                size = 0
+            groups[-1].append(index)
+            size += image_size
+        return groups
+
+    async def _confident_ocr(self, image_base64: str) -> Optional[str]:
+        """Text read by local OCR when it is confident enough to skip the vision model"""
+        recognized = await recognize_text(base64.b64decode(image_base64))
+        if not recognized:
+            return None
+
+        text, confidence = recognized
+        if (
+            len(text) >= settings.LOCAL_OCR_MIN_CHARS
+            and confidence >= settings.LOCAL_OCR_MIN_CONFIDENCE
+        ):
+            return text
+        return None
+
+    async def _ocr_text_translate(self, text: str, source_lang: str, target_lang: str) -> dict:
+        metrics.increment("image_ocr", "local")
+        source_lang = self.detect_source_language(text, source_lang)
+        return {
+            "extracted_text": text,
+            "translated_text": await self.text_translate(
+                text=text, source_lang=source_lang, target_lang=target_lang
+            ),
+            "ocr_engine": "local",
+        }
+
+    async def _vision_translate_group(
+        self, images_base64: List[str], source_lang: str, target_lang: str
+    ) -> List[dict]:
+        """Read and translate several images in one vision request, one result per image"""
+        metrics.increment("image_ocr", "vision", len(images_base64))
+        if len(images_base64) == 1:
+            result = await self._vision_translate(images_base64[0], source_lang, target_lang)
+            result["ocr_engine"] = "vision"
+            return [result]
+
+        template = get_prompt("image_batch")
+        messages = template.messages(
+            image_urls=[f"data:image/jpeg;base64,{image}" for image in images_base64],
+            count=len(images_base64),
+            source=language_label(source_lang),
+            target=language_label(target_lang),
+        )
+        response = await self._invoke(
+            template,
+            messages,
+            min(settings.IMAGE_MAX_TOKENS * len(images_base64), self.tokens.limits["output"]),
+            modality="image",
+        )
+
+        entries = {}
+        try:
+            for entry in (parse_json_object(response.content) or {}).get("images", []):
+                entries[int(entry["image"])] = entry
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"Batched image reply could not be parsed, reading images one by one: {e}")
+
+        results = []
+        for number, image in enumerate(images_base64, start=1):
+            entry = entries.get(number)
+            if entry is None:
+                # Missing from the shared reply; read this image on its own
+                result = await self._vision_translate(image, source_lang, target_lang)
             else:
-                return {"extracted_text": content, "translated_text": content}
+                result = {
+                    "extracted_text": str(entry.get("extracted_text") or ""),
+                    "translated_text": str(entry.get("translated_text") or ""),
+                }
+            result["ocr_engine"] = "vision"
+            results.append(result)
+        return results
+
+    async def _vision_translate(
+        self,
+        image_base64: str,
+        source_lang: str,
+        target_lang: str,
+        on_extracted: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> dict:
+        """Extract text from image and translate it using OpenAI Vision API"""
+
+        template = get_prompt("image")
+        messages = template.messages(
+            image_urls=[f"data:image/jpeg;base64,{image_base64}"],
+            source=language_label(source_lang),
+            target=language_label(target_lang),
+        )
+
+        if on_extracted:
+
+            async def on_field(name: str, value: str):
+                if name == "extracted_text":
+                    await on_extracted(value)
+
+            response = await self._invoke_json_stream(
+                template, messages, settings.IMAGE_MAX_TOKENS, on_field, modality="image"
+            )
+        else:
+            response = await self._invoke(
+                template, messages, settings.IMAGE_MAX_TOKENS, modality="image"
+            )
+
+        result = parse_json_object(response.content)
+        if result is None:
+            metrics.increment("image_output", "unreadable")
+            raise ValueError("The vision model returned no readable result for the image")
+
+        return {
+            "extracted_text": str(result.get("extracted_text") or ""),
+            "translated_text": str(result.get("translated_text") or ""),
+        }
 
     def get_supported_languages(self) -> List[Dict[str, str]]:
         """Get list of supported languages with codes and names."""
         return get_supported_languages()
+
+
+def _segments_payload(segments: List[str]) -> str:
+    """JSON object numbering the values of one batch, as sent to the model"""
+    return json.dumps(
+        {str(index): segment for index, segment in enumerate(segments, start=1)},
+        ensure_ascii=False,
+        indent=0,
+    )
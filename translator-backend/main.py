@@ -1,15 +1,53 @@
+import importlib.util
+import os
+
 import uvicorn
-from app.main import app
 from app.core.config import settings
 
 
+def _module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def _worker_count() -> int:
+    """Configured worker count, or one per CPU available to this process"""
+    if settings.WORKERS > 0:
+        return settings.WORKERS
+
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
 def main():
     """Run the FastAPI application"""
+    if settings.DEBUG:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=True,
+        )
+        return
+
+    # Workers are supervised by uvicorn: dead workers are replaced, SIGHUP
+    # restarts them one at a time and SIGTTIN/SIGTTOU scale the pool.
+    workers = _worker_count()
+    loop = "uvloop" if _module_available("uvloop") else "asyncio"
+    http = "httptools" if _module_available("httptools") else "h11"
+    print(f"Starting {workers} worker(s) with loop={loop}, http={http}")
+
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.DEBUG,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.BACKLOG,
+        timeout_keep_alive=settings.KEEP_ALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        limit_max_requests=settings.MAX_REQUESTS or None,
     )
 
 
@@ -0,0 +1,18 @@
+-- Short previews of each translation's texts, computed by Postgres so that
+-- history summaries never fetch the full input and output. Existing rows get
+-- their previews when the columns are added. The length matches the default
+-- HISTORY_PREVIEW_LENGTH (200); change both together.
+
+alter table public.translations
+    add column if not exists input_preview text generated always as (
+        case
+            when length(input_text) > 200 then rtrim(left(input_text, 200), E' \t\r\n') || '…'
+            else input_text
+        end
+    ) stored,
+    add column if not exists output_preview text generated always as (
+        case
+            when length(output_text) > 200 then rtrim(left(output_text, 200), E' \t\r\n') || '…'
+            else output_text
+        end
+    ) stored;
@@ -0,0 +1,64 @@
+-- Large translation texts, stored once per user and SHA-256 content hash.
+-- A translations row keeps a preview in its text column and the hash of the
+-- full text in input_hash or output_hash, so an input translated into several
+-- languages, or translated again, is stored only once and history pages stay
+-- small. Used when HISTORY_CONTENT_TABLE is on.
+
+create table if not exists public.translation_contents (
+    user_id uuid not null references auth.users (id) on delete cascade,
+    hash text not null,
+    content text not null,
+    created_at timestamptz not null default now(),
+    primary key (user_id, hash)
+);
+
+-- TOAST compresses the large values; lz4 is faster than the default pglz
+alter table public.translation_contents alter column content set compression lz4;
+
+alter table public.translation_contents enable row level security;
+
+create policy "Users manage their own translation contents"
+    on public.translation_contents
+    for all
+    using (auth.uid() = user_id)
+    with check (auth.uid() = user_id);
+
+alter table public.translations
+    add column if not exists input_hash text,
+    add column if not exists output_hash text;
+
+create index if not exists translations_user_input_hash
+    on public.translations (user_id, input_hash)
+    where input_hash is not null;
+
+create index if not exists translations_user_output_hash
+    on public.translations (user_id, output_hash)
+    where output_hash is not null;
+
+-- Deleting a translation drops the contents no other translation refers to
+create or replace function public.delete_unreferenced_translation_contents()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    delete from public.translation_contents c
+    where c.user_id = old.user_id::uuid
+      and c.hash in (old.input_hash, old.output_hash)
+      and not exists (
+          select 1
+          from public.translations t
+          where t.user_id = old.user_id
+            and (t.input_hash = c.hash or t.output_hash = c.hash)
+      );
+    return null;
+end;
+$$;
+
+drop trigger if exists translations_delete_contents on public.translations;
+create trigger translations_delete_contents
+    after delete on public.translations
+    for each row
+    when (old.input_hash is not null or old.output_hash is not null)
+    execute function public.delete_unreferenced_translation_contents();
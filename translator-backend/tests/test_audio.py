@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from websockets.exceptions import ConnectionClosed
+
+from app.services.audio import OpenAIRealtimeAudioService
+
+
+class FakeSocket:
+    """Realtime websocket stand-in recording sent event types"""
+
+    def __init__(self, close_on=None):
+        self.close_on = close_on
+        self.sent = []
+
+    async def send(self, message):
+        event_type = json.loads(message)["type"]
+        if event_type == self.close_on:
+            raise ConnectionClosed(None, None)
+        self.sent.append(event_type)
+
+    async def close(self):
+        pass
+
+
+def test_response_is_requested_after_reconnect_when_closed_after_commit():
+    service = OpenAIRealtimeAudioService()
+    service.target_language = "french"
+    old_socket = FakeSocket(close_on="response.create")
+    new_socket = FakeSocket()
+    service.realtime_ws = old_socket
+
+    async def connect_realtime():
+        service.realtime_ws = new_socket
+        return True
+
+    service.connect_realtime = connect_realtime
+
+    async def run():
+        await service.send_audio_chunk(b"\x00\x01" * 800)
+        await service.commit_audio_buffer()
+        assert service.response_pending
+        # Not acknowledged, so the audio is kept for the new connection
+        assert service.replay_buffer.size == 1600
+        assert await service.reconnect()
+
+    asyncio.run(run())
+
+    assert old_socket.sent == ["input_audio_buffer.append", "input_audio_buffer.commit"]
+    assert new_socket.sent == [
+        "session.update",
+        "input_audio_buffer.append",
+        "input_audio_buffer.commit",
+        "response.create",
+    ]
+    assert not service.response_pending
+    assert service.replay_buffer.size == 0
@@ -0,0 +1,94 @@
+import asyncio
+
+from app.core.config import settings
+from app.services.database import DatabaseService, pack_text
+
+
+class FakeQuery:
+    """Supabase query builder stand-in over an in-memory table"""
+
+    def __init__(self, tables, name):
+        self.tables = tables
+        self.name = name
+        self.filters = []
+        self.rows = None
+
+    def insert(self, rows):
+        self.rows = rows if isinstance(rows, list) else [rows]
+        self.tables[self.name].extend(self.rows)
+        return self
+
+    def upsert(self, rows, on_conflict, ignore_duplicates):
+        keys = on_conflict.split(",")
+        existing = {tuple(row[key] for key in keys) for row in self.tables[self.name]}
+        self.rows = [row for row in rows if tuple(row[key] for key in keys) not in existing]
+        self.tables[self.name].extend(self.rows)
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def limit(self, count):
+        return self
+
+    async def execute(self):
+        if self.rows is None:
+            self.rows = [
+                dict(row) for row in self.tables[self.name]
+                if all(keep(row) for keep in self.filters)
+            ]
+        return type("Result", (), {"data": [dict(row) for row in self.rows]})
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {"translations": [], "translation_contents": []}
+
+    def table(self, name):
+        return FakeQuery(self.tables, name)
+
+
+class FakeDatabase(DatabaseService):
+    def __init__(self):
+        self.supabase = FakeSupabase()
+
+    async def get_authenticated_client(self, access_token):
+        return self.supabase
+
+
+def test_small_texts_stay_inline():
+    contents = {}
+    assert pack_text("input_text", "Hello", contents) == {"input_text": "Hello"}
+    assert contents == {}
+
+
+def test_large_input_is_stored_once_across_targets():
+    db = FakeDatabase()
+    text = "A long paragraph about the weather. " * 200
+    assert len(text.encode("utf-8")) >= settings.HISTORY_CONTENT_MIN_BYTES
+
+    saved = asyncio.run(db.save_translations(
+        "user-1", text, {"fr": "Bonjour", "de": "Hallo"}, "en", "text", "token"
+    ))
+    assert [row["input_text"] for row in saved] == [text, text]
+
+    stored = db.supabase.tables["translations"]
+    assert len(db.supabase.tables["translation_contents"]) == 1
+    assert all(len(row["input_text"]) <= settings.HISTORY_PREVIEW_LENGTH + 1 for row in stored)
+    assert stored[0]["input_hash"] == stored[1]["input_hash"]
+
+    # Saving the same input again reuses the stored content
+    asyncio.run(db.save_translation("user-1", text, "Hola", "en", "es", "text", "token"))
+    assert len(db.supabase.tables["translation_contents"]) == 1
+
+    row = asyncio.run(db.get_translation(stored[0]["id"], "user-1", "token"))
+    assert row["input_text"] == text
+    assert "input_hash" not in row
@@ -0,0 +1,54 @@
+import pytest
+
+from app.core.config import settings
+from app.services.language_detection import LanguageDetector
+
+
+# Ordinary news-style paragraphs, unrelated to the profile samples
+PARAGRAPHS = {
+    "es": "El ayuntamiento aprobó ayer el nuevo presupuesto para el próximo año, que incluye más dinero para las escuelas públicas y la reparación de varias calles del centro de la ciudad.",
+    "pt": "A prefeitura aprovou ontem o novo orçamento para o próximo ano, que inclui mais dinheiro para as escolas públicas e a reforma de várias ruas do centro da cidade.",
+    "ca": "L'ajuntament va aprovar ahir el nou pressupost per a l'any vinent, que inclou més diners per a les escoles públiques i la reparació de diversos carrers del centre de la ciutat.",
+    "fr": "La mairie a adopté hier le nouveau budget pour l'année prochaine, qui prévoit davantage d'argent pour les écoles publiques et la réfection de plusieurs rues du centre-ville.",
+    "it": "Il comune ha approvato ieri il nuovo bilancio per il prossimo anno, che prevede più fondi per le scuole pubbliche e il rifacimento di diverse strade del centro città.",
+    "tr": "Belediye dün gelecek yılın yeni bütçesini onayladı; bütçe devlet okulları için daha fazla para ve şehir merkezindeki birçok sokağın onarımını içeriyor.",
+    "de": "Der Stadtrat hat gestern den neuen Haushalt für das kommende Jahr beschlossen, der mehr Geld für die öffentlichen Schulen und die Sanierung mehrerer Straßen in der Innenstadt vorsieht.",
+    "nl": "De gemeenteraad heeft gisteren de nieuwe begroting voor volgend jaar goedgekeurd, met meer geld voor openbare scholen en het herstel van enkele straten in het centrum.",
+    "hr": "Gradsko vijeće jučer je usvojilo novi proračun za sljedeću godinu, koji uključuje više novca za javne škole i popravak nekoliko ulica u središtu grada.",
+    "id": "Dewan kota kemarin menyetujui anggaran baru untuk tahun depan, yang mencakup lebih banyak dana untuk sekolah negeri dan perbaikan beberapa jalan di pusat kota.",
+    "ru": "Городской совет вчера утвердил новый бюджет на следующий год, который предусматривает больше денег для государственных школ и ремонт нескольких улиц в центре города.",
+    "uk": "Міська рада вчора затвердила новий бюджет на наступний рік, який передбачає більше грошей для державних шкіл і ремонт кількох вулиць у центрі міста.",
+    "hi": "नगर निगम ने कल अगले साल का नया बजट पास किया, जिसमें सरकारी स्कूलों के लिए ज़्यादा पैसा और शहर के बीच की कई सड़कों की मरम्मत शामिल है।",
+    "mr": "महानगरपालिकेने काल पुढच्या वर्षाचा नवीन अर्थसंकल्प मंजूर केला, ज्यामध्ये सरकारी शाळांसाठी अधिक निधी आणि शहराच्या मध्यभागातील अनेक रस्त्यांची दुरुस्ती समाविष्ट आहे.",
+    "ne": "नगरपालिकाले हिजो आगामी वर्षको नयाँ बजेट पारित गर्‍यो, जसमा सरकारी विद्यालयहरूका लागि थप रकम र सहरको बीचका धेरै सडकहरूको मर्मत समावेश छ।",
+    "fa": "شورای شهر دیروز بودجه جدید سال آینده را تصویب کرد که شامل پول بیشتر برای مدارس دولتی و تعمیر چند خیابان در مرکز شهر است.",
+    "zh-CN": "市议会昨天通过了明年的新预算，其中包括为公立学校增加经费，以及对市中心几条街道进行维修。这是我们这个城市多年来最大的一笔投资。",
+    "zh-TW": "市議會昨天通過了明年的新預算，其中包括為公立學校增加經費，以及對市中心幾條街道進行維修。這是我們這個城市多年來最大的一筆投資。",
+    "yue": "市議會琴日通過咗明年嘅新預算，入面包括俾公立學校多啲錢，同埋整返市中心幾條街。佢哋話呢個係呢個城市多年嚟最大嘅投資。",
+}
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return LanguageDetector()
+
+
+@pytest.mark.parametrize("code", PARAGRAPHS)
+def test_paragraph_resolves_locally(detector, code):
+    detected, confidence = detector.detect(PARAGRAPHS[code])
+    assert detected == code
+    assert confidence >= settings.LANGUAGE_DETECTION_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("text", ["Hello", "Gracias", "hola que tal", "你好", "Привет"])
+def test_short_text_stays_ambiguous(detector, text):
+    _, confidence = detector.detect(text)
+    assert confidence < settings.LANGUAGE_DETECTION_MIN_CONFIDENCE
+
+
+def test_kana_is_japanese(detector):
+    assert detector.detect("東京は大きい街です")[0] == "ja"
+
+
+def test_no_letters(detector):
+    assert detector.detect("12345 !!!") == (None, 0.0)
@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.tokens import CompletionTruncated, TokenCounter, completion_ratio
+from app.services.translator import TranslatorService
+
+
+def test_dense_targets_get_a_larger_completion_cap():
+    counter = TokenCounter("gpt-4o")
+    text = "The city council approved the new budget for next year. " * 20
+    assert counter.max_tokens(text, ["hi"]) > counter.max_tokens(text, ["ja"])
+    assert counter.max_tokens(text, ["ja"]) > counter.max_tokens(text, ["fr"])
+    assert completion_ratio("fr") == settings.TOKEN_COMPLETION_RATIO
+
+
+def test_estimate_sums_per_target_calls():
+    counter = TokenCounter("gpt-4o")
+    separate = counter.estimate("Hello there", ["fr", "hi"])
+    combined = counter.estimate("Hello there", ["fr", "hi"], combined=True)
+    assert separate["completion_tokens"] == (
+        counter.completion_tokens(counter.count("Hello there"), ["fr"])
+        + counter.completion_tokens(counter.count("Hello there"), ["hi"])
+    )
+    assert combined["call_completion_tokens"] > separate["call_completion_tokens"]
+
+
+class FakeModel:
+    """Chat model stand-in replying with queued finish reasons"""
+
+    def __init__(self, finish_reasons):
+        self.finish_reasons = list(finish_reasons)
+        self.max_tokens = []
+
+    def bind(self, max_tokens, **kwargs):
+        self.max_tokens.append(max_tokens)
+        return self
+
+    async def ainvoke(self, messages):
+        finish_reason = self.finish_reasons.pop(0)
+        return SimpleNamespace(
+            content="cut off" if finish_reason == "length" else "complete",
+            response_metadata={"finish_reason": finish_reason},
+            usage_metadata=None,
+        )
+
+
+@pytest.fixture
+def translator():
+    return TranslatorService()
+
+
+def test_truncated_reply_is_retried_at_the_output_limit(translator):
+    translator.llm = FakeModel(["length", "stop"])
+    result = asyncio.run(translator.text_translate("Hello there", "en", "hi"))
+
+    assert result == "complete"
+    assert translator.llm.max_tokens[1] == translator.tokens.limits["output"]
+
+
+def test_reply_truncated_at_the_output_limit_raises(translator):
+    translator.llm = FakeModel(["length", "length"])
+    with pytest.raises(CompletionTruncated):
+        asyncio.run(translator.text_translate("Hello there", "en", "hi"))
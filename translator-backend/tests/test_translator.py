@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.translator import TranslatorService
+
+
+GERMAN = "Der Stadtrat hat gestern den neuen Haushalt für das kommende Jahr beschlossen, der mehr Geld für die öffentlichen Schulen und die Sanierung mehrerer Straßen in der Innenstadt vorsieht."
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    service = TranslatorService()
+    calls = []
+
+    async def invoke(template, messages, max_tokens, **kwargs):
+        calls.append(messages)
+        return SimpleNamespace(content="translated")
+
+    monkeypatch.setattr(service, "_invoke", invoke)
+    service.calls = calls
+    return service
+
+
+def test_confident_detection_of_the_target_skips_the_model(translator):
+    source_lang = translator.detect_source_language(GERMAN, "auto")
+    assert source_lang == "de"
+
+    result = asyncio.run(translator.text_translate(GERMAN, source_lang, "de"))
+    assert result == GERMAN
+    assert translator.calls == []
+
+
+def test_ambiguous_detection_leaves_the_source_to_the_model(translator):
+    source_lang = translator.detect_source_language("Hallo", "auto")
+    assert source_lang == "auto"
+
+    result = asyncio.run(translator.text_translate("Hallo", source_lang, "de"))
+    assert result == "translated"
+    assert len(translator.calls) == 1
+
+
+def test_multiple_targets_skip_only_the_detected_language(translator):
+    source_lang = translator.detect_source_language(GERMAN, "auto")
+    results = asyncio.run(
+        translator.text_translate_many(GERMAN, source_lang, ["de", "fr", "es"])
+    )
+    assert results["de"] == GERMAN
+    assert results["fr"] == results["es"] == "translated"